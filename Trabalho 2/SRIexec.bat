@@ -21,7 +21,7 @@ echo.
 
 REM --- Instala as dependencias via pip ---
 echo Instalando dependencias necessarias (PyPDF2)...
-python -m pip install --quiet PyPDF2
+python -m pip install --quiet PyPDF2==3.0.1
 echo Dependencias instaladas com sucesso.
 echo.
 
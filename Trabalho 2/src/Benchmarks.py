@@ -0,0 +1,1284 @@
+import os
+import re
+import json
+import math
+import time
+import heapq
+import random
+import itertools
+import sys
+import argparse
+import tempfile
+import shutil
+import subprocess
+from collections import Counter
+from typing import Dict, Iterator, List, Tuple
+
+from ModeloEspacoVetorial import ModeloEspacoVetorial, PontuadorCosseno, PontuadorBM25
+from ModeloBooleano import ModeloBooleano
+from IndiceInvertido import IndiceInvertido, construir_de_json, escrever_indice
+from IndiceSegmentado import (ConjuntoSegmentos, IndiceSegmentado, abrir_indice, preparar_segmentos,
+                              mesclar_em_segundo_plano, pasta_segmentos)
+from Postings import intersecao, criar_postings, MapaDeBits
+from CacheConsultas import CacheResultados, CAPACIDADE_CACHE_RESULTADOS
+from array import array
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+#----------------------------------------------------------------------------------------#
+def termo_sintetico(i: int) -> str:
+    # Palavra só com letras (e sem 's' final) para sobreviver à normalização das consultas
+    letras = 'bcdfghjklmnpqrtvxz'
+    partes = []
+    while True:
+        i, r = divmod(i, len(letras))
+        partes.append(letras[r] + 'a')
+        if i == 0:
+            break
+    return 'termo' + ''.join(partes)
+
+#----------------------------------------------------------------------------------------#
+def gerar_documentos_sinteticos(num_docs: int, tam_vocab: int = 20000, termos_por_doc: int = 120,
+                                semente: int = 42) -> Iterator[Tuple[str, List[List]]]:
+    # Gera (nome, [[termo, freq], ...]) um documento por vez, com termos em distribuição de Zipf
+    rng = random.Random(semente)
+    vocab = [termo_sintetico(i) for i in range(tam_vocab)]
+    pesos_acumulados = list(itertools.accumulate(1.0 / (i + 1) for i in range(tam_vocab)))
+    for d in range(num_docs):
+        termos = rng.choices(vocab, cum_weights=pesos_acumulados, k=termos_por_doc)
+        freqs: Dict[str, int] = {}
+        for t in termos:
+            freqs[t] = freqs.get(t, 0) + 1
+        yield f"Documento {d:07d}.pdf", sorted(([t, c] for t, c in freqs.items()), key=lambda x: -x[1])
+
+#----------------------------------------------------------------------------------------#
+def gerar_corpus_sintetico(num_docs: int, tam_vocab: int = 20000, termos_por_doc: int = 120, semente: int = 42) -> Dict[str, List[List]]:
+    # Gera um corpus no formato de frequencies_summary.json
+    return dict(gerar_documentos_sinteticos(num_docs, tam_vocab, termos_por_doc, semente))
+
+#----------------------------------------------------------------------------------------#
+def escrever_corpus_temporario(dados: Dict[str, List[List]], pasta: str) -> str:
+    caminho = os.path.join(pasta, f"frequencies_{len(dados)}.json")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False)
+    return caminho
+
+#----------------------------------------------------------------------------------------#
+def bench_carga(tamanhos: List[int], repeticoes: int):
+    # Mede, com o corpus crescendo em passos, a construção do índice binário a partir do JSON
+    # (deve ser linear: tempo por posting aproximadamente constante) e a abertura do índice
+    # pelo modelo vetorial (deve ser constante: só o cabeçalho é lido).
+    print(f"{'docs':>8} {'postings':>10} {'construção (ms)':>16} {'us/posting':>11} {'abertura (ms)':>14}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in tamanhos:
+            dados = gerar_corpus_sintetico(n)
+            total_postings = sum(len(v) for v in dados.values())
+            caminho = escrever_corpus_temporario(dados, pasta)
+            construcao = abertura = float('inf')
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                caminho_indice = construir_de_json(caminho)
+                construcao = min(construcao, time.perf_counter() - inicio)
+
+                inicio = time.perf_counter()
+                modelo = ModeloEspacoVetorial(freq_json_path=caminho)
+                abertura = min(abertura, time.perf_counter() - inicio)
+                modelo.indice.fechar()
+            os.remove(caminho_indice)
+            print(f"{n:>8} {total_postings:>10} {construcao * 1000:>16.1f} "
+                  f"{construcao * 1e6 / total_postings:>11.3f} {abertura * 1000:>14.3f}")
+
+#----------------------------------------------------------------------------------------#
+def gerar_consultas(num_consultas: int, tam_vocab: int = 20000, semente: int = 7) -> List[str]:
+    # Consultas de 2 a 5 termos misturando termos frequentes e raros do corpus sintético
+    rng = random.Random(semente)
+    consultas = []
+    for _ in range(num_consultas):
+        n = rng.randint(2, 5)
+        termos = [termo_sintetico(int(tam_vocab ** rng.random()) - 1) for _ in range(n)]
+        consultas.append(' '.join(termos))
+    return consultas
+
+#----------------------------------------------------------------------------------------#
+def bench_topk(num_docs: int, num_consultas: int, limite: int):
+    # Compara a busca exaustiva com o MaxScore e confere que os rankings são idênticos
+    consultas = gerar_consultas(num_consultas)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = escrever_corpus_temporario(gerar_corpus_sintetico(num_docs), pasta)
+        modelo = ModeloEspacoVetorial(freq_json_path=caminho, cache_resultados=CacheResultados(0))
+        for modo in ('exaustivo', 'maxscore'):
+            inicio = time.perf_counter()
+            resultados[modo] = [modelo.buscar(c, limite, modo=modo) for c in consultas]
+            decorrido = time.perf_counter() - inicio
+            print(f"{modo:>10}: {decorrido * 1000 / num_consultas:8.3f} ms/consulta")
+        modelo.indice.fechar()
+
+    divergencias = sum(1 for a, b in zip(resultados['exaustivo'], resultados['maxscore']) if a != b)
+    print(f"Rankings divergentes: {divergencias} de {num_consultas}")
+
+#----------------------------------------------------------------------------------------#
+def pico_rss_kb() -> int:
+    # Pico de memória residente do processo. No Linux usa VmHWM, pois ru_maxrss
+    # herda o pico do processo pai através do fork; ru_maxrss é em bytes no macOS.
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for linha in f:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return -1
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico // 1024 if sys.platform == 'darwin' else pico
+
+#----------------------------------------------------------------------------------------#
+def medir_recarga(caminho_json: str, modo: str, recargas: int, consultas: List[str]):
+    # Executado em um processo filho para isolar o pico de RSS de cada modo.
+    # 'separado': cada modelo abre o próprio índice (comportamento anterior);
+    # 'compartilhado': um único índice alimenta os dois modelos.
+    tempos = []
+    for _ in range(recargas):
+        inicio = time.perf_counter()
+        if modo == 'separado':
+            booleano = ModeloBooleano(freq_json_path=caminho_json, cache_resultados=CacheResultados(0))
+            vetorial = ModeloEspacoVetorial(freq_json_path=caminho_json, cache_resultados=CacheResultados(0))
+        else:
+            indice = abrir_indice(caminho_json)
+            booleano = ModeloBooleano(indice, cache_resultados=CacheResultados(0))
+            vetorial = ModeloEspacoVetorial(indice, cache_resultados=CacheResultados(0))
+        for c in consultas:
+            booleano.processar_consulta(c.replace(' ', ' or '))
+            vetorial.buscar(c)
+        tempos.append(time.perf_counter() - inicio)
+        booleano.indice.fechar()
+        vetorial.indice.fechar()
+    print(json.dumps({'modo': modo, 'recarga_ms': min(tempos) * 1000, 'pico_rss_kb': pico_rss_kb()}))
+
+#----------------------------------------------------------------------------------------#
+def bench_recarga(num_docs: int, recargas: int, num_consultas: int):
+    # Compara tempo de recarga (abrir os dois modelos e responder consultas) e pico de RSS
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = escrever_corpus_temporario(gerar_corpus_sintetico(num_docs), pasta)
+        preparar_segmentos(caminho)
+        print(f"{'modo':>14} {'recarga+consultas (ms)':>24} {'pico RSS (KB)':>14}")
+        for modo in ('separado', 'compartilhado'):
+            saida = subprocess.run([sys.executable, os.path.abspath(__file__), '_recarga', caminho, modo,
+                                    str(recargas), str(num_consultas)],
+                                   capture_output=True, text=True, check=True)
+            r = json.loads(saida.stdout.strip().splitlines()[-1])
+            print(f"{r['modo']:>14} {r['recarga_ms']:>24.1f} {r['pico_rss_kb']:>14}")
+
+#----------------------------------------------------------------------------------------#
+def bench_intersecao(total_docs: int, repeticoes: int):
+    # Memória por posting e tempo de AND: conjuntos de nomes (antes) vs. arrays de DocIDs.
+    # A lista maior é fixa; a menor encolhe, e o tempo da interseção deve acompanhá-la.
+    rng = random.Random(3)
+    nomes = [f"Documento {d:07d}.pdf" for d in range(total_docs)]
+    maior = array('I', sorted(rng.sample(range(total_docs), total_docs // 2)))
+    conjunto_maior = {nomes[d] for d in maior}
+    bytes_set = sys.getsizeof(conjunto_maior)
+    bytes_array = sys.getsizeof(maior)
+    print(f"Memória por posting: set de nomes {bytes_set / len(maior):.1f} B "
+          f"(sem contar as strings), array('I') {bytes_array / len(maior):.1f} B")
+
+    print(f"{'lista menor':>12} {'set (ms)':>10} {'array (ms)':>11}")
+    tamanho = total_docs // 2
+    while tamanho >= 10:
+        menor = array('I', sorted(rng.sample(range(total_docs), tamanho)))
+        conjunto_menor = {nomes[d] for d in menor}
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            conjunto_menor & conjunto_maior
+        t_set = (time.perf_counter() - inicio) / repeticoes
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            intersecao(menor, maior)
+        t_array = (time.perf_counter() - inicio) / repeticoes
+        print(f"{tamanho:>12} {t_set * 1000:>10.3f} {t_array * 1000:>11.3f}")
+        tamanho //= 10
+
+#----------------------------------------------------------------------------------------#
+def tamanho_postings(postings) -> int:
+    # Bytes ocupados por uma ListaOrdenada ou MapaDeBits
+    if isinstance(postings, MapaDeBits):
+        return sys.getsizeof(postings.blocos) + sum(sys.getsizeof(b) for b in postings.blocos.values())
+    return sys.getsizeof(postings.docs)
+
+#----------------------------------------------------------------------------------------#
+def bench_bitmap(total_docs: int, repeticoes: int):
+    # Consultas booleanas com termos de densidades mistas: sets de nomes (antes),
+    # backend só de listas ordenadas e backend automático (bitmap para termos densos)
+    rng = random.Random(11)
+    densidades = {'fibromialgia': 0.8, 'qualidade': 0.6, 'vida': 0.55, 'dor': 0.3, 'acupuntura': 0.002, 'hidro': 0.0005}
+    docs = {t: array('I', sorted(rng.sample(range(total_docs), int(total_docs * d)))) for t, d in densidades.items()}
+    nomes = [f"Documento {d:07d}.pdf" for d in range(total_docs)]
+    todos = set(nomes)
+
+    print(f"{'termo':>14} {'densidade':>10} {'lista (KB)':>11} {'auto (KB)':>10}")
+    for t, d in densidades.items():
+        lista = tamanho_postings(criar_postings(docs[t], total_docs, 'lista'))
+        auto = tamanho_postings(criar_postings(docs[t], total_docs, 'auto'))
+        print(f"{t:>14} {d:>10.4f} {lista / 1024:>11.1f} {auto / 1024:>10.1f}")
+
+    consultas = {
+        'fibromialgia AND qualidade AND vida': lambda p: p['fibromialgia'].e(p['qualidade']).e(p['vida']),
+        'qualidade OR dor': lambda p: p['qualidade'].ou(p['dor']),
+        'NOT fibromialgia': lambda p: p['fibromialgia'].complemento(total_docs),
+        'vida AND NOT dor': lambda p: p['vida'].menos(p['dor']),
+        'acupuntura AND fibromialgia': lambda p: p['acupuntura'].e(p['fibromialgia']),
+        'hidro OR acupuntura': lambda p: p['hidro'].ou(p['acupuntura']),
+    }
+    consultas_set = {
+        'fibromialgia AND qualidade AND vida': lambda p: p['fibromialgia'] & p['qualidade'] & p['vida'],
+        'qualidade OR dor': lambda p: p['qualidade'] | p['dor'],
+        'NOT fibromialgia': lambda p: todos - p['fibromialgia'],
+        'vida AND NOT dor': lambda p: p['vida'] - p['dor'],
+        'acupuntura AND fibromialgia': lambda p: p['acupuntura'] & p['fibromialgia'],
+        'hidro OR acupuntura': lambda p: p['hidro'] | p['acupuntura'],
+    }
+    conjuntos = {t: {nomes[i] for i in v} for t, v in docs.items()}
+    backends = {b: {t: criar_postings(v, total_docs, b) for t, v in docs.items()} for b in ('lista', 'auto')}
+
+    def cronometrar(funcao, argumento):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            funcao(argumento)
+        return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+    print(f"\n{'consulta':>36} {'set (ms)':>9} {'lista (ms)':>11} {'auto (ms)':>10}")
+    for nome, funcao in consultas.items():
+        t_set = cronometrar(consultas_set[nome], conjuntos)
+        t_lista = cronometrar(funcao, backends['lista'])
+        t_auto = cronometrar(funcao, backends['auto'])
+        assert list(funcao(backends['auto'])) == list(funcao(backends['lista']))
+        print(f"{nome:>36} {t_set:>9.2f} {t_lista:>11.2f} {t_auto:>10.2f}")
+
+#----------------------------------------------------------------------------------------#
+def bench_extracao(copias: int, lista_trabalhadores: List[int]):
+    # Vazão da extração de resumos (arquivos/s) em função do número de processos.
+    # Usa cópias dos PDFs de docs/ numa pasta temporária para não tocar em results/.
+    from ExtratorDeResumos import ExtratorDeResumos
+    import logging
+    logging.getLogger().setLevel(logging.WARNING)
+
+    pasta_docs_origem = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'docs'))
+    pdfs = sorted(f for f in os.listdir(pasta_docs_origem) if f.lower().endswith('.pdf'))
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta_docs = os.path.join(pasta, 'docs')
+        os.makedirs(pasta_docs)
+        for c in range(copias):
+            for f in pdfs:
+                shutil.copy(os.path.join(pasta_docs_origem, f), os.path.join(pasta_docs, f"{c:03d} {f}"))
+        total = copias * len(pdfs)
+
+        print(f"{'processos':>10} {'tempo (s)':>10} {'arquivos/s':>11}")
+        referencia = None
+        for n in lista_trabalhadores:
+            extrator = ExtratorDeResumos(pasta_docs, os.path.join(pasta, f"results_{n}"))
+            inicio = time.perf_counter()
+            resultados = extrator.processar_documentos(trabalhadores=n)
+            decorrido = time.perf_counter() - inicio
+            nomes = [r['nome_arquivo'] for r in resultados]
+            if referencia is None:
+                referencia = nomes
+            elif nomes != referencia:
+                print("  aviso: ordem/conjunto de resultados diferente do primeiro modo")
+            print(f"{n:>10} {decorrido:>10.2f} {total / decorrido:>11.1f}")
+
+#----------------------------------------------------------------------------------------#
+def extrair_texto_acumulando(caminho_pdf: str, max_palavras_texto: int, paginas_lidas: List[int]) -> str:
+    # Caminho anterior de _extrair_texto_pdf: concatena as páginas com += e reconta as
+    # palavras do texto acumulado a cada página
+    from PyPDF2 import PdfReader
+    texto_completo = ""
+    with open(caminho_pdf, 'rb') as f:
+        leitor = PdfReader(f)
+        for pagina in leitor.pages:
+            texto = pagina.extract_text() or ""
+            paginas_lidas[0] += 1
+            texto_completo += texto + " "
+            if len(texto_completo.split()) >= max_palavras_texto:
+                break
+    return texto_completo.strip()
+
+#----------------------------------------------------------------------------------------#
+def gerar_teses(pasta_docs_origem: str, pasta: str, num_teses: int, paginas: int) -> List[str]:
+    # PDFs longos montados com páginas reais de docs/: cada "tese" começa por um artigo
+    # inteiro (capa, resumo, texto) e continua com páginas dos demais até `paginas` páginas
+    from PyPDF2 import PdfReader, PdfWriter
+    leitores = [PdfReader(os.path.join(pasta_docs_origem, f))
+                for f in sorted(os.listdir(pasta_docs_origem)) if f.lower().endswith('.pdf')]
+    caminhos = []
+    for t in range(num_teses):
+        escritor = PdfWriter()
+        ordem = leitores[t % len(leitores):] + leitores[:t % len(leitores)]
+        for pagina in itertools.islice((p for leitor in itertools.cycle(ordem) for p in leitor.pages), paginas):
+            escritor.add_page(pagina)
+        caminho = os.path.join(pasta, f"Tese {t:03d}.pdf")
+        with open(caminho, 'wb') as f:
+            escritor.write(f)
+        caminhos.append(caminho)
+    return caminhos
+
+#----------------------------------------------------------------------------------------#
+def bench_extracao_paginas(num_teses: int, paginas: int):
+    # Páginas extraídas, tempo e pico de memória alocada (tracemalloc) por PDF na extração do
+    # texto de teses longas: leitura acumulando o texto até o limite de palavras vs. geração
+    # página a página com parada no fim do resumo. Confere que os resumos são idênticos.
+    from ExtratorDeResumos import ExtratorDeResumos
+    import tracemalloc
+    import logging
+    logging.getLogger().setLevel(logging.WARNING)
+
+    pasta_docs_origem = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'docs'))
+    with tempfile.TemporaryDirectory() as pasta:
+        teses = gerar_teses(pasta_docs_origem, pasta, num_teses, paginas)
+        extrator = ExtratorDeResumos(pasta, os.path.join(pasta, 'results'))
+        paginas_lidas = [0]
+        paginas_pdf = extrator._paginas_pdf
+
+        def contando_paginas(caminho_pdf):
+            for texto in paginas_pdf(caminho_pdf):
+                paginas_lidas[0] += 1
+                yield texto
+        extrator._paginas_pdf = contando_paginas
+
+        def resumo(texto):
+            return extrator._extrair_resumo_de_texto(texto) or ' '.join(texto.split()[:extrator.fallback_palavras])
+
+        modos = (('acumulando', lambda c: extrair_texto_acumulando(c, extrator.max_palavras_texto, paginas_lidas)),
+                 ('por página', extrator._extrair_texto_pdf))
+        saidas = {}
+        print(f"{num_teses} PDFs de {paginas} páginas")
+        print(f"{'leitura':>12} {'páginas lidas':>14} {'tempo (s)':>10} {'ms/PDF':>8} {'pico médio (MB)':>16}")
+        for nome, extrair in modos:
+            paginas_lidas[0] = 0
+            picos = []
+            saidas[nome] = []
+            decorrido = 0.0
+            for caminho in teses:
+                tracemalloc.start()
+                inicio = time.perf_counter()
+                texto = extrair(caminho)
+                decorrido += time.perf_counter() - inicio
+                picos.append(tracemalloc.get_traced_memory()[1] / 2**20)
+                tracemalloc.stop()
+                saidas[nome].append(resumo(texto))
+            print(f"{nome:>12} {paginas_lidas[0]:>14} {decorrido:>10.2f} {decorrido * 1000 / num_teses:>8.1f} "
+                  f"{sum(picos) / len(picos):>16.2f}")
+        divergentes = sum(1 for a, b in zip(saidas['acumulando'], saidas['por página']) if a != b)
+        print(f"Resumos divergentes: {divergentes} de {num_teses}")
+
+#----------------------------------------------------------------------------------------#
+def contadores_es() -> Dict[str, int]:
+    # Bytes lidos/gravados por chamadas de sistema (rchar/wchar) pelo processo atual; vazio
+    # fora do Linux. Não inclui processos filhos: /proc/self/io não soma os já encerrados.
+    try:
+        with open('/proc/self/io') as f:
+            return {chave: int(valor) for chave, valor in (linha.split(': ') for linha in f)}
+    except OSError:
+        return {}
+
+#----------------------------------------------------------------------------------------#
+def bench_fluxo(copias: int, trabalhadores: int, tamanho_fila: int):
+    # Reconstrução completa de ponta a ponta (PDFs -> índice pronto): fases em lote ligadas
+    # por arquivos vs. etapas em fluxo ligadas por filas, com e sem as saídas intermediárias.
+    # A E/S medida é só a do processo principal (/proc/self/io): com trabalhadores > 1, a
+    # leitura dos PDFs e a gravação dos resumos nos processos trabalhadores não entram na
+    # conta, e a tabela avisa isso.
+    from ExtratorDeResumos import ExtratorDeResumos
+    from Normalizador import processar_pasta_results
+    from FluxoIndexacao import indexar_em_fluxo
+    import logging
+    import contextlib
+    import io
+    logging.getLogger().setLevel(logging.WARNING)
+
+    pasta_docs_origem = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'docs'))
+    pdfs = sorted(f for f in os.listdir(pasta_docs_origem) if f.lower().endswith('.pdf'))
+
+    def em_lote(pasta_docs, pasta_results):
+        ExtratorDeResumos(pasta_docs, pasta_results).processar_documentos(trabalhadores=trabalhadores)
+        processar_pasta_results(trabalhadores=trabalhadores, pasta_results=pasta_results)
+
+    modos = (('lote (arquivos)', em_lote),
+             ('fluxo', lambda d, r: indexar_em_fluxo(d, r, trabalhadores, True, tamanho_fila)),
+             ('fluxo sem intermediários', lambda d, r: indexar_em_fluxo(d, r, trabalhadores, False, tamanho_fila)))
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta_docs = os.path.join(pasta, 'docs')
+        os.makedirs(pasta_docs)
+        for c in range(copias):
+            for f in pdfs:
+                shutil.copy(os.path.join(pasta_docs_origem, f), os.path.join(pasta_docs, f"{c:03d} {f}"))
+        total = copias * len(pdfs)
+        print(f"{total} PDFs, {trabalhadores} processo(s), filas de {tamanho_fila} documentos")
+        print(f"{'modo':>26} {'tempo (s)':>10} {'PDFs/s':>8} {'lidos (MB)':>11} {'gravados (MB)':>14} "
+              f"{'escritas':>9} {'em disco (MB)':>14}")
+        if trabalhadores > 1:
+            print("(lidos, gravados e escritas: só o processo principal, sem os trabalhadores)")
+        rankings = {}
+        for nome, executar in modos:
+            pasta_results = os.path.join(pasta, f"results_{len(rankings)}")
+            es_antes = contadores_es()
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                executar(pasta_docs, pasta_results)
+            decorrido = time.perf_counter() - inicio
+            es_depois = contadores_es()
+            delta = {k: es_depois[k] - es_antes.get(k, 0) for k in es_depois}
+            em_disco = sum(os.path.getsize(os.path.join(raiz, f))
+                           for raiz, _, arquivos in os.walk(pasta_results) for f in arquivos)
+            print(f"{nome:>26} {decorrido:>10.2f} {total / decorrido:>8.1f} "
+                  f"{delta.get('rchar', 0) / 2**20:>11.1f} {delta.get('wchar', 0) / 2**20:>14.1f} "
+                  f"{delta.get('syscw', 0):>9} {em_disco / 2**20:>14.1f}")
+
+            indice = abrir_indice(os.path.join(pasta_results, 'frequencies_summary.json'))
+            modelo = ModeloEspacoVetorial(indice, cache_resultados=CacheResultados(0))
+            rankings[nome] = [sorted(modelo.buscar(q, 20)) for q in ('qualidade de vida', 'fibromialgia', 'dor crônica')]
+            indice.fechar()
+        referencia = rankings[modos[0][0]]
+        divergentes = sum(1 for r in rankings.values() if r != referencia)
+        print(f"Modos com resultados diferentes do lote: {divergentes}")
+
+#----------------------------------------------------------------------------------------#
+def bench_incremental(num_docs: int, novos: int, num_consultas: int):
+    # Adição de documentos ao índice aberto (cada um gravado como segmento, seguido da recarga
+    # do índice) vs. reconstrução completa a partir do JSON, e confere que as buscas dão o
+    # mesmo ranking nos dois casos
+    dados = gerar_corpus_sintetico(num_docs)
+    extras = gerar_corpus_sintetico(novos, semente=99)
+    consultas = gerar_consultas(num_consultas)
+    with tempfile.TemporaryDirectory() as pasta:
+        conjunto = ConjuntoSegmentos(os.path.join(pasta, 'segmentos'))
+        conjunto.recriar(dados)
+        indice = IndiceSegmentado(conjunto.pasta)
+        modelo = ModeloEspacoVetorial(indice, cache_resultados=CacheResultados(0))
+
+        inicio = time.perf_counter()
+        for nome, freq_list in extras.items():
+            conjunto.adicionar_lote({'Novo ' + nome: freq_list})
+            indice.recarregar()
+            dados['Novo ' + nome] = freq_list
+        adicao = (time.perf_counter() - inicio) / novos
+
+        inicio = time.perf_counter()
+        resultados = [modelo.buscar(c) for c in consultas]
+        primeira_busca = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        caminho = escrever_corpus_temporario(dados, pasta)
+        referencia_indice = IndiceInvertido(construir_de_json(caminho, os.path.join(pasta, 'reconstruido.bin')))
+        reconstrucao = time.perf_counter() - inicio
+        referencia = ModeloEspacoVetorial(referencia_indice, cache_resultados=CacheResultados(0))
+
+        inicio = time.perf_counter()
+        esperados = [referencia.buscar(c) for c in consultas]
+        busca_referencia = time.perf_counter() - inicio
+        indice.fechar()
+        referencia_indice.fechar()
+
+    print(f"Adição como segmento: {adicao * 1000:.3f} ms/documento")
+    print(f"Reconstrução completa: {reconstrucao * 1000:.1f} ms")
+    print(f"{num_consultas} consultas após a adição: {primeira_busca * 1000:.1f} ms "
+          f"(índice reconstruído: {busca_referencia * 1000:.1f} ms)")
+    divergencias = sum(1 for a, b in zip(resultados, esperados) if a != b)
+    print(f"Rankings divergentes: {divergencias} de {num_consultas}")
+
+#----------------------------------------------------------------------------------------#
+def bench_segmentos(num_docs: int, tamanho_lote: int, num_consultas: int):
+    # Ingestão contínua em lotes: cada lote vira um segmento (com mesclagem em segundo plano)
+    # vs. regravar o JSON inteiro e reconstruir o índice a cada lote. No fim compara a busca
+    # sobre os segmentos com a busca no índice único equivalente.
+    dados = gerar_corpus_sintetico(num_docs)
+    nomes = list(dados)
+    lotes = [nomes[i:i + tamanho_lote] for i in range(0, num_docs, tamanho_lote)]
+    consultas = gerar_consultas(num_consultas)
+    with tempfile.TemporaryDirectory() as pasta:
+        conjunto = ConjuntoSegmentos(os.path.join(pasta, 'segmentos'))
+        tempos_lote = []
+        maior_fan_out = 0
+        mesclagem = None
+        for lote in lotes:
+            inicio = time.perf_counter()
+            conjunto.adicionar_lote({n: dados[n] for n in lote})
+            tempos_lote.append(time.perf_counter() - inicio)
+            maior_fan_out = max(maior_fan_out, len(conjunto.ler()['segmentos']))
+            if mesclagem is None or not mesclagem.is_alive():
+                mesclagem = mesclar_em_segundo_plano(conjunto.pasta)
+        mesclagem.join()
+        mesclar_em_segundo_plano(conjunto.pasta).join()
+
+        # Referência: a cada lote, JSON acumulado regravado e índice refeito do zero (só o último é medido
+        # por completo; os anteriores são estimados pela proporção de documentos)
+        acumulado = {n: dados[n] for n in nomes}
+        inicio = time.perf_counter()
+        caminho = escrever_corpus_temporario(acumulado, pasta)
+        referencia_indice = IndiceInvertido(construir_de_json(caminho, os.path.join(pasta, 'unico.bin')))
+        ultimo_completo = time.perf_counter() - inicio
+        estimado_completo = sum(ultimo_completo * (i + 1) / len(lotes) for i in range(len(lotes)))
+
+        indice = IndiceSegmentado(conjunto.pasta)
+        num_segmentos = len(indice.segmentos)
+        modelos = {'segmentos': ModeloEspacoVetorial(indice, cache_resultados=CacheResultados(0)),
+                   'único': ModeloEspacoVetorial(referencia_indice, cache_resultados=CacheResultados(0))}
+        resultados = {}
+        for nome, modelo in modelos.items():
+            inicio = time.perf_counter()
+            resultados[nome] = [modelo.buscar(c) for c in consultas]
+            decorrido = time.perf_counter() - inicio
+            print(f"Busca ({nome}): {decorrido * 1000 / num_consultas:.2f} ms/consulta")
+        indice.fechar()
+        referencia_indice.fechar()
+
+    print(f"{len(lotes)} lotes de {tamanho_lote} documentos")
+    print(f"Gravação do lote como segmento: média {sum(tempos_lote) * 1000 / len(lotes):.1f} ms, "
+          f"máximo {max(tempos_lote) * 1000:.1f} ms, total {sum(tempos_lote):.2f} s")
+    print(f"JSON + reconstrução completa por lote: último {ultimo_completo * 1000:.1f} ms, "
+          f"total estimado {estimado_completo:.2f} s")
+    print(f"Segmentos: máximo durante a ingestão {maior_fan_out}, após mesclagem {num_segmentos}")
+    divergencias = sum(1 for a, b in zip(resultados['segmentos'], resultados['único']) if a != b)
+    print(f"Rankings divergentes: {divergencias} de {num_consultas}")
+
+#----------------------------------------------------------------------------------------#
+def tokenizar_por_token(texto: str, stopwords: set) -> List[str]:
+    # Caminho anterior de normalizar_arquivo: normalizar_token chamado token a token
+    from Normalizador import normalizar_token
+    texto = texto.replace('-\n', '').replace('\n', ' ')
+    tokens = []
+    for tok in re.split(r"\s+", texto):
+        if not tok:
+            continue
+        t = normalizar_token(tok)
+        if not t or len(t) < 2 or t in stopwords:
+            continue
+        tokens.append(t)
+    return tokens
+
+#----------------------------------------------------------------------------------------#
+def bench_tokenizador(repeticoes: int):
+    # Tokens por segundo do tokenizador de passada única vs. normalizar_token por token, sobre
+    # os resumos de results/resumo. Confere que a saída é idêntica, byte a byte, aos arquivos
+    # _termos.txt de results/normalizado.
+    from Normalizador import tokenizar, obter_analisador, ETAPAS_LEGADO
+    raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    pasta_resumos = os.path.join(raiz, 'results', 'resumo')
+    pasta_normalizado = os.path.join(raiz, 'results', 'normalizado')
+    # os arquivos de results/normalizado foram gerados com o analisador antigo
+    analisador = obter_analisador(ETAPAS_LEGADO)
+    stopwords = analisador.stopwords
+
+    textos = {}
+    for nome in sorted(os.listdir(pasta_resumos)):
+        if nome.endswith('_resumo.txt'):
+            with open(os.path.join(pasta_resumos, nome), 'r', encoding='utf-8') as f:
+                textos[nome[:-len('_resumo.txt')]] = f.read()
+
+    divergentes = 0
+    for base_nome, texto in textos.items():
+        caminho_termos = os.path.join(pasta_normalizado, f"{base_nome}_termos.txt")
+        if not os.path.exists(caminho_termos):
+            continue
+        with open(caminho_termos, 'rb') as f:
+            esperado = f.read()
+        if ' '.join(tokenizar(texto, analisador)).encode('utf-8') != esperado:
+            divergentes += 1
+            print(f"  divergente: {base_nome}")
+    print(f"Arquivos _termos.txt divergentes: {divergentes} de {len(textos)}")
+
+    total_tokens = sum(len(t.split()) for t in textos.values()) * repeticoes
+    print(f"{'tokenizador':>22} {'tempo (s)':>10} {'tokens/s':>12}")
+    for nome, funcao in (('por token', tokenizar_por_token), ('passada única', lambda t, s: list(tokenizar(t, analisador)))):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            for texto in textos.values():
+                funcao(texto, stopwords)
+        decorrido = time.perf_counter() - inicio
+        print(f"{nome:>22} {decorrido:>10.3f} {total_tokens / decorrido:>12,.0f}")
+
+#----------------------------------------------------------------------------------------#
+def bench_normalizacao(tokens: int, capacidades: List[int]):
+    # Custo de normalizar um fluxo de tokens com distribuição de Zipf (formas de superfície
+    # de results/resumo, como "Qualidade," e "vida.") sem cache e com LRUs de tamanhos
+    # diferentes; a última linha é o cache compartilhado por indexação e consultas
+    from functools import lru_cache
+    from Normalizador import normalizar_token, obter_analisador, ETAPAS_LEGADO
+    pasta_resumos = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'results', 'resumo'))
+    contagem: Dict[str, int] = {}
+    for nome in sorted(os.listdir(pasta_resumos)):
+        with open(os.path.join(pasta_resumos, nome), 'r', encoding='utf-8') as f:
+            for forma in f.read().split():
+                contagem[forma] = contagem.get(forma, 0) + 1
+    formas = sorted(contagem, key=lambda f: (-contagem[f], f))
+    rng = random.Random(42)
+    fluxo = rng.choices(formas, weights=[1 / r for r in range(1, len(formas) + 1)], k=tokens)
+    print(f"{len(formas)} formas distintas, {tokens} tokens no fluxo")
+
+    print(f"{'cache':>22} {'tempo (s)':>10} {'tokens/s':>12} {'acertos':>8} {'ocupação':>9}")
+    inicio = time.perf_counter()
+    for forma in fluxo:
+        normalizar_token(forma)
+    decorrido = time.perf_counter() - inicio
+    print(f"{'sem cache':>22} {decorrido:>10.3f} {tokens / decorrido:>12,.0f} {'-':>8} {'-':>9}")
+
+    for capacidade in capacidades:
+        funcao = lru_cache(maxsize=capacidade)(normalizar_token)
+        inicio = time.perf_counter()
+        for forma in fluxo:
+            funcao(forma)
+        decorrido = time.perf_counter() - inicio
+        info = funcao.cache_info()
+        print(f"{f'LRU {capacidade}':>22} {decorrido:>10.3f} {tokens / decorrido:>12,.0f} "
+              f"{info.hits / tokens:>8.1%} {info.currsize:>9}")
+
+    analisador = obter_analisador(ETAPAS_LEGADO)
+    analisador.limpar_cache()
+    inicio = time.perf_counter()
+    for forma in fluxo:
+        analisador.termo(forma)
+    decorrido = time.perf_counter() - inicio
+    estat = analisador.estatisticas_cache()
+    print(f"{'Analisador.termo':>22} {decorrido:>10.3f} {tokens / decorrido:>12,.0f} "
+          f"{estat['taxa_acertos']:>8.1%} {estat['tamanho']:>9}")
+
+#----------------------------------------------------------------------------------------#
+def bench_analisadores():
+    # Vocabulário, número de postings e tamanho do índice gerado a partir de results/resumo
+    # com o analisador antigo (plural simples) e com o padrão (radicalizador RSLP)
+    from Normalizador import tokenizar, obter_analisador, ETAPAS_LEGADO, ETAPAS_PADRAO
+    from IndiceInvertido import escrever_indice
+    pasta_resumos = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'results', 'resumo'))
+    textos = {}
+    for nome in sorted(os.listdir(pasta_resumos)):
+        if nome.endswith('_resumo.txt'):
+            with open(os.path.join(pasta_resumos, nome), 'r', encoding='utf-8') as f:
+                textos[nome[:-len('_resumo.txt')] + '.pdf'] = f.read()
+
+    pasta = tempfile.mkdtemp(prefix='bench_analisadores_')
+    try:
+        medidas = {}
+        print(f"{'etapas':>22} {'vocabulário':>12} {'postings':>10} {'índice (bytes)':>15} {'tempo (s)':>10}")
+        for etapas in (ETAPAS_LEGADO, ETAPAS_PADRAO):
+            analisador = obter_analisador(etapas)
+            analisador.limpar_cache()
+            inicio = time.perf_counter()
+            dados = {}
+            for pdf_nome, texto in textos.items():
+                freqs = {}
+                for termo in tokenizar(texto, analisador):
+                    freqs[termo] = freqs.get(termo, 0) + 1
+                dados[pdf_nome] = sorted(freqs.items(), key=lambda x: (-x[1], x[0]))
+            decorrido = time.perf_counter() - inicio
+            caminho = os.path.join(pasta, '_'.join(etapas) + '.bin')
+            escrever_indice(dados, caminho, {'analisador': analisador.configuracao})
+            vocabulario = len({t for freqs in dados.values() for t, _ in freqs})
+            postings = sum(len(freqs) for freqs in dados.values())
+            medidas[etapas] = (vocabulario, postings, os.path.getsize(caminho))
+            print(f"{'+'.join(etapas):>22} {vocabulario:>12,} {postings:>10,} {medidas[etapas][2]:>15,} {decorrido:>10.3f}")
+
+        antes, depois = medidas[ETAPAS_LEGADO], medidas[ETAPAS_PADRAO]
+        print(f"Redução com RSLP: vocabulário {1 - depois[0] / antes[0]:.1%}, "
+              f"postings {1 - depois[1] / antes[1]:.1%}, índice {1 - depois[2] / antes[2]:.1%}")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+#----------------------------------------------------------------------------------------#
+def bench_normalizacao_paralela(copias: int, lista_trabalhadores: List[int]):
+    # Tempo e pico de memória (tracemalloc, processo principal) da normalização completa em
+    # função do número de processos, sobre cópias dos resumos de results/resumo numa pasta
+    # temporária. "acumulado" reproduz o caminho anterior: todas as frequências num dict antes
+    # de gravar o índice. Confere que todos os modos geram o mesmo JSON.
+    import io
+    import tracemalloc
+    import contextlib
+    import Normalizador
+    from Normalizador import processar_pasta_results, obter_analisador, ETAPAS_PADRAO
+    pasta_resumos_origem = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'results', 'resumo'))
+    resumos = sorted(f for f in os.listdir(pasta_resumos_origem) if f.endswith('_resumo.txt'))
+
+    def acumulado(pasta_results: str):
+        pasta_resumos = os.path.join(pasta_results, 'resumo')
+        pasta_normalizado = os.path.join(pasta_results, 'normalizado')
+        os.makedirs(pasta_normalizado, exist_ok=True)
+        analisador = obter_analisador(ETAPAS_PADRAO)
+        dados = {}
+        for nome in os.listdir(pasta_resumos):
+            caminho_saida = os.path.join(pasta_normalizado, nome[:-len('_resumo.txt')] + '_termos.txt')
+            freqs = Normalizador.normalizar_arquivo(os.path.join(pasta_resumos, nome), caminho_saida, analisador)
+            dados[nome[:-len('_resumo.txt')] + '.pdf'] = [[t, c] for t, c, _ in freqs]
+        with open(os.path.join(pasta_results, 'frequencies_summary.json'), 'w', encoding='utf-8') as jf:
+            json.dump(dados, jf, ensure_ascii=False, indent=2)
+        ConjuntoSegmentos(os.path.join(pasta_results, 'segmentos')).recriar(dados, analisador.configuracao)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        modos = [('acumulado', None)] + [(f"{n} processo(s)", n) for n in lista_trabalhadores]
+        print(f"{copias * len(resumos)} resumos")
+        print(f"{'modo':>14} {'tempo (s)':>10} {'arquivos/s':>11} {'pico (MB)':>10}")
+        referencia = None
+        for rotulo, n in modos:
+            medidas = []
+            for medir_memoria in (False, True):
+                pasta_results = os.path.join(pasta, f"results_{len(medidas)}_{n}")
+                os.makedirs(os.path.join(pasta_results, 'resumo'))
+                for c in range(copias):
+                    for f in resumos:
+                        shutil.copy(os.path.join(pasta_resumos_origem, f), os.path.join(pasta_results, 'resumo', f"{c:04d} {f}"))
+                if medir_memoria:
+                    tracemalloc.start()
+                inicio = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if n is None:
+                        acumulado(pasta_results)
+                    else:
+                        processar_pasta_results(trabalhadores=n, pasta_results=pasta_results)
+                medidas.append(time.perf_counter() - inicio)
+                if medir_memoria:
+                    medidas.append(tracemalloc.get_traced_memory()[1] / 2**20)
+                    tracemalloc.stop()
+                with open(os.path.join(pasta_results, 'frequencies_summary.json'), 'rb') as f:
+                    conteudo = f.read()
+                if referencia is None:
+                    referencia = conteudo
+                elif conteudo != referencia:
+                    print(f"  aviso: JSON de '{rotulo}' diferente do primeiro modo")
+                shutil.rmtree(pasta_results)
+            decorrido, _, pico = medidas
+            print(f"{rotulo:>14} {decorrido:>10.2f} {copias * len(resumos) / decorrido:>11.1f} {pico:>10.1f}")
+
+#----------------------------------------------------------------------------------------#
+def medir_spimi(caminho: str, num_docs: int, memoria_maxima: int):
+    # Executado em um processo filho: constrói o índice a partir de um fluxo de documentos
+    # sintéticos (o corpus nunca fica inteiro em memória) com o orçamento dado (0 = sem limite)
+    inicio = time.perf_counter()
+    escrever_indice(gerar_documentos_sinteticos(num_docs), caminho, memoria_maxima=memoria_maxima or None)
+    print(json.dumps({'tempo': time.perf_counter() - inicio, 'pico_rss_kb': pico_rss_kb()}))
+
+#----------------------------------------------------------------------------------------#
+def bench_spimi(num_docs: int, orcamentos_mb: List[float]):
+    # Construção em memória vs. SPIMI com orçamentos decrescentes: tempo, pico de RSS de cada
+    # construção (processo filho) e conferência de que o índice gerado é idêntico
+    import filecmp
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f"{num_docs} documentos")
+        print(f"{'orçamento (MB)':>15} {'tempo (s)':>10} {'docs/s':>9} {'pico RSS (MB)':>14} {'índice (MB)':>12} {'idêntico':>9}")
+        referencia = None
+        for orcamento in [0] + orcamentos_mb:
+            caminho = os.path.join(pasta, f"indice_{orcamento}.bin")
+            saida = subprocess.run([sys.executable, os.path.abspath(__file__), '_spimi', caminho, str(num_docs),
+                                    str(int(orcamento * 2**20))],
+                                   capture_output=True, text=True, check=True)
+            r = json.loads(saida.stdout.strip().splitlines()[-1])
+            referencia = referencia or caminho
+            rotulo = f"{orcamento:g}" if orcamento else 'sem limite'
+            identico = 'sim' if filecmp.cmp(referencia, caminho, shallow=False) else 'NÃO'
+            print(f"{rotulo:>15} {r['tempo']:>10.2f} {num_docs / r['tempo']:>9.0f} {r['pico_rss_kb'] / 1024:>14.1f} "
+                  f"{os.path.getsize(caminho) / 2**20:>12.1f} {identico:>9}")
+
+#----------------------------------------------------------------------------------------#
+def bench_cache_consultas(num_docs: int, num_consultas: int, distintas: int, capacidade: int):
+    # Carga com consultas repetidas (popularidade Zipf sobre um repertório de consultas
+    # distintas) nos dois modelos, sem e com o cache de resultados; depois, uma atualização
+    # do índice deve invalidar o cache sem deixar resultados antigos
+    rng = random.Random(3)
+    repertorio = gerar_consultas(distintas)
+    pesos_acumulados = list(itertools.accumulate(1.0 / (i + 1) for i in range(distintas)))
+    carga = rng.choices(repertorio, cum_weights=pesos_acumulados, k=num_consultas)
+    with tempfile.TemporaryDirectory() as pasta:
+        conjunto = ConjuntoSegmentos(os.path.join(pasta, 'segmentos'))
+        conjunto.recriar(gerar_corpus_sintetico(num_docs))
+        indice = IndiceSegmentado(conjunto.pasta)
+        print(f"{num_consultas} consultas, {distintas} distintas, capacidade {capacidade}")
+        print(f"{'modelo':>10} {'sem cache (ms)':>15} {'com cache (ms)':>15} {'ganho':>7} {'acertos':>8}")
+        for nome in ('vetorial', 'booleano'):
+            tempos = []
+            resultados = []
+            for cache in (CacheResultados(0), CacheResultados(capacidade)):
+                if nome == 'vetorial':
+                    consultar = ModeloEspacoVetorial(indice, cache_resultados=cache).buscar
+                else:
+                    consultar = ModeloBooleano(indice, cache_resultados=cache).processar_consulta
+                carga_modelo = carga if nome == 'vetorial' else [c.replace(' ', ' or ') for c in carga]
+                inicio = time.perf_counter()
+                resultados.append([consultar(c) for c in carga_modelo])
+                tempos.append((time.perf_counter() - inicio) * 1000 / num_consultas)
+            estatisticas = cache.estatisticas()
+            print(f"{nome:>10} {tempos[0]:>15.3f} {tempos[1]:>15.3f} {tempos[0] / tempos[1]:>6.1f}x "
+                  f"{estatisticas['taxa_acertos']:>7.1%}")
+            print(f"{'':>10} economia estimada {estatisticas['economia_s']:.2f} s, "
+                  f"custo médio de uma falha {estatisticas['custo_medio_falha_ms']:.3f} ms")
+            if resultados[0] != resultados[1]:
+                print("  aviso: resultados com cache diferentes dos calculados")
+
+        # Invalidação: após adicionar um documento, o modelo com cache deve responder como um sem cache
+        cache = CacheResultados(capacidade)
+        modelo = ModeloEspacoVetorial(indice, cache_resultados=cache)
+        for c in repertorio:
+            modelo.buscar(c)
+        novo = [[t, 3] for t in repertorio[0].split()]
+        conjunto.adicionar_lote({'Documento novo.pdf': novo})
+        indice.recarregar()
+        referencia = ModeloEspacoVetorial(indice, cache_resultados=CacheResultados(0))
+        divergentes = sum(1 for c in repertorio if modelo.buscar(c) != referencia.buscar(c))
+        print(f"Após atualizar o índice: {cache.estatisticas()['invalidacoes']} invalidação(ões), "
+              f"{divergentes} resultado(s) desatualizado(s)")
+        indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+def bench_lote(num_docs: int, num_consultas: int, limite: int):
+    # Vazão (consultas/s) de buscar em laço (exaustivo e MaxScore, sem cache de resultados)
+    # vs. buscar_lote com produto de matrizes esparsas; confere que os rankings coincidem
+    from ModeloEspacoVetorial import sparse
+    if sparse is None:
+        print("NumPy/SciPy não instalados: buscar_lote usa o mesmo laço de buscar")
+        return
+    consultas = gerar_consultas(num_consultas)
+    with tempfile.TemporaryDirectory() as pasta:
+        indice = IndiceInvertido(construir_de_json(escrever_corpus_temporario(gerar_corpus_sintetico(num_docs), pasta)))
+        modelo = ModeloEspacoVetorial(indice, cache_resultados=CacheResultados(0))
+        print(f"{num_docs} documentos, {num_consultas} consultas, top-{limite}")
+        print(f"{'caminho':>22} {'tempo (s)':>10} {'consultas/s':>12}")
+        resultados = {}
+        for modo in ('exaustivo', 'maxscore'):
+            inicio = time.perf_counter()
+            resultados[modo] = [modelo.buscar(c, limite, modo=modo) for c in consultas]
+            decorrido = time.perf_counter() - inicio
+            print(f"{'buscar (' + modo + ')':>22} {decorrido:>10.2f} {num_consultas / decorrido:>12.1f}")
+
+        inicio = time.perf_counter()
+        modelo.matriz_documentos()
+        montagem = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        resultados['lote'] = modelo.buscar_lote(consultas, limite)
+        decorrido = time.perf_counter() - inicio
+        print(f"{'buscar_lote':>22} {decorrido:>10.2f} {num_consultas / decorrido:>12.1f}")
+        print(f"Montagem da matriz termos x documentos (uma vez por versão do índice): {montagem:.2f} s")
+
+        divergentes = sum(1 for a, b in zip(resultados['exaustivo'], resultados['lote'])
+                          if [d for d, _ in a] != [d for d, _ in b])
+        maior_diferenca = max((abs(x - y) for a, b in zip(resultados['exaustivo'], resultados['lote'])
+                               for (_, x), (_, y) in zip(a, b)), default=0.0)
+        print(f"Rankings divergentes: {divergentes} de {num_consultas}; maior diferença de escore: {maior_diferenca:.1e}")
+        indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+def bm25_varrendo(indice, termos: List[str], limite: int, k1: float, b: float) -> List[Tuple[str, float]]:
+    # BM25 sem nada pré-calculado: a cada consulta percorre todos os documentos para obter o
+    # comprimento médio e pontua cada documento pelos seus vetores
+    docs = list(indice.documentos())
+    comprimentos = {doc: indice.comprimento(doc) for doc in docs}
+    medio = sum(comprimentos.values()) / len(docs)
+    consulta = {t: q for t, q in Counter(termos).items() if t in indice}
+    idfs = {t: math.log(1 + (len(docs) - indice.df(t) + 0.5) / (indice.df(t) + 0.5)) for t in consulta}
+    escores = []
+    for doc in docs:
+        escore = 0.0
+        for termo, freq in indice.vetor_documento(doc):
+            if termo in consulta:
+                escore += consulta[termo] * idfs[termo] * freq * (k1 + 1) / (
+                    freq + k1 * (1 - b + b * comprimentos[doc] / medio))
+        if escore > 0:
+            escores.append((doc, escore))
+    return [(indice.nome(doc), escore) for doc, escore in heapq.nsmallest(limite, escores, key=lambda x: (-x[1], x[0]))]
+
+def bench_bm25(num_docs: int, num_consultas: int, limite: int, k1: float, b: float):
+    # Latência do BM25 nos caminhos do cosseno (acumuladores sobre as postings, MaxScore e
+    # buscar_lote) vs. um BM25 que varre todos os documentos; confere que os caminhos dão o
+    # mesmo ranking e mede quanto o top-k do BM25 se sobrepõe ao do cosseno
+    consultas = gerar_consultas(num_consultas)
+    with tempfile.TemporaryDirectory() as pasta:
+        indice = IndiceInvertido(construir_de_json(escrever_corpus_temporario(gerar_corpus_sintetico(num_docs), pasta)))
+        modelo = ModeloEspacoVetorial(indice, cache_resultados=CacheResultados(0))
+        print(f"{num_docs} documentos, {num_consultas} consultas, top-{limite}, k1={k1}, b={b}")
+        print(f"{'pontuação':>10} {'caminho':>10} {'ms/consulta':>12}")
+        resultados = {}
+        for pontuador in (PontuadorCosseno(), PontuadorBM25(k1, b)):
+            modelo.pontuador = pontuador
+            nome = pontuador.chave[0]
+            for modo in ('exaustivo', 'maxscore', 'lote'):
+                inicio = time.perf_counter()
+                if modo == 'lote':
+                    modelo.matriz_documentos()  # montada uma vez por versão do índice
+                    inicio = time.perf_counter()
+                    resultados[nome, modo] = modelo.buscar_lote(consultas, limite)
+                else:
+                    resultados[nome, modo] = [modelo.buscar(c, limite, modo=modo) for c in consultas]
+                decorrido = time.perf_counter() - inicio
+                print(f"{nome:>10} {modo:>10} {decorrido * 1000 / num_consultas:>12.3f}")
+
+        inicio = time.perf_counter()
+        resultados['bm25', 'varredura'] = [bm25_varrendo(indice, modelo.termos_consulta(c), limite, k1, b)
+                                           for c in consultas]
+        decorrido = time.perf_counter() - inicio
+        print(f"{'bm25':>10} {'varredura':>10} {decorrido * 1000 / num_consultas:>12.3f}")
+
+        referencia = resultados['bm25', 'exaustivo']
+        for modo in ('maxscore', 'lote', 'varredura'):
+            divergentes = sum(1 for a, b_ in zip(referencia, resultados['bm25', modo])
+                              if [d for d, _ in a] != [d for d, _ in b_])
+            print(f"BM25 {modo} vs. exaustivo: {divergentes} rankings divergentes de {num_consultas}")
+        comuns = sum(len({d for d, _ in a} & {d for d, _ in c})
+                     for a, c in zip(referencia, resultados['cosseno', 'exaustivo']))
+        print(f"Documentos em comum no top-{limite} do BM25 e do cosseno: {comuns / num_consultas:.1f} por consulta")
+        indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+def _ocorre(termos: List[str], frase: List[str]) -> List[int]:
+    n = len(frase)
+    return [i for i in range(len(termos) - n + 1) if termos[i:i + n] == frase]
+
+#----------------------------------------------------------------------------------------#
+def casa_varrendo(termos: List[str], no) -> bool:
+    # Caminho sem índice posicional: procura a frase (ou o NEAR/k entre dois termos) na
+    # sequência de termos do _termos.txt do documento
+    from ConsultaBooleana import Frase
+    if isinstance(no, Frase):
+        return bool(_ocorre(termos, no.termos))
+    a, b = [no.esquerda.termo], [no.direita.termo]
+    inicios_b = _ocorre(termos, b)
+    return any(0 < j - (i + len(a) - 1) <= no.distancia or 0 < i - (j + len(b) - 1) <= no.distancia
+               for i in _ocorre(termos, a) for j in inicios_b)
+
+#----------------------------------------------------------------------------------------#
+def bench_frases(copias: int, num_consultas: int):
+    # Frases e NEAR/k: intersecção posicional no índice vs. varredura dos _termos.txt de todos
+    # os documentos, sobre cópias (com ~10% dos termos descartados ao acaso) dos arquivos de
+    # results/normalizado. Mostra também o AND dos mesmos termos (sem posições), o tamanho
+    # que as posições acrescentam ao índice e confere que os dois caminhos concordam.
+    from ConsultaBooleana import Termo, Frase, Proximidade
+    from BuscaPosicional import documentos_posicionais
+    from IndiceInvertido import termos_posicionais
+    pasta_origem = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'results', 'normalizado'))
+    originais = []
+    for nome in sorted(os.listdir(pasta_origem)):
+        if nome.endswith('_termos.txt'):
+            with open(os.path.join(pasta_origem, nome), 'r', encoding='utf-8') as f:
+                originais.append(f.read().split())
+    rnd = random.Random(24)
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta_normalizado = os.path.join(pasta, 'normalizado')
+        os.makedirs(pasta_normalizado)
+        documentos = {}
+        for c in range(copias):
+            for i, termos in enumerate(originais):
+                termos = [t for t in termos if rnd.random() >= 0.1]
+                nome = f"{c:04d}_{i:03d}"
+                with open(os.path.join(pasta_normalizado, nome + '_termos.txt'), 'w', encoding='utf-8') as f:
+                    f.write(' '.join(termos))
+                documentos[nome + '.pdf'] = termos
+
+        consultas = []
+        while len(consultas) < num_consultas:
+            termos = rnd.choice(list(documentos.values()))
+            if len(termos) < 8:
+                continue
+            i = rnd.randrange(len(termos) - 5)
+            if len(consultas) % 2:
+                consultas.append(Frase(termos[i:i + rnd.randint(2, 3)]))
+            else:
+                consultas.append(Proximidade(Termo(termos[i]), Termo(termos[i + rnd.randint(1, 5)]), rnd.randint(1, 5)))
+
+        com_posicoes = os.path.join(pasta, 'posicional.bin')
+        sem_posicoes = os.path.join(pasta, 'simples.bin')
+        escrever_indice(((n, termos_posicionais(t)) for n, t in documentos.items()), com_posicoes)
+        escrever_indice(((n, [p[:2] for p in termos_posicionais(t)]) for n, t in documentos.items()), sem_posicoes)
+        indice = IndiceInvertido(com_posicoes)
+        print(f"{len(documentos)} documentos, {num_consultas} consultas (metade frases, metade NEAR/k)")
+        print(f"Índice: {os.path.getsize(sem_posicoes):,} bytes sem posições, {os.path.getsize(com_posicoes):,} com posições")
+
+        def posicional(no):
+            return {indice.nome(d) for d in documentos_posicionais(indice, no)}
+
+        def varredura(no):
+            encontrados = set()
+            for nome in os.listdir(pasta_normalizado):
+                with open(os.path.join(pasta_normalizado, nome), 'r', encoding='utf-8') as f:
+                    if casa_varrendo(f.read().split(), no):
+                        encontrados.add(nome[:-len('_termos.txt')] + '.pdf')
+            return encontrados
+
+        def conjuncao(no):
+            termos = no.termos if isinstance(no, Frase) else [no.esquerda.termo, no.direita.termo]
+            docs = indice.postings(termos[0])[0]
+            for termo in termos[1:]:
+                docs = intersecao(docs, indice.postings(termo)[0])
+            return {indice.nome(d) for d in docs}
+
+        print(f"{'caminho':>22} {'ms/consulta':>12} {'docs/consulta':>14}")
+        resultados = {}
+        for rotulo, funcao in (('varredura _termos.txt', varredura), ('posicional', posicional),
+                               ('AND sem posições', conjuncao)):
+            inicio = time.perf_counter()
+            resultados[rotulo] = [funcao(no) for no in consultas]
+            decorrido = time.perf_counter() - inicio
+            media = sum(map(len, resultados[rotulo])) / num_consultas
+            print(f"{rotulo:>22} {decorrido * 1000 / num_consultas:>12.3f} {media:>14.1f}")
+        divergentes = sum(1 for a, b in zip(resultados['varredura _termos.txt'], resultados['posicional']) if a != b)
+        print(f"Consultas com resultados diferentes entre varredura e índice posicional: {divergentes}")
+        indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+async def _ler_resposta_http(leitor) -> Tuple[int, bytes]:
+    status = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        if nome.strip().lower() == 'content-length':
+            tamanho = int(valor)
+    return status, await leitor.readexactly(tamanho)
+
+#----------------------------------------------------------------------------------------#
+async def _carga_http(host: str, porta: int, consultas: List[str], clientes: int, requisicoes: int,
+                      durante=None) -> Dict:
+    # `clientes` conexões keep-alive disparam, alternando os dois modelos, `requisicoes`
+    # consultas no total; `durante` (opcional) roda em paralelo, numa thread
+    import asyncio
+    from urllib.parse import quote
+    latencias: List[float] = []
+    erros = []
+    geracoes = set()
+    pendentes = iter(range(requisicoes))
+
+    async def cliente():
+        leitor, escritor = await asyncio.open_connection(host, porta)
+        try:
+            for n in pendentes:
+                consulta = consultas[n % len(consultas)]
+                if n % 2:
+                    alvo = f"/busca/vetorial?q={quote(consulta)}&limite=10"
+                else:
+                    alvo = f"/busca/booleana?q={quote(consulta.replace(' ', ' or '))}"
+                inicio = time.perf_counter()
+                escritor.write(f"GET {alvo} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+                status, corpo = await _ler_resposta_http(leitor)
+                latencias.append(time.perf_counter() - inicio)
+                if status == 200:
+                    geracoes.add(json.loads(corpo)['geracao'])
+                else:
+                    erros.append((status, corpo[:200]))
+        finally:
+            escritor.close()
+
+    inicio = time.perf_counter()
+    tarefas = [cliente() for _ in range(clientes)]
+    if durante is not None:
+        tarefas.append(asyncio.get_running_loop().run_in_executor(None, durante))
+    await asyncio.gather(*tarefas)
+    return {'latencias': latencias, 'erros': erros, 'geracoes': sorted(geracoes),
+            'decorrido': time.perf_counter() - inicio}
+
+#----------------------------------------------------------------------------------------#
+def bench_servidor(endereco: str, num_docs: int, clientes: int, requisicoes: int):
+    # Teste de carga do ServidorConsultas: latências p50/p90/p99 e vazão. Sem `endereco`,
+    # sobe um servidor num processo filho sobre um corpus sintético e, no meio da carga,
+    # grava um lote novo no índice para que o servidor troque de geração sem derrubar
+    # nenhuma requisição.
+    import asyncio
+    consultas = gerar_consultas(500)
+    with tempfile.TemporaryDirectory() as pasta:
+        servidor = None
+        durante = None
+        if endereco:
+            host, porta = endereco.rsplit(':', 1)
+        else:
+            dados = gerar_corpus_sintetico(num_docs)
+            caminho = escrever_corpus_temporario(dados, pasta)
+            preparar_segmentos(caminho)
+            servidor = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ServidorConsultas.py'),
+                                         '--porta', '0', '--json', caminho, '--intervalo', '0.2'],
+                                        stdout=subprocess.PIPE, text=True)
+            for linha in servidor.stdout:
+                if linha.startswith('Servindo consultas em http://'):
+                    host, porta = linha.strip().rsplit('/', 1)[1].rsplit(':', 1)
+                    break
+            else:
+                raise RuntimeError("O servidor não subiu")
+            extras = gerar_corpus_sintetico(max(1, num_docs // 20), semente=99)
+
+            def durante():
+                # re-indexação concorrente: um lote novo vira segmento e o servidor recarrega
+                time.sleep(0.5)
+                ConjuntoSegmentos(pasta_segmentos(caminho)).adicionar_lote({'Novo ' + n: v for n, v in extras.items()})
+        try:
+            r = asyncio.run(_carga_http(host, int(porta), consultas, clientes, requisicoes, durante))
+        finally:
+            if servidor is not None:
+                servidor.terminate()
+                servidor.wait()
+
+    latencias = sorted(r['latencias'])
+
+    def percentil(p: float) -> float:
+        return latencias[min(len(latencias) - 1, int(p * len(latencias)))] * 1000
+
+    print(f"{requisicoes} requisições, {clientes} clientes simultâneos (keep-alive), metade booleanas e metade vetoriais")
+    print(f"Vazão: {requisicoes / r['decorrido']:.1f} req/s")
+    print(f"Latência (ms): p50 {percentil(0.50):.2f}  p90 {percentil(0.90):.2f}  "
+          f"p99 {percentil(0.99):.2f}  máx {latencias[-1] * 1000:.2f}")
+    print(f"Erros: {len(r['erros'])}; gerações do índice que responderam: {r['geracoes']}")
+    for status, corpo in r['erros'][:5]:
+        print(f"  {status}: {corpo!r}")
+
+#----------------------------------------------------------------------------------------#
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de desempenho do sistema de busca.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_carga = sub.add_parser("carga", help="Tempo de construção e de abertura do índice em função do tamanho do corpus.")
+    p_carga.add_argument("--tamanhos", type=int, nargs='+', default=[1000, 2000, 4000, 8000])
+    p_carga.add_argument("--repeticoes", type=int, default=3)
+
+    p_topk = sub.add_parser("topk", help="Busca vetorial exaustiva vs. MaxScore (tempo e igualdade dos rankings).")
+    p_topk.add_argument("--docs", type=int, default=20000)
+    p_topk.add_argument("--consultas", type=int, default=500)
+    p_topk.add_argument("--limite", type=int, default=10)
+
+    p_recarga = sub.add_parser("recarga", help="Recarga dos dois modelos com índices separados vs. compartilhado.")
+    p_recarga.add_argument("--docs", type=int, default=20000)
+    p_recarga.add_argument("--recargas", type=int, default=3)
+    p_recarga.add_argument("--consultas", type=int, default=200)
+
+    p_inter = sub.add_parser("intersecao", help="Memória por posting e tempo de AND: sets de nomes vs. arrays de DocIDs.")
+    p_inter.add_argument("--docs", type=int, default=1000000)
+    p_inter.add_argument("--repeticoes", type=int, default=5)
+
+    p_bitmap = sub.add_parser("bitmap", help="Consultas booleanas de densidade mista: sets, listas ordenadas e bitmaps.")
+    p_bitmap.add_argument("--docs", type=int, default=500000)
+    p_bitmap.add_argument("--repeticoes", type=int, default=3)
+
+    p_extracao = sub.add_parser("extracao", help="Vazão da extração de PDFs em função do número de processos.")
+    p_extracao.add_argument("--copias", type=int, default=5, help="Quantas cópias de cada PDF de docs/ usar.")
+    p_extracao.add_argument("--trabalhadores", type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+
+    p_paginas = sub.add_parser("extracao_paginas", help="Extração de teses longas: texto acumulado vs. páginas sob demanda.")
+    p_paginas.add_argument("--teses", type=int, default=21)
+    p_paginas.add_argument("--paginas", type=int, default=150)
+
+    p_fluxo = sub.add_parser("fluxo", help="Reconstrução completa em lote (arquivos) vs. em fluxo (filas): tempo e E/S.")
+    p_fluxo.add_argument("--copias", type=int, default=5, help="Quantas cópias de cada PDF de docs/ usar.")
+    p_fluxo.add_argument("--trabalhadores", type=int, default=1)
+    p_fluxo.add_argument("--fila", type=int, default=16, help="Documentos em espera entre duas etapas.")
+
+    p_frases = sub.add_parser("frases", help="Frases e NEAR/k: índice posicional vs. varredura dos _termos.txt.")
+    p_frases.add_argument("--copias", type=int, default=20, help="Quantas cópias de cada arquivo de results/normalizado usar.")
+    p_frases.add_argument("--consultas", type=int, default=200)
+
+    p_bm25 = sub.add_parser("bm25", help="BM25 vs. cosseno: latência por caminho de busca e igualdade dos rankings.")
+    p_bm25.add_argument("--docs", type=int, default=20000)
+    p_bm25.add_argument("--consultas", type=int, default=200)
+    p_bm25.add_argument("--limite", type=int, default=10)
+    p_bm25.add_argument("--k1", type=float, default=1.2)
+    p_bm25.add_argument("--b", type=float, default=0.75)
+
+    p_incremental = sub.add_parser("incremental", help="Adição de documentos no índice aberto vs. reconstrução completa.")
+    p_incremental.add_argument("--docs", type=int, default=20000)
+    p_incremental.add_argument("--novos", type=int, default=1)
+    p_incremental.add_argument("--consultas", type=int, default=200)
+
+    p_segmentos = sub.add_parser("segmentos", help="Ingestão em lotes como segmentos vs. reconstrução completa por lote.")
+    p_segmentos.add_argument("--docs", type=int, default=5000)
+    p_segmentos.add_argument("--lote", type=int, default=50)
+    p_segmentos.add_argument("--consultas", type=int, default=200)
+
+    p_tokenizador = sub.add_parser("tokenizador", help="Tokens/s do tokenizador de passada única vs. normalizar_token por token.")
+    p_tokenizador.add_argument("--repeticoes", type=int, default=50)
+
+    p_normalizacao = sub.add_parser("normalizacao", help="Normalização de tokens com distribuição de Zipf: sem cache vs. LRU.")
+    p_normalizacao.add_argument("--tokens", type=int, default=500000)
+    p_normalizacao.add_argument("--capacidades", type=int, nargs='+', default=[64, 512, 4096])
+
+    p_paralela = sub.add_parser("normalizacao_paralela", help="Normalização completa em função do número de processos (tempo e memória).")
+    p_paralela.add_argument("--copias", type=int, default=50, help="Quantas cópias de cada resumo de results/resumo usar.")
+    p_paralela.add_argument("--trabalhadores", type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+
+    p_spimi = sub.add_parser("spimi", help="Construção do índice com orçamento de memória (SPIMI) vs. em memória.")
+    p_spimi.add_argument("--docs", type=int, default=100000)
+    p_spimi.add_argument("--orcamentos", type=float, nargs='+', default=[64, 16, 4], help="Orçamentos em MB.")
+
+    p_cache = sub.add_parser("cache_consultas", help="Cache de resultados: latência com consultas repetidas e invalidação.")
+    p_cache.add_argument("--docs", type=int, default=20000)
+    p_cache.add_argument("--consultas", type=int, default=5000)
+    p_cache.add_argument("--distintas", type=int, default=500)
+    p_cache.add_argument("--capacidade", type=int, default=CAPACIDADE_CACHE_RESULTADOS)
+
+    p_lote = sub.add_parser("lote", help="Vazão de buscar em laço vs. buscar_lote (matrizes esparsas).")
+    p_lote.add_argument("--docs", type=int, default=20000)
+    p_lote.add_argument("--consultas", type=int, default=2000)
+    p_lote.add_argument("--limite", type=int, default=10)
+
+    p_servidor = sub.add_parser("servidor", help="Teste de carga do servidor HTTP de consultas (p50/p99).")
+    p_servidor.add_argument("--endereco", default=None, help="host:porta de um servidor já no ar; sem ele, sobe um sobre um corpus sintético.")
+    p_servidor.add_argument("--docs", type=int, default=5000)
+    p_servidor.add_argument("--clientes", type=int, default=16)
+    p_servidor.add_argument("--requisicoes", type=int, default=5000)
+
+    sub.add_parser("analisadores", help="Vocabulário e tamanho do índice: plural simples vs. radicalizador RSLP.")
+
+    # uso interno: medição isolada em processo filho
+    p_filho = sub.add_parser("_recarga")
+    p_filho.add_argument("caminho")
+    p_filho.add_argument("modo", choices=['separado', 'compartilhado'])
+    p_filho.add_argument("recargas", type=int)
+    p_filho.add_argument("consultas", type=int)
+
+    p_filho_spimi = sub.add_parser("_spimi")
+    p_filho_spimi.add_argument("caminho")
+    p_filho_spimi.add_argument("docs", type=int)
+    p_filho_spimi.add_argument("memoria_maxima", type=int)
+
+    args = parser.parse_args()
+    if args.comando == "carga":
+        bench_carga(args.tamanhos, args.repeticoes)
+    elif args.comando == "topk":
+        bench_topk(args.docs, args.consultas, args.limite)
+    elif args.comando == "recarga":
+        bench_recarga(args.docs, args.recargas, args.consultas)
+    elif args.comando == "intersecao":
+        bench_intersecao(args.docs, args.repeticoes)
+    elif args.comando == "bitmap":
+        bench_bitmap(args.docs, args.repeticoes)
+    elif args.comando == "extracao":
+        bench_extracao(args.copias, args.trabalhadores)
+    elif args.comando == "fluxo":
+        bench_fluxo(args.copias, args.trabalhadores, args.fila)
+    elif args.comando == "extracao_paginas":
+        bench_extracao_paginas(args.teses, args.paginas)
+    elif args.comando == "frases":
+        bench_frases(args.copias, args.consultas)
+    elif args.comando == "bm25":
+        bench_bm25(args.docs, args.consultas, args.limite, args.k1, args.b)
+    elif args.comando == "incremental":
+        bench_incremental(args.docs, args.novos, args.consultas)
+    elif args.comando == "segmentos":
+        bench_segmentos(args.docs, args.lote, args.consultas)
+    elif args.comando == "tokenizador":
+        bench_tokenizador(args.repeticoes)
+    elif args.comando == "normalizacao":
+        bench_normalizacao(args.tokens, args.capacidades)
+    elif args.comando == "normalizacao_paralela":
+        bench_normalizacao_paralela(args.copias, args.trabalhadores)
+    elif args.comando == "analisadores":
+        bench_analisadores()
+    elif args.comando == "_recarga":
+        medir_recarga(args.caminho, args.modo, args.recargas, gerar_consultas(args.consultas))
+    elif args.comando == "cache_consultas":
+        bench_cache_consultas(args.docs, args.consultas, args.distintas, args.capacidade)
+    elif args.comando == "lote":
+        bench_lote(args.docs, args.consultas, args.limite)
+    elif args.comando == "servidor":
+        bench_servidor(args.endereco, args.docs, args.clientes, args.requisicoes)
+    elif args.comando == "spimi":
+        bench_spimi(args.docs, args.orcamentos)
+    elif args.comando == "_spimi":
+        medir_spimi(args.caminho, args.docs, args.memoria_maxima)
+
+
+if __name__ == '__main__':
+    main()
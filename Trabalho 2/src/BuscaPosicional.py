@@ -0,0 +1,108 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Set
+
+from ConsultaBooleana import Termo, Frase, Proximidade
+from Postings import intersecao
+
+# Avaliação de frases e operadores NEAR/k sobre as posições gravadas no índice (posição =
+# índice do termo na sequência normalizada do documento). Primeiro as listas de DocIDs dos
+# termos são intersectadas, da menor para a maior; as posições só são decodificadas depois,
+# e apenas para os documentos que restaram. Serve a qualquer índice com postings() e
+# posicoes_termo() (IndiceInvertido ou IndiceSegmentado).
+# Documentos indexados sem posições (ex.: vindos só do JSON de frequências) não têm como ser
+# conferidos: neles, frases e NEAR/k valem como a conjunção dos termos.
+
+
+#----------------------------------------------------------------------------------------#
+def _termos(no) -> List[str]:
+    return no.termos if isinstance(no, Frase) else [no.termo]
+
+#----------------------------------------------------------------------------------------#
+def _intersectar(listas: List[array]) -> array:
+    # Da lista menor para a maior, parando quando o resultado esvazia
+    listas = sorted(listas, key=len)
+    resultado = listas[0]
+    for lista in listas[1:]:
+        if not resultado:
+            break
+        resultado = intersecao(resultado, lista)
+    return resultado
+
+#----------------------------------------------------------------------------------------#
+def ocorrencias(indice, no, docs: array = None, sem_posicoes: Set[int] = None) -> Dict[int, array]:
+    # DocID -> posições (crescentes) em que o termo ou a frase começa, só entre `docs`
+    # (DocIDs em ordem crescente) quando informado. Os documentos com todos os termos mas
+    # sem posições gravadas ficam de fora e vão para `sem_posicoes`, quando informado.
+    termos = _termos(no)
+    candidatos = _intersectar([indice.postings(t)[0] for t in set(termos)])
+    if docs is not None:
+        candidatos = intersecao(candidatos, docs)
+    if not candidatos:
+        return {}
+    posicoes = {t: indice.posicoes_termo(t, candidatos) for t in set(termos)}
+    if sem_posicoes is not None:
+        sem_posicoes.update(doc for doc in candidatos if any(doc not in p for p in posicoes.values()))
+    if len(termos) == 1:
+        return posicoes[termos[0]]
+
+    resultado = {}
+    for doc in candidatos:
+        # Cada termo desloca suas posições pelo seu lugar na frase: os inícios da frase são
+        # as posições comuns a todos
+        deslocadas = []
+        for i, termo in enumerate(termos):
+            lista = posicoes[termo].get(doc)
+            if not lista:
+                break
+            deslocadas.append(array('I', (p - i for p in lista if p >= i)) if i else lista)
+        else:
+            inicios = _intersectar(deslocadas)
+            if inicios:
+                resultado[doc] = inicios
+    return resultado
+
+#----------------------------------------------------------------------------------------#
+def _proximas(inicios_a: array, tamanho_a: int, inicios_b: array, distancia: int) -> bool:
+    # Alguma ocorrência de b começa no máximo `distancia` posições depois do fim de uma
+    # ocorrência de a (de tamanho_a termos), sem sobreposição
+    for inicio in inicios_a:
+        fim = inicio + tamanho_a - 1
+        j = bisect_left(inicios_b, fim + 1)
+        if j < len(inicios_b) and inicios_b[j] - fim <= distancia:
+            return True
+    return False
+
+#----------------------------------------------------------------------------------------#
+def documentos_posicionais(indice, no) -> array:
+    # DocIDs, em ordem crescente, que satisfazem um termo, uma frase ou um NEAR/k
+    if isinstance(no, Termo):
+        return indice.postings(no.termo)[0]
+    sem_posicoes: Set[int] = set()
+    if not isinstance(no, Proximidade):
+        return array('I', sorted(ocorrencias(indice, no, sem_posicoes=sem_posicoes).keys() | sem_posicoes))
+
+    esquerda = ocorrencias(indice, no.esquerda, sem_posicoes=sem_posicoes)
+    if not esquerda and not sem_posicoes:
+        return array('I')
+    sem_posicoes_direita: Set[int] = set()
+    direita = ocorrencias(indice, no.direita, array('I', sorted(esquerda.keys() | sem_posicoes)),
+                         sem_posicoes_direita)
+    tamanho_esquerda, tamanho_direita = len(_termos(no.esquerda)), len(_termos(no.direita))
+    resultado = {doc for doc, inicios in direita.items() if doc in esquerda and (
+        _proximas(esquerda[doc], tamanho_esquerda, inicios, no.distancia)
+        or _proximas(inicios, tamanho_direita, esquerda[doc], no.distancia))}
+    # Sem posições de um dos lados, basta ter os dois operandos
+    resultado |= sem_posicoes_direita | (sem_posicoes & direita.keys())
+    return array('I', sorted(resultado))
+
+#----------------------------------------------------------------------------------------#
+def documentos_restritos(indice, restricoes: Iterable) -> array:
+    # DocIDs que satisfazem todas as restrições (termos, frases, NEAR/k)
+    resultado = None
+    for restricao in restricoes:
+        docs = documentos_posicionais(indice, restricao)
+        resultado = docs if resultado is None else intersecao(resultado, docs)
+        if not resultado:
+            break
+    return resultado if resultado is not None else array('I')
@@ -0,0 +1,107 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Cache de resultados de consultas, chaveado por (modelo, consulta normalizada, parâmetros).
+# As entradas valem para uma versão de um índice: quando o índice recebe atualizações
+# (indice.versao muda) ou é trocado por outro (reconstrução), o cache é esvaziado na
+# próxima consulta. Opcionalmente as entradas expiram após `ttl` segundos.
+CAPACIDADE_CACHE_RESULTADOS = 1024
+TTL_CACHE_RESULTADOS: Optional[float] = None  # segundos; None = sem expiração
+
+
+class CacheResultados:
+    # LRU limitado; capacidade 0 desliga o cache. Os resultados guardados são tuplas
+    # (imutáveis), e cada acerto soma o custo original da consulta à economia.
+    def __init__(self, capacidade: int = CAPACIDADE_CACHE_RESULTADOS, ttl: Optional[float] = TTL_CACHE_RESULTADOS):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.entradas: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # chave -> (instante, custo, resultado)
+        self.indice = None   # índice e versão a que as entradas correspondem
+        self.versao = None
+        self.trava = threading.Lock()
+        self._zerar_contadores()
+
+    #----------------------------------------------------------------------------------------#
+    def _zerar_contadores(self):
+        self.acertos = 0
+        self.falhas = 0
+        self.expiradas = 0
+        self.invalidacoes = 0
+        self.economia = 0.0     # segundos de cálculo evitados pelos acertos
+        self.tempo_calculo = 0.0  # segundos gastos calculando as falhas
+
+    #----------------------------------------------------------------------------------------#
+    def _validar(self, indice):
+        if indice is not self.indice or indice.versao != self.versao:
+            if self.entradas:
+                self.invalidacoes += 1
+                self.entradas.clear()
+            self.indice = indice
+            self.versao = indice.versao
+
+    #----------------------------------------------------------------------------------------#
+    def _obter(self, indice, chave: Hashable) -> Optional[tuple]:
+        with self.trava:
+            self._validar(indice)
+            entrada = self.entradas.get(chave)
+            if entrada is not None and self.ttl is not None and time.monotonic() - entrada[0] > self.ttl:
+                del self.entradas[chave]
+                self.expiradas += 1
+                entrada = None
+            if entrada is None:
+                self.falhas += 1
+                return None
+            self.entradas.move_to_end(chave)
+            self.acertos += 1
+            self.economia += entrada[1]
+            return entrada[2]
+
+    #----------------------------------------------------------------------------------------#
+    def consultar(self, indice, chave: Hashable, calcular: Callable[[], tuple]) -> tuple:
+        # Resultado guardado para `chave` ou calculado (e guardado) com `calcular`. Um
+        # resultado calculado enquanto o índice mudava de versão não é guardado.
+        if self.capacidade <= 0:
+            return calcular()
+        versao = indice.versao
+        resultado = self._obter(indice, chave)
+        if resultado is not None:
+            return resultado
+
+        inicio = time.perf_counter()
+        resultado = calcular()
+        custo = time.perf_counter() - inicio
+        with self.trava:
+            self.tempo_calculo += custo
+            if indice is self.indice and versao == self.versao == indice.versao:
+                self.entradas[chave] = (time.monotonic(), custo, resultado)
+                self.entradas.move_to_end(chave)
+                if len(self.entradas) > self.capacidade:
+                    self.entradas.popitem(last=False)
+        return resultado
+
+    #----------------------------------------------------------------------------------------#
+    def estatisticas(self) -> Dict[str, Any]:
+        with self.trava:
+            consultas = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acertos': self.acertos / consultas if consultas else 0.0,
+                'expiradas': self.expiradas,
+                'invalidacoes': self.invalidacoes,
+                'economia_s': self.economia,
+                'custo_medio_falha_ms': self.tempo_calculo * 1000 / self.falhas if self.falhas else 0.0,
+                'tamanho': len(self.entradas),
+                'capacidade': self.capacidade,
+            }
+
+    #----------------------------------------------------------------------------------------#
+    def limpar(self):
+        # Esvazia o cache, solta a referência ao índice e zera as estatísticas
+        with self.trava:
+            self.entradas.clear()
+            self.indice = None
+            self.versao = None
+            self._zerar_contadores()
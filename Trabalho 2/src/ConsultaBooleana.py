@@ -0,0 +1,235 @@
+import re
+from typing import Callable, List, Optional, Tuple
+
+# Gramática das consultas booleanas (precedência NEAR > NOT > AND > OR):
+#   ou    := e ( OR e )*
+#   e     := nao ( [AND] nao )*      termos adjacentes sem operador equivalem a AND
+#   nao   := NOT nao | prox
+#   prox  := prim [ NEAR/k prim ]    só entre termos ou frases
+#   prim  := TERMO | '"' TERMO+ '"' | '(' ou ')'
+# Uma frase casa com os termos em posições consecutivas; a NEAR/k, com ocorrências dos dois
+# operandos, em qualquer ordem, separadas por no máximo k posições (k >= 1: NEAR/1 são termos
+# vizinhos). As posições contam só os termos indexados: stopwords não separam termos.
+OPERADORES = {'and': 'AND', 'or': 'OR', 'not': 'NOT'}
+PADRAO_TOKENS = re.compile(r'"[^"]*"|"|\(|\)|[^\s()"]+')
+PADRAO_PROXIMIDADE = re.compile(r'NEAR/(\d+)', re.IGNORECASE)
+PADRAO_TRECHOS = re.compile(r'"[^"]*"|\S+')
+
+
+class Termo:
+    def __init__(self, termo: str):
+        self.termo = termo
+
+    def __repr__(self):
+        return f"Termo({self.termo!r})"
+
+
+class E:
+    def __init__(self, filhos: List):
+        self.filhos = filhos
+
+    def __repr__(self):
+        return f"E({self.filhos!r})"
+
+
+class Ou:
+    def __init__(self, filhos: List):
+        self.filhos = filhos
+
+    def __repr__(self):
+        return f"Ou({self.filhos!r})"
+
+
+class Nao:
+    def __init__(self, filho):
+        self.filho = filho
+
+    def __repr__(self):
+        return f"Nao({self.filho!r})"
+
+
+class Frase:
+    def __init__(self, termos: List[str]):
+        self.termos = termos
+
+    def __repr__(self):
+        return f"Frase({self.termos!r})"
+
+
+class Proximidade:
+    def __init__(self, esquerda, direita, distancia: int):
+        if distancia < 1:
+            raise ValueError(f"Distância do NEAR/{distancia} deve ser pelo menos 1")
+        self.esquerda = esquerda   # Termo ou Frase
+        self.direita = direita
+        self.distancia = distancia
+
+    def __repr__(self):
+        return f"Proximidade({self.esquerda!r}, {self.direita!r}, {self.distancia})"
+
+
+#----------------------------------------------------------------------------------------#
+def tokenizar_consulta(consulta: str) -> List[str]:
+    # Separa parênteses e frases entre aspas dos termos e reconhece operadores sem
+    # diferenciar maiúsculas
+    tokens = []
+    for token in PADRAO_TOKENS.findall(consulta):
+        if PADRAO_PROXIMIDADE.fullmatch(token):
+            token = token.upper()
+        tokens.append(OPERADORES.get(token.lower(), token))
+    return tokens
+
+
+class AnalisadorConsulta:
+    # Analisador descendente recursivo que produz a árvore sintática da consulta
+    def __init__(self, consulta: str):
+        self.tokens = tokenizar_consulta(consulta)
+        self.pos = 0
+
+    #----------------------------------------------------------------------------------------#
+    def _atual(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    #----------------------------------------------------------------------------------------#
+    def analisar(self):
+        if not self.tokens:
+            return None
+        no = self._ou()
+        if self._atual() is not None:
+            raise ValueError(f"Token inesperado na consulta: {self._atual()}")
+        return no
+
+    #----------------------------------------------------------------------------------------#
+    def _ou(self):
+        filhos = [self._e()]
+        while self._atual() == 'OR':
+            self.pos += 1
+            filhos.append(self._e())
+        return filhos[0] if len(filhos) == 1 else Ou(filhos)
+
+    #----------------------------------------------------------------------------------------#
+    def _e(self):
+        filhos = [self._nao()]
+        while True:
+            token = self._atual()
+            if token == 'AND':
+                self.pos += 1
+            elif token is None or token in ('OR', ')'):
+                break
+            filhos.append(self._nao())
+        return filhos[0] if len(filhos) == 1 else E(filhos)
+
+    #----------------------------------------------------------------------------------------#
+    def _nao(self):
+        if self._atual() == 'NOT':
+            self.pos += 1
+            return Nao(self._nao())
+        return self._proximidade()
+
+    #----------------------------------------------------------------------------------------#
+    def _proximidade(self):
+        esquerda = self._primario()
+        operador = self._atual()
+        if operador is None or not PADRAO_PROXIMIDADE.fullmatch(operador):
+            return esquerda
+        self.pos += 1
+        direita = self._primario()
+        if not isinstance(esquerda, (Termo, Frase)) or not isinstance(direita, (Termo, Frase)):
+            raise ValueError(f"Operador {operador} só liga termos ou frases")
+        if self._atual() is not None and PADRAO_PROXIMIDADE.fullmatch(self._atual()):
+            raise ValueError("Operadores NEAR encadeados: combine-os com AND")
+        return Proximidade(esquerda, direita, int(operador[len('NEAR/'):]))
+
+    #----------------------------------------------------------------------------------------#
+    def _primario(self):
+        token = self._atual()
+        if token is None:
+            raise ValueError("Consulta terminou quando se esperava um termo")
+        if token == '(':
+            self.pos += 1
+            no = self._ou()
+            if self._atual() != ')':
+                raise ValueError("Parêntese não fechado na consulta")
+            self.pos += 1
+            return no
+        if token in ('AND', 'OR', ')') or PADRAO_PROXIMIDADE.fullmatch(token):
+            raise ValueError(f"Operador {token} precisa de dois operandos")
+        self.pos += 1
+        if token.startswith('"'):
+            if len(token) < 2 or not token.endswith('"'):
+                raise ValueError("Aspas não fechadas na consulta")
+            termos = token[1:-1].split()
+            if not termos:
+                raise ValueError("Frase vazia na consulta")
+            return Frase(termos)
+        return Termo(token)
+
+
+#----------------------------------------------------------------------------------------#
+def analisar_consulta(consulta: str):
+    return AnalisadorConsulta(consulta).analisar()
+
+#----------------------------------------------------------------------------------------#
+def restricoes_posicionais(consulta: str) -> Tuple[List[str], List]:
+    # Consulta livre do modelo vetorial: separa as frases entre aspas e os operadores NEAR/k
+    # das palavras. Retorna todas as palavras (inclusive as das frases), que formam o vetor
+    # da consulta, e as restrições (Frase/Proximidade) que os documentos precisam satisfazer.
+    palavras: List[str] = []
+    itens = []
+    for trecho in PADRAO_TRECHOS.findall(consulta):
+        distancia = PADRAO_PROXIMIDADE.fullmatch(trecho)
+        if distancia:
+            itens.append(int(distancia.group(1)))
+        elif len(trecho) > 1 and trecho.startswith('"') and trecho.endswith('"'):
+            termos = trecho[1:-1].split()
+            if termos:
+                palavras.extend(termos)
+                itens.append(Frase(termos))
+        else:
+            palavras.append(trecho)
+            itens.append(Termo(trecho))
+    restricoes = [item for item in itens if isinstance(item, Frase)]
+    for i in range(1, len(itens) - 1):
+        esquerda, distancia, direita = itens[i - 1:i + 2]
+        if isinstance(distancia, int) and not isinstance(esquerda, int) and not isinstance(direita, int):
+            restricoes.append(Proximidade(esquerda, direita, distancia))
+    return palavras, restricoes
+
+#----------------------------------------------------------------------------------------#
+def simplificar(no, normalizar: Callable[[str], Optional[str]]):
+    # Normaliza os termos (None descarta o termo, ex.: stopwords), achata E/Ou aninhados
+    # e elimina dupla negação. Frases reduzidas a um termo viram Termo, e NEAR com um
+    # operando descartado vira o outro operando. Retorna None se nada restar da consulta.
+    if isinstance(no, Termo):
+        termo = normalizar(no.termo)
+        return Termo(termo) if termo else None
+    if isinstance(no, Frase):
+        termos = [t for t in map(normalizar, no.termos) if t]
+        if len(termos) <= 1:
+            return Termo(termos[0]) if termos else None
+        return Frase(termos)
+    if isinstance(no, Proximidade):
+        esquerda = simplificar(no.esquerda, normalizar)
+        direita = simplificar(no.direita, normalizar)
+        if esquerda is None or direita is None:
+            return esquerda or direita
+        return Proximidade(esquerda, direita, no.distancia)
+    if isinstance(no, Nao):
+        filho = simplificar(no.filho, normalizar)
+        if filho is None:
+            return None
+        return filho.filho if isinstance(filho, Nao) else Nao(filho)
+
+    tipo = type(no)
+    filhos = []
+    for filho in no.filhos:
+        filho = simplificar(filho, normalizar)
+        if filho is None:
+            continue
+        if isinstance(filho, tipo):
+            filhos.extend(filho.filhos)
+        else:
+            filhos.append(filho)
+    if not filhos:
+        return None
+    return filhos[0] if len(filhos) == 1 else tipo(filhos)
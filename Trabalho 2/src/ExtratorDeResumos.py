@@ -1,18 +1,56 @@
 import os
 import logging
-from typing import List, Dict
-from PyPDF2 import PdfReader
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Dict, Optional
+from PyPDF2 import PdfReader, PageObject
+from PyPDF2.generic import IndirectObject
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
 
 
+# Atributos que as páginas herdam dos nós da árvore de páginas
+ATRIBUTOS_HERDAVEIS = ('/Resources', '/MediaBox', '/CropBox', '/Rotate')
+
+
+#----------------------------------------------------------------------------------------#
+def paginas_sob_demanda(leitor: PdfReader, no=None, herdado: Dict = None,
+                        referencia: IndirectObject = None) -> Iterator[PageObject]:
+    # Páginas na mesma ordem e com os mesmos atributos herdados de leitor.pages, mas resolvendo
+    # os nós da árvore só até a página pedida: leitor.pages lê todas as páginas do arquivo no
+    # primeiro acesso (para saber quantas são), o que domina o custo em PDFs longos dos quais
+    # só as primeiras páginas interessam. Segue PdfReader._flatten, inclusive no dicionário
+    # de herança compartilhado entre os ramos. Depende de detalhes internos do PyPDF2 (versão
+    # fixada em SRIexec.bat); se falhar, _paginas_pdf volta para leitor.pages.
+    if no is None:
+        no = leitor.trailer['/Root'].get_object()['/Pages'].get_object()
+        herdado = {}
+    tipo = no['/Type'] if '/Type' in no else '/Pages'
+    if tipo == '/Pages':
+        for atributo in ATRIBUTOS_HERDAVEIS:
+            if atributo in no:
+                herdado[atributo] = no[atributo]
+        for filho in no['/Kids']:
+            yield from paginas_sob_demanda(leitor, filho.get_object(), herdado,
+                                           filho if isinstance(filho, IndirectObject) else None)
+    elif tipo == '/Page':
+        for atributo, valor in list(herdado.items()):
+            if atributo not in no:
+                no[atributo] = valor
+        pagina = PageObject(leitor, referencia)
+        pagina.update(no)
+        yield pagina
+
+
 class ExtratorDeResumos:
-    def __init__(self, pasta_docs: str = None, pasta_results: str = None, max_palavras_texto: int = 1000, max_palavras_resumo: int = 300):
+    def __init__(self, pasta_docs: str = None, pasta_results: str = None, max_palavras_texto: int = 1000, max_palavras_resumo: int = 300,
+                 pasta_resumo: str = None):
         src_dir = os.path.dirname(__file__)
         raiz = os.path.abspath(os.path.join(src_dir, '..'))
         self.pasta_docs = pasta_docs or os.path.join(raiz, 'docs')
         self.pasta_results = pasta_results or os.path.join(raiz, 'results')
-        self.pasta_resumo = os.path.join(self.pasta_results, 'resumo')
+        # Por padrão os resumos vão para results/resumo; a atualização incremental usa uma
+        # pasta própria para o lote
+        self.pasta_resumo = pasta_resumo or os.path.join(self.pasta_results, 'resumo')
         self.max_palavras_texto = max_palavras_texto
         self.max_palavras_resumo = max_palavras_resumo
         
@@ -21,19 +59,69 @@ class ExtratorDeResumos:
         os.makedirs(self.pasta_resumo, exist_ok=True)
 
     #----------------------------------------------------------------------------------------#    
+    def _paginas_pdf(self, caminho_pdf: str) -> Iterator[str]:
+        # Texto de cada página, lida e extraída só quando é pedida. Se a leitura sob demanda
+        # falhar (ex.: outra versão do PyPDF2), segue pelo leitor.pages a partir da página
+        # em que parou.
+        with open(caminho_pdf, 'rb') as f:
+            leitor = PdfReader(f)
+            paginas = paginas_sob_demanda(leitor)
+            lidas = 0
+            while True:
+                try:
+                    pagina = next(paginas)
+                except StopIteration:
+                    return
+                except Exception:
+                    logging.warning("Leitura sob demanda falhou em %s; lendo todas as páginas", caminho_pdf,
+                                    exc_info=True)
+                    break
+                yield pagina.extract_text() or ""
+                lidas += 1
+            for i in range(lidas, len(leitor.pages)):
+                yield leitor.pages[i].extract_text() or ""
+
+    #----------------------------------------------------------------------------------------#
     def _extrair_texto_pdf(self, caminho_pdf: str) -> str:
-        texto_completo = ""
+        # Lê páginas até somar max_palavras_texto palavras ou, antes disso, até o resumo e as
+        # max_palavras_resumo palavras seguintes estarem completos; as páginas restantes não
+        # são extraídas. O texto é o mesmo que se lido até o limite de palavras: as páginas
+        # são unidas por espaço, então nenhuma palavra continua na página seguinte e as
+        # palavras podem ser contadas página a página. As páginas antes do resumo não podem
+        # ser puladas: só extraindo o texto se sabe se 'resumo' está nelas, e elas contam
+        # para o limite de palavras e para o fallback sem resumo.
+        partes = []
+        total_palavras = 0
+        apos_resumo = None  # palavras depois da primeira ocorrência de 'resumo'
+        # A posição de 'resumo' é procurada no texto em minúsculas e usada no texto original
+        # (ver _extrair_resumo_de_texto); se lower() mudar o tamanho de alguma página antes
+        # dela, as posições deixam de coincidir e a leitura vai até o limite de palavras.
+        parar_no_resumo = True
+        paginas = self._paginas_pdf(caminho_pdf)
         try:
-            with open(caminho_pdf, 'rb') as f:
-                leitor = PdfReader(f)
-                for pagina in leitor.pages:
-                    texto = pagina.extract_text() or ""
-                    texto_completo += texto + " "
-                    if len(texto_completo.split()) >= self.max_palavras_texto:
-                        break
+            for texto in paginas:
+                partes.append(texto)
+                palavras = len(texto.split())
+                total_palavras += palavras
+                if total_palavras >= self.max_palavras_texto:
+                    break
+                if apos_resumo is not None:
+                    apos_resumo += palavras
+                elif parar_no_resumo:
+                    texto_lower = texto.lower()
+                    if len(texto_lower) != len(texto):
+                        parar_no_resumo = False
+                        continue
+                    posicao = texto_lower.find('resumo')
+                    if posicao != -1:
+                        apos_resumo = len(texto[posicao + len('resumo'):].split())
+                if apos_resumo is not None and apos_resumo >= self.max_palavras_resumo:
+                    break
         except Exception:
             logging.exception(f"Falha ao ler PDF: {caminho_pdf}")
-        return texto_completo.strip()
+        finally:
+            paginas.close()
+        return " ".join(partes).strip()
 
     #----------------------------------------------------------------------------------------#
     def _extrair_resumo_de_texto(self, texto: str) -> str:
@@ -51,7 +139,48 @@ class ExtratorDeResumos:
         return ' '.join(palavras).strip()
 
     #----------------------------------------------------------------------------------------#
-    def processar_documentos(self, arquivos_para_processar: List[str] = None) -> List[Dict[str, str]]:
+    def processar_arquivo(self, nome: str, gravar: bool = True) -> Optional[Dict[str, str]]:
+        # Extrai e, com `gravar`, salva o resumo de um PDF da pasta docs. Qualquer falha fica
+        # restrita a este arquivo: é registrada no log e o resultado é None.
+        caminho = os.path.join(self.pasta_docs, nome)
+        logging.info("Processando: %s", nome)
+        try:
+            texto = self._extrair_texto_pdf(caminho)
+            resumo = self._extrair_resumo_de_texto(texto)
+            if resumo:
+                if gravar:
+                    nome_saida = os.path.splitext(nome)[0] + '_resumo.txt'
+                    caminho_saida = os.path.join(self.pasta_resumo, nome_saida)
+                    with open(caminho_saida, 'w', encoding='utf-8') as f:
+                        f.write(resumo)
+                    logging.info("Resumo salvo: %s", nome_saida)
+                return {'nome_arquivo': nome, 'texto': resumo}
+            else:
+                # Fallback: usar as primeiras `fallback_palavras` do texto do documento
+                palavras_doc = texto.split()
+                if palavras_doc:
+                    fallback = ' '.join(palavras_doc[:self.fallback_palavras])
+                    if gravar:
+                        nome_saida = os.path.splitext(nome)[0] + '_resumo.txt'
+                        caminho_saida = os.path.join(self.pasta_resumo, nome_saida)
+                        with open(caminho_saida, 'w', encoding='utf-8') as f:
+                            f.write(fallback)
+                        logging.info("Resumo não encontrado; fallback salvo (primeiras %d palavras): %s", self.fallback_palavras, nome_saida)
+                    return {'nome_arquivo': nome, 'texto': fallback, 'fallback': True}
+                else:
+                    logging.info("Resumo e texto não encontrados em: %s", nome)
+        except Exception:
+            logging.exception("Erro ao processar %s", nome)
+        return None
+
+    #----------------------------------------------------------------------------------------#
+    def processar_documentos(self, arquivos_para_processar: List[str] = None, trabalhadores: int = 1,
+                             progresso: Callable[[int, int], None] = None) -> List[Dict[str, str]]:
+        # Com trabalhadores > 1 os PDFs são distribuídos entre processos; cada resumo é
+        # gravado assim que fica pronto, e a lista retornada segue a ordem alfabética
+        # dos arquivos, como no modo sequencial.
+        # `progresso(feitos, total)` é chamado a cada PDF concluído; uma exceção lançada
+        # por ele interrompe o processamento (os PDFs ainda não iniciados são descartados).
         resultados = []
 
         if not os.path.exists(self.pasta_docs):
@@ -62,39 +191,39 @@ class ExtratorDeResumos:
             lista_arquivos = sorted(arquivos_para_processar)
         else:
             lista_arquivos = sorted(os.listdir(self.pasta_docs))
+        lista_arquivos = [nome for nome in lista_arquivos if nome.lower().endswith('.pdf')]
+        total = len(lista_arquivos)
+        if progresso is not None:
+            progresso(0, total)
 
-        for nome in lista_arquivos:
-            if not nome.lower().endswith('.pdf'):
-                continue
+        if trabalhadores <= 1 or total <= 1:
+            for feitos, nome in enumerate(lista_arquivos, 1):
+                resultado = self.processar_arquivo(nome)
+                if resultado:
+                    resultados.append(resultado)
+                if progresso is not None:
+                    progresso(feitos, total)
+            return resultados
 
-            caminho = os.path.join(self.pasta_docs, nome)
-            logging.info("Processando: %s", nome)
-            try:
-                texto = self._extrair_texto_pdf(caminho)
-                resumo = self._extrair_resumo_de_texto(texto)
-                if resumo:
-                    nome_saida = os.path.splitext(nome)[0] + '_resumo.txt'
-                    caminho_saida = os.path.join(self.pasta_resumo, nome_saida)
-                    with open(caminho_saida, 'w', encoding='utf-8') as f:
-                        f.write(resumo)
-                    resultados.append({'nome_arquivo': nome, 'texto': resumo})
-                    logging.info("Resumo salvo: %s", nome_saida)
-                else:
-                    # Fallback: usar as primeiras `fallback_palavras` do texto do documento
-                    palavras_doc = texto.split()
-                    if palavras_doc:
-                        fallback = ' '.join(palavras_doc[:self.fallback_palavras])
-                        nome_saida = os.path.splitext(nome)[0] + '_resumo.txt'
-                        caminho_saida = os.path.join(self.pasta_resumo, nome_saida)
-                        with open(caminho_saida, 'w', encoding='utf-8') as f:
-                            f.write(fallback)
-                        resultados.append({'nome_arquivo': nome, 'texto': fallback, 'fallback': True})
-                        logging.info("Resumo não encontrado; fallback salvo (primeiras %d palavras): %s", self.fallback_palavras, nome_saida)
-                    else:
-                        logging.info("Resumo e texto não encontrados em: %s", nome)
-            except Exception:
-                logging.exception("Erro ao processar %s", nome)
-        return resultados
+        por_posicao: Dict[int, Dict[str, str]] = {}
+        executor = ProcessPoolExecutor(max_workers=trabalhadores)
+        try:
+            futuros = {executor.submit(self.processar_arquivo, nome): i for i, nome in enumerate(lista_arquivos)}
+            for feitos, futuro in enumerate(as_completed(futuros), 1):
+                if progresso is not None:
+                    progresso(feitos, total)
+                i = futuros[futuro]
+                try:
+                    resultado = futuro.result()
+                except Exception:
+                    # falha do próprio processo trabalhador (ex.: encerrado pelo sistema)
+                    logging.exception("Erro ao processar %s", lista_arquivos[i])
+                    continue
+                if resultado:
+                    por_posicao[i] = resultado
+        finally:
+            executor.shutdown(cancel_futures=True)
+        return [por_posicao[i] for i in sorted(por_posicao)]
 
 #----------------------------------------------------------------------------------------#
     def processar_documento_unico(self, caminho_pdf: str) -> Dict[str, str]:
@@ -131,12 +260,12 @@ class ExtratorDeResumos:
         return {}
 
     #----------------------------------------------------------------------------------------#
-def extrair_resumos(arquivos_para_processar: List[str] = None) -> List[Dict[str, str]]:
+def extrair_resumos(arquivos_para_processar: List[str] = None, trabalhadores: int = 1) -> List[Dict[str, str]]:
     extrator = ExtratorDeResumos()
-    return extrator.processar_documentos(arquivos_para_processar)
+    return extrator.processar_documentos(arquivos_para_processar, trabalhadores)
 
 #----------------------------------------------------------------------------------------#
 if __name__ == '__main__':
     logging.info("Iniciando extração de resumos...")
-    res = extrair_resumos()
+    res = extrair_resumos(trabalhadores=os.cpu_count() or 1)
     logging.info("Total de resumos extraídos: %d", len(res))
\ No newline at end of file
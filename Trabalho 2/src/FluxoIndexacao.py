@@ -0,0 +1,212 @@
+import os
+import glob
+import queue
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from ExtratorDeResumos import ExtratorDeResumos
+from Normalizador import (normalizar_texto, obter_analisador, gravando_json, ETAPAS_PADRAO,
+                          PENDENTES_POR_TRABALHADOR)
+from IndiceSegmentado import ConjuntoSegmentos, pasta_segmentos, MEMORIA_INDEXACAO
+from Indexador import registrar_manifesto_completo
+
+# Reconstrução completa em fluxo: extração, normalização e gravação do índice rodam ao mesmo
+# tempo, ligadas por filas limitadas em memória. Cada documento passa pelas três etapas sem
+# voltar ao disco; os resumos, os _termos.txt e o JSON passam a ser saídas opcionais.
+TAMANHO_FILA = 16   # documentos em espera entre duas etapas
+ESPERA_FILA = 0.1   # segundos entre verificações de parada enquanto uma fila está cheia/vazia
+
+
+class _Falha:
+    # Exceção de uma etapa, repassada pela fila para a etapa seguinte
+    def __init__(self, erro: BaseException):
+        self.erro = erro
+
+
+_FIM = object()
+
+
+#----------------------------------------------------------------------------------------#
+def _colocar(fila: queue.Queue, item, parar: threading.Event) -> bool:
+    # Espera espaço na fila; desiste (False) se o fluxo for interrompido
+    while not parar.is_set():
+        try:
+            fila.put(item, timeout=ESPERA_FILA)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+#----------------------------------------------------------------------------------------#
+def _consumir(fila: queue.Queue, parar: threading.Event) -> Iterator:
+    # Itens da fila até o marcador de fim; uma falha da etapa anterior é relançada aqui
+    while True:
+        try:
+            item = fila.get(timeout=ESPERA_FILA)
+        except queue.Empty:
+            if parar.is_set():
+                return
+            continue
+        if item is _FIM:
+            return
+        if isinstance(item, _Falha):
+            raise item.erro
+        yield item
+
+#----------------------------------------------------------------------------------------#
+def _executar_etapa(itens: Iterable, fila: queue.Queue, parar: threading.Event):
+    # Corpo da thread de uma etapa: repassa os itens à fila, seguidos do marcador de fim ou
+    # da exceção que interrompeu a etapa
+    try:
+        for item in itens:
+            if not _colocar(fila, item, parar):
+                return
+        _colocar(fila, _FIM, parar)
+    except BaseException as e:
+        _colocar(fila, _Falha(e), parar)
+    finally:
+        if hasattr(itens, 'close'):
+            itens.close()
+
+#----------------------------------------------------------------------------------------#
+def _resumos_extraidos(extrator: ExtratorDeResumos, pdfs: List[str], trabalhadores: int,
+                       gravar: bool) -> Iterator[Tuple[str, Optional[str]]]:
+    # (nome do PDF, resumo) na ordem de `pdfs`; resumo None se a extração falhou. Com
+    # trabalhadores > 1 os PDFs são distribuídos entre processos, com no máximo
+    # PENDENTES_POR_TRABALHADOR PDFs em andamento por processo.
+    if trabalhadores <= 1 or len(pdfs) <= 1:
+        for nome in pdfs:
+            resultado = extrator.processar_arquivo(nome, gravar)
+            yield nome, resultado['texto'] if resultado else None
+        return
+
+    executor = ProcessPoolExecutor(max_workers=trabalhadores)
+    pendentes = deque()
+    proximos = iter(pdfs)
+    try:
+        while True:
+            for nome in proximos:
+                pendentes.append((nome, executor.submit(extrator.processar_arquivo, nome, gravar)))
+                if len(pendentes) >= trabalhadores * PENDENTES_POR_TRABALHADOR:
+                    break
+            if not pendentes:
+                break
+            nome, futuro = pendentes.popleft()
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                # falha do próprio processo trabalhador (ex.: encerrado pelo sistema)
+                print(f"Erro ao processar {nome}: {e}")
+                resultado = None
+            yield nome, resultado['texto'] if resultado else None
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+#----------------------------------------------------------------------------------------#
+def _resumos_normalizados(resumos: Iterator[Tuple[str, Optional[str]]], analisador,
+                          pasta_normalizado: Optional[str]) -> Iterator[Tuple[str, Optional[List]]]:
+    # (nome do PDF, [(termo, freq, posições), ...]) para cada resumo; com `pasta_normalizado`,
+    # grava também o _termos.txt
+    for nome, texto in resumos:
+        if texto is None:
+            yield nome, None
+            continue
+        caminho_saida = None
+        if pasta_normalizado is not None:
+            caminho_saida = os.path.join(pasta_normalizado, f"{os.path.splitext(nome)[0]}_termos.txt")
+        try:
+            pares = normalizar_texto(texto, analisador, caminho_saida)
+        except Exception as e:
+            print(f"Erro ao normalizar {nome}: {e}")
+            pares = None
+        yield nome, pares
+
+#----------------------------------------------------------------------------------------#
+def _apagar_intermediarios(pasta_results: str, freq_json_path: str):
+    # Numa reconstrução sem saídas intermediárias, as de reconstruções anteriores deixam de
+    # corresponder ao índice e são removidas (o JSON seria usado para recriar os segmentos)
+    arquivos = glob.glob(os.path.join(glob.escape(pasta_results), 'resumo', '*_resumo.txt'))
+    arquivos += glob.glob(os.path.join(glob.escape(pasta_results), 'normalizado', '*_termos.txt'))
+    for caminho in arquivos + [freq_json_path]:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+#----------------------------------------------------------------------------------------#
+def indexar_em_fluxo(pasta_docs: str = None, pasta_results: str = None, trabalhadores: int = 1,
+                     intermediarios: bool = True, tamanho_fila: int = TAMANHO_FILA,
+                     memoria_maxima: int = MEMORIA_INDEXACAO,
+                     progresso: Callable[[int, int], None] = None) -> List[str]:
+    # Reconstrução completa equivalente a ExtratorDeResumos.processar_documentos seguido de
+    # processar_pasta_results(), com as etapas em threads ligadas por filas de `tamanho_fila`
+    # documentos: a extração (em processos, com trabalhadores > 1) alimenta a normalização,
+    # que alimenta o índice gravado nesta thread. Com `intermediarios`, os resumos, os
+    # _termos.txt e o JSON são gravados como antes; sem eles, só o índice.
+    # Os documentos entram no índice na ordem alfabética dos PDFs.
+    # `progresso(feitos, total)` conta os PDFs que chegaram ao índice (ou falharam); uma
+    # exceção lançada por ele interrompe todas as etapas sem alterar o índice.
+    # Retorna os PDFs indexados.
+    extrator = ExtratorDeResumos(pasta_docs, pasta_results)
+    pasta_results = extrator.pasta_results
+    freq_json_path = os.path.join(pasta_results, 'frequencies_summary.json')
+    pasta_normalizado = os.path.join(pasta_results, 'normalizado') if intermediarios else None
+    if pasta_normalizado is not None:
+        os.makedirs(pasta_normalizado, exist_ok=True)
+    analisador = obter_analisador(ETAPAS_PADRAO)
+    conjunto = ConjuntoSegmentos(pasta_segmentos(freq_json_path), memoria_maxima)
+
+    pdfs = sorted(nome for nome in os.listdir(extrator.pasta_docs) if nome.lower().endswith('.pdf'))
+    parar = threading.Event()
+    fila_resumos = queue.Queue(maxsize=tamanho_fila)
+    fila_termos = queue.Queue(maxsize=tamanho_fila)
+    etapas = [
+        threading.Thread(target=_executar_etapa, name='extracao', daemon=True,
+                         args=(_resumos_extraidos(extrator, pdfs, trabalhadores, intermediarios), fila_resumos, parar)),
+        threading.Thread(target=_executar_etapa, name='normalizacao', daemon=True,
+                         args=(_resumos_normalizados(_consumir(fila_resumos, parar), analisador, pasta_normalizado),
+                               fila_termos, parar)),
+    ]
+
+    def documentos():
+        feitos = 0
+        if progresso is not None:
+            progresso(feitos, len(pdfs))
+        for nome, pares in _consumir(fila_termos, parar):
+            feitos += 1
+            if progresso is not None:
+                progresso(feitos, len(pdfs))
+            if pares is not None:
+                print(f"Arquivo normalizado e adicionado ao índice: {nome} (termos únicos: {len(pares)})")
+                yield nome, pares
+
+    for etapa in etapas:
+        etapa.start()
+    try:
+        dados = gravando_json(documentos(), freq_json_path) if intermediarios else documentos()
+        indexados = conjunto.recriar(dados, analisador.configuracao)
+    finally:
+        parar.set()
+        for etapa in etapas:
+            etapa.join()
+
+    if not intermediarios:
+        _apagar_intermediarios(pasta_results, freq_json_path)
+    print(f'Indexação concluída: {len(indexados)} documentos.\nÍndice: {conjunto.pasta}')
+    return indexados
+
+#----------------------------------------------------------------------------------------#
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Reconstrói o índice com extração, normalização e indexação em fluxo.")
+    parser.add_argument("--trabalhadores", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--fila", type=int, default=TAMANHO_FILA, help="Documentos em espera entre duas etapas.")
+    parser.add_argument("--sem-intermediarios", action="store_true",
+                        help="Não grava resumos, _termos.txt nem o JSON (só o índice).")
+    args = parser.parse_args()
+    indexar_em_fluxo(trabalhadores=args.trabalhadores, intermediarios=not args.sem_intermediarios,
+                     tamanho_fila=args.fila)
+    # Registra o conteúdo indexado para as próximas atualizações incrementais
+    registrar_manifesto_completo()
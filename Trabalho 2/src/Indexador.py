@@ -0,0 +1,101 @@
+import os
+import shutil
+from typing import Dict, List
+
+from ExtratorDeResumos import ExtratorDeResumos
+from Normalizador import processar_pasta_results
+from Manifesto import Manifesto
+from IndiceSegmentado import IndiceSegmentado, nomes_indexados
+from TarefaIndexacao import TarefaIndexacao
+
+
+#----------------------------------------------------------------------------------------#
+def _docs_indexados(pasta_results: str) -> List[str]:
+    return nomes_indexados(os.path.join(pasta_results, 'frequencies_summary.json'))
+
+#----------------------------------------------------------------------------------------#
+def detectar_alteracoes() -> Dict[str, List[str]]:
+    # Compara docs/ com o manifesto: PDFs novos, modificados (hash diferente) e removidos
+    extrator = ExtratorDeResumos()
+    manifesto = Manifesto(extrator.pasta_results)
+    novos, modificados, removidos = manifesto.detectar_alteracoes(
+        extrator.pasta_docs, _docs_indexados(extrator.pasta_results))
+    manifesto.salvar()
+    return {'novos': novos, 'modificados': modificados, 'removidos': removidos}
+
+#----------------------------------------------------------------------------------------#
+def aplicar_alteracoes(alteracoes: Dict[str, List[str]], trabalhadores: int = 1,
+                       indice: IndiceSegmentado = None, tarefa: TarefaIndexacao = None) -> Dict[str, List[str]]:
+    # Reextrai e renormaliza só os PDFs novos ou modificados e tira do índice os removidos;
+    # o lote é gravado como um segmento novo. PDFs cuja extração falhar não entram no
+    # manifesto e serão tentados de novo. Com `indice`, o índice aberto passa a ver o lote
+    # sem ser reaberto. Com `tarefa`, as etapas informam o progresso a ela e podem ser
+    # canceladas; um cancelamento não altera o índice, o manifesto nem results/resumo.
+    extrator = ExtratorDeResumos()
+    manifesto = Manifesto(extrator.pasta_results)
+    novos, modificados, removidos = alteracoes['novos'], alteracoes['modificados'], alteracoes['removidos']
+
+    # Os resumos do lote são gravados em results/resumo_lote e só substituem os antigos depois
+    # que o segmento foi gravado
+    pasta_lote = os.path.join(extrator.pasta_results, 'resumo_lote')
+    shutil.rmtree(pasta_lote, ignore_errors=True)
+    try:
+        a_extrair = novos + modificados
+        progresso = tarefa.etapa('Extração') if tarefa is not None else None
+        extrator_lote = ExtratorDeResumos(pasta_results=extrator.pasta_results, pasta_resumo=pasta_lote)
+        resultados = extrator_lote.processar_documentos(a_extrair, trabalhadores, progresso) if a_extrair else []
+        extraidos = [r['nome_arquivo'] for r in resultados]
+        falhas = sorted(set(a_extrair) - set(extraidos))
+
+        # Modificados que falharam saem do índice: o conteúdo indexado já não corresponde ao PDF
+        saem_do_indice = removidos + [n for n in modificados if n in falhas]
+        nomes_resumos = [os.path.splitext(n)[0] + '_resumo.txt' for n in extraidos]
+        if extraidos or saem_do_indice:
+            progresso = tarefa.etapa('Normalização') if tarefa is not None else None
+            processar_pasta_results(apenas_novos=nomes_resumos, removidos=saem_do_indice,
+                                    trabalhadores=trabalhadores, progresso=progresso,
+                                    pasta_resumos=pasta_lote)
+            if indice is not None:
+                indice.recarregar()
+
+        # Segmento gravado: os resumos novos substituem os antigos e os dos PDFs que saíram do
+        # índice deixam de valer
+        for nome in nomes_resumos:
+            os.replace(os.path.join(pasta_lote, nome), os.path.join(extrator.pasta_resumo, nome))
+        for nome in saem_do_indice:
+            caminho_resumo = os.path.join(extrator.pasta_resumo, os.path.splitext(nome)[0] + '_resumo.txt')
+            if os.path.exists(caminho_resumo):
+                os.remove(caminho_resumo)
+    finally:
+        shutil.rmtree(pasta_lote, ignore_errors=True)
+
+    for nome in extraidos:
+        manifesto.registrar(nome, os.path.join(extrator.pasta_docs, nome))
+    for nome in removidos + falhas:
+        manifesto.remover(nome)
+    manifesto.salvar()
+    return {'novos': novos, 'modificados': modificados, 'removidos': removidos, 'falhas': falhas}
+
+#----------------------------------------------------------------------------------------#
+def atualizar_incremental(trabalhadores: int = 1) -> Dict[str, List[str]]:
+    return aplicar_alteracoes(detectar_alteracoes(), trabalhadores)
+
+#----------------------------------------------------------------------------------------#
+def registrar_manifesto_completo(pasta_results: str = None):
+    # Após uma reconstrução completa, registra no manifesto todos os PDFs indexados
+    extrator = ExtratorDeResumos(pasta_results=pasta_results)
+    manifesto = Manifesto(extrator.pasta_results)
+    manifesto.entradas = {}
+    indexados = set(_docs_indexados(extrator.pasta_results))
+    for nome in sorted(os.listdir(extrator.pasta_docs)):
+        if nome in indexados:
+            manifesto.registrar(nome, os.path.join(extrator.pasta_docs, nome))
+    manifesto.salvar()
+
+#----------------------------------------------------------------------------------------#
+if __name__ == '__main__':
+    resumo = atualizar_incremental(trabalhadores=os.cpu_count() or 1)
+    for chave, nomes in resumo.items():
+        print(f"{chave}: {len(nomes)}")
+        for nome in nomes:
+            print(f"  - {nome}")
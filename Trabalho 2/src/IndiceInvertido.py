@@ -0,0 +1,835 @@
+import os
+import json
+import math
+import heapq
+import mmap
+import struct
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+# Formato binário do índice invertido (little-endian):
+#   cabeçalho | postings e posições | vetores dos documentos | offsets dos nomes | nomes (utf-8) |
+#   DocIDs ordenados por nome | estatísticas dos documentos | somas dos pesos dos documentos |
+#   registros dos termos | termos (utf-8) | metadados (json)
+# As postings de cada termo são pares (delta do DocID, frequência) codificados em varint;
+# o vetor de cada documento usa a mesma codificação com (delta da posição do termo, frequência).
+# Logo após as postings vêm as posições do termo, um bloco por posting na mesma ordem: o
+# tamanho do bloco em bytes e as posições (índice do termo na sequência normalizada do
+# documento) em deltas varint. O tamanho permite pular os documentos que não interessam a
+# uma frase; documentos gravados sem posições têm blocos vazios.
+# As somas dos pesos são três arrays de doubles por DocID, com o tf de cada termo do documento
+# e o df do termo neste índice: Σ tf², Σ tf²·log10(df) e Σ tf²·log10(df)². Como
+# idf = log10(N) - log10(df), a norma com outro N é
+# sqrt(A·log10(N)² - 2·log10(N)·B + C), e um df diferente só exige corrigir B e C nas postings
+# desse termo (normas globais de IndiceSegmentado).
+MAGICO = b'SRIINDX\x00'
+VERSAO_FORMATO = 4
+CABECALHO = struct.Struct('<8sHIIQQQQQQQQQ')
+# offset do termo, tamanho, df, idf, limite superior, offset e tamanho das postings, offset e tamanho das posições
+REGISTRO_TERMO = struct.Struct('<QHIddQIQI')
+ESTATISTICA_DOC = struct.Struct('<IIdQI')   # frequência máxima, comprimento (total de termos), norma, offset e tamanho do vetor
+NOME_INDICE = 'indice.bin'
+
+# Construção com orçamento de memória (SPIMI): índices parciais são termos em ordem crescente,
+# cada um com (tamanho do termo, df, tamanho das posições), o termo (utf-8), os arrays de
+# DocIDs e frequências e os blocos de posições já codificados.
+# Os vetores pendentes guardam, na ordem dos DocIDs, (nº de termos, tamanho do bloco), os
+# termos do documento separados por '\n' e suas frequências.
+REGISTRO_PARCIAL = struct.Struct('<III')
+VETOR_PENDENTE = struct.Struct('<II')
+MEMORIA_POR_TERMO = 300    # bytes estimados por termo novo nas postings em memória
+MEMORIA_POR_POSTING = 10   # bytes estimados por posting em memória
+MAX_PARCIAIS = 64          # parciais abertos de uma vez na intercalação
+
+
+#----------------------------------------------------------------------------------------#
+def calcular_tf(freq: int, max_freq: int) -> float:
+    #Calcula TF normalizado (0.5 + 0.5 * freq/max_freq)
+    return 0.5 + 0.5 * (freq / max_freq)
+
+#----------------------------------------------------------------------------------------#
+def calcular_idf(total_docs: int, docs_com_termo: int) -> float:
+    #Calcula IDF (log(N/df))
+    return math.log10(total_docs / docs_com_termo) if docs_com_termo > 0 else 0
+
+#----------------------------------------------------------------------------------------#
+def codificar_varint(n: int, saida: bytearray):
+    while n >= 0x80:
+        saida.append((n & 0x7F) | 0x80)
+        n >>= 7
+    saida.append(n)
+
+#----------------------------------------------------------------------------------------#
+def decodificar_postings(dados) -> Tuple[array, array]:
+    # Decodifica pares (delta, frequência) em dois arrays ordenados por DocID
+    docs = array('I')
+    freqs = array('I')
+    doc = 0
+    valor = 0
+    deslocamento = 0
+    lendo_doc = True
+    for b in dados:
+        valor |= (b & 0x7F) << deslocamento
+        if b & 0x80:
+            deslocamento += 7
+            continue
+        if lendo_doc:
+            doc += valor
+            docs.append(doc)
+        else:
+            freqs.append(valor)
+        lendo_doc = not lendo_doc
+        valor = 0
+        deslocamento = 0
+    return docs, freqs
+
+#----------------------------------------------------------------------------------------#
+def codificar_posicoes(posicoes: Iterable[int], saida: bytearray):
+    # Bloco de posições de uma posting: tamanho em bytes e as posições (crescentes) em deltas
+    bloco = bytearray()
+    anterior = 0
+    for pos in posicoes:
+        codificar_varint(pos - anterior, bloco)
+        anterior = pos
+    codificar_varint(len(bloco), saida)
+    saida += bloco
+
+#----------------------------------------------------------------------------------------#
+def _decodificar_deltas(dados) -> array:
+    posicoes = array('I')
+    pos = 0
+    valor = 0
+    deslocamento = 0
+    for b in dados:
+        valor |= (b & 0x7F) << deslocamento
+        if b & 0x80:
+            deslocamento += 7
+            continue
+        pos += valor
+        posicoes.append(pos)
+        valor = 0
+        deslocamento = 0
+    return posicoes
+
+#----------------------------------------------------------------------------------------#
+def _blocos_posicoes(dados) -> Iterator[Tuple[int, int]]:
+    # (início, fim) do conteúdo de cada bloco de posições, na ordem das postings
+    i = 0
+    while i < len(dados):
+        tamanho = 0
+        deslocamento = 0
+        while True:
+            b = dados[i]
+            i += 1
+            tamanho |= (b & 0x7F) << deslocamento
+            if b < 0x80:
+                break
+            deslocamento += 7
+        yield i, i + tamanho
+        i += tamanho
+
+#----------------------------------------------------------------------------------------#
+def decodificar_posicoes(dados, docs: Sequence[int], desejados: Set[int] = None) -> Dict[int, array]:
+    # DocID -> posições, para os `docs` das postings (na mesma ordem dos blocos); com
+    # `desejados`, os blocos dos outros documentos são pulados sem decodificar
+    resultado: Dict[int, array] = {}
+    for doc, (inicio, fim) in zip(docs, _blocos_posicoes(dados)):
+        if fim > inicio and (desejados is None or doc in desejados):
+            resultado[doc] = _decodificar_deltas(dados[inicio:fim])
+    return resultado
+
+#----------------------------------------------------------------------------------------#
+def termos_posicionais(termos: Iterable[str]) -> List[Tuple[str, int, array]]:
+    # (termo, frequência, posições) a partir da sequência de termos normalizados de um
+    # documento, na ordem de Counter.most_common (frequência decrescente; empates na ordem
+    # da primeira ocorrência)
+    posicoes: Dict[str, array] = {}
+    for pos, termo in enumerate(termos):
+        lista = posicoes.get(termo)
+        if lista is None:
+            lista = posicoes[termo] = array('I')
+        lista.append(pos)
+    return [(termo, len(lista), lista)
+            for termo, lista in sorted(posicoes.items(), key=lambda item: len(item[1]), reverse=True)]
+
+
+class EscritorIndice:
+    # Escreve o índice em uma única passada: primeiro todos os documentos, depois os termos
+    # em ordem crescente, cada um com sua lista de postings ordenada por DocID.
+    # Com vetores_em_disco, os termos de cada documento vão para um arquivo auxiliar e os
+    # vetores só são montados na finalização, em vez de crescerem em memória com as postings.
+    def __init__(self, caminho: str, metadados: Dict = None, vetores_em_disco: bool = False):
+        self.caminho = caminho
+        self.caminho_tmp = caminho + '.tmp'
+        self.caminho_vetores = caminho + '.vetores.tmp'
+        self.metadados = dict(metadados or {})
+        self.nomes: List[str] = []
+        self.max_freqs = array('I')
+        self.comprimentos = array('I')
+        self.soma_quadrados: Optional[array] = None
+        self.somas_pesos: Tuple[array, array, array] = ()
+        self.vetores: List[Tuple[array, array]] = []  # DocID -> (posições dos termos, frequências)
+        self.registros: List[Tuple[str, int, float, int, int, int, int]] = []
+        self.ultimo_termo: Optional[str] = None
+        self.arquivo = open(self.caminho_tmp, 'wb')
+        self.arquivo.write(b'\0' * CABECALHO.size)
+        self.arquivo_vetores = open(self.caminho_vetores, 'w+b') if vetores_em_disco else None
+
+    #----------------------------------------------------------------------------------------#
+    def adicionar_documento(self, nome: str, max_freq: int, comprimento: int, termos: Sequence = ()) -> int:
+        # `termos` ([(termo, freq), ...], com ou sem posições) só é usado com vetores_em_disco
+        if self.soma_quadrados is not None:
+            raise ValueError("Documentos devem ser adicionados antes dos termos")
+        if self.arquivo_vetores is not None:
+            bloco = '\n'.join(par[0] for par in termos).encode('utf-8')
+            freqs = array('I', (int(par[1]) for par in termos))
+            self.arquivo_vetores.write(VETOR_PENDENTE.pack(len(freqs), len(bloco)))
+            self.arquivo_vetores.write(bloco)
+            self.arquivo_vetores.write(freqs.tobytes())
+        self.nomes.append(nome)
+        self.max_freqs.append(max(max_freq, 1))
+        self.comprimentos.append(comprimento)
+        return len(self.nomes) - 1
+
+    #----------------------------------------------------------------------------------------#
+    def adicionar_termo(self, termo: str, docs, freqs, posicoes: bytes = None):
+        # `posicoes`: blocos de posições (codificar_posicoes) de cada posting, na ordem de
+        # `docs`; sem eles, os documentos ficam sem posições
+        if self.ultimo_termo is not None and termo <= self.ultimo_termo:
+            raise ValueError(f"Termos devem ser adicionados em ordem crescente: {termo}")
+        self.ultimo_termo = termo
+        if self.soma_quadrados is None:
+            self._iniciar_termos()
+
+        total_docs = len(self.nomes)
+        idf = calcular_idf(total_docs, len(docs))
+        log_df = math.log10(len(docs)) if docs else 0.0
+        somas_tf, somas_log, somas_log2 = self.somas_pesos
+        posicao = len(self.registros)
+        dados = bytearray()
+        anterior = 0
+        for doc, freq in zip(docs, freqs):
+            codificar_varint(doc - anterior, dados)
+            codificar_varint(freq, dados)
+            anterior = doc
+            tf = calcular_tf(freq, self.max_freqs[doc])
+            peso = tf * idf
+            self.soma_quadrados[doc] += peso ** 2
+            quadrado = tf * tf
+            somas_tf[doc] += quadrado
+            somas_log[doc] += quadrado * log_df
+            somas_log2[doc] += quadrado * log_df * log_df
+            if self.arquivo_vetores is None:
+                self.vetores[doc][0].append(posicao)
+                self.vetores[doc][1].append(freq)
+
+        if posicoes is None:
+            posicoes = bytes(len(docs))
+        offset = self.arquivo.tell()
+        self.arquivo.write(dados)
+        self.arquivo.write(posicoes)
+        self.registros.append((termo, len(docs), idf, offset, len(dados), offset + len(dados), len(posicoes)))
+
+    #----------------------------------------------------------------------------------------#
+    def _iniciar_termos(self):
+        self.soma_quadrados = array('d', bytes(8 * len(self.nomes)))
+        self.somas_pesos = tuple(array('d', bytes(8 * len(self.nomes))) for _ in range(3))
+        if self.arquivo_vetores is None:
+            self.vetores = [(array('I'), array('I')) for _ in self.nomes]
+
+    #----------------------------------------------------------------------------------------#
+    def _vetores(self) -> Iterator[Tuple[array, array]]:
+        if self.arquivo_vetores is None:
+            yield from self.vetores
+            return
+        # Remonta cada vetor trocando os termos gravados pelas suas posições no léxico
+        posicoes = {registro[0]: i for i, registro in enumerate(self.registros)}
+        f = self.arquivo_vetores
+        f.flush()
+        f.seek(0)
+        for _ in range(len(self.nomes)):
+            num_termos, tamanho = VETOR_PENDENTE.unpack(f.read(VETOR_PENDENTE.size))
+            termos = f.read(tamanho).decode('utf-8').split('\n') if num_termos else []
+            freqs = array('I')
+            freqs.frombytes(f.read(4 * num_termos))
+            pares = sorted(zip(map(posicoes.__getitem__, termos), freqs))
+            yield array('I', (p for p, _ in pares)), array('I', (c for _, c in pares))
+
+    #----------------------------------------------------------------------------------------#
+    def _fechar_vetores(self):
+        if self.arquivo_vetores is not None:
+            self.arquivo_vetores.close()
+            self.arquivo_vetores = None
+            os.remove(self.caminho_vetores)
+
+    #----------------------------------------------------------------------------------------#
+    def finalizar(self):
+        if self.soma_quadrados is None:
+            self._iniciar_termos()
+        normas = array('d', (math.sqrt(s) for s in self.soma_quadrados))
+        limites = self._calcular_limites(normas)
+
+        # Vetores dos documentos: permitem recalcular df e normas quando há lápides
+        f = self.arquivo
+        posicoes_vetores = []
+        for posicoes, freqs in self._vetores():
+            dados = bytearray()
+            anterior = 0
+            for pos, freq in zip(posicoes, freqs):
+                codificar_varint(pos - anterior, dados)
+                codificar_varint(freq, dados)
+                anterior = pos
+            posicoes_vetores.append((f.tell(), len(dados)))
+            f.write(dados)
+        self.vetores = []
+        self._fechar_vetores()
+
+        off_nomes = f.tell()
+        blob_nomes = [n.encode('utf-8') for n in self.nomes]
+        posicao = 0
+        offsets = array('Q', [0])
+        for b in blob_nomes:
+            posicao += len(b)
+            offsets.append(posicao)
+        f.write(offsets.tobytes())
+        off_blob_nomes = f.tell()
+        for b in blob_nomes:
+            f.write(b)
+
+        off_ordem_nomes = f.tell()
+        f.write(array('I', sorted(range(len(self.nomes)), key=self.nomes.__getitem__)).tobytes())
+
+        off_estatisticas = f.tell()
+        for i in range(len(self.nomes)):
+            f.write(ESTATISTICA_DOC.pack(self.max_freqs[i], self.comprimentos[i], normas[i], *posicoes_vetores[i]))
+
+        off_somas = f.tell()
+        for somas in self.somas_pesos:
+            f.write(somas.tobytes())
+
+        off_termos = f.tell()
+        posicao = 0
+        blob_termos = []
+        for (termo, df, idf, off_post, tam_post, off_pos, tam_pos), limite in zip(self.registros, limites):
+            b = termo.encode('utf-8')
+            f.write(REGISTRO_TERMO.pack(posicao, len(b), df, idf, limite, off_post, tam_post, off_pos, tam_pos))
+            blob_termos.append(b)
+            posicao += len(b)
+        off_blob_termos = f.tell()
+        for b in blob_termos:
+            f.write(b)
+
+        # A soma dos comprimentos dá o comprimento médio usado pelo BM25
+        off_meta = f.tell()
+        metadados = dict(self.metadados, comprimento_total=sum(self.comprimentos))
+        f.write(json.dumps(metadados, ensure_ascii=False).encode('utf-8'))
+        fim = f.tell()
+
+        f.seek(0)
+        f.write(CABECALHO.pack(MAGICO, VERSAO_FORMATO, len(self.nomes), len(self.registros),
+                               off_nomes, off_blob_nomes, off_ordem_nomes, off_estatisticas,
+                               off_termos, off_blob_termos, off_meta, fim, off_somas))
+        f.close()
+        os.replace(self.caminho_tmp, self.caminho)
+
+    #----------------------------------------------------------------------------------------#
+    def _calcular_limites(self, normas: array) -> List[float]:
+        # Segunda passada pelas postings já gravadas: maior peso/norma de cada termo
+        self.arquivo.flush()
+        limites = []
+        with open(self.caminho_tmp, 'rb') as leitor:
+            for termo, df, idf, off_post, tam_post, _, _ in self.registros:
+                leitor.seek(off_post)
+                docs, freqs = decodificar_postings(leitor.read(tam_post))
+                maior = 0.0
+                for doc, freq in zip(docs, freqs):
+                    if normas[doc] > 0:
+                        maior = max(maior, calcular_tf(freq, self.max_freqs[doc]) * idf / normas[doc])
+                limites.append(maior)
+        return limites
+
+    #----------------------------------------------------------------------------------------#
+    def descartar(self):
+        self.arquivo.close()
+        if os.path.exists(self.caminho_tmp):
+            os.remove(self.caminho_tmp)
+        self._fechar_vetores()
+
+
+#----------------------------------------------------------------------------------------#
+def _gravar_parcial(termos: Iterable[Tuple[str, array, array, bytearray]], caminho: str) -> str:
+    with open(caminho, 'wb') as f:
+        for termo, docs, freqs, posicoes in termos:
+            b = termo.encode('utf-8')
+            f.write(REGISTRO_PARCIAL.pack(len(b), len(docs), len(posicoes)))
+            f.write(b)
+            f.write(docs.tobytes())
+            f.write(freqs.tobytes())
+            f.write(posicoes)
+    return caminho
+
+#----------------------------------------------------------------------------------------#
+def _ler_parcial(arquivo) -> Iterator[Tuple[str, array, array, bytearray]]:
+    while True:
+        cabecalho = arquivo.read(REGISTRO_PARCIAL.size)
+        if not cabecalho:
+            return
+        tamanho, df, tamanho_posicoes = REGISTRO_PARCIAL.unpack(cabecalho)
+        termo = arquivo.read(tamanho).decode('utf-8')
+        docs = array('I')
+        docs.frombytes(arquivo.read(4 * df))
+        freqs = array('I')
+        freqs.frombytes(arquivo.read(4 * df))
+        yield termo, docs, freqs, bytearray(arquivo.read(tamanho_posicoes))
+
+#----------------------------------------------------------------------------------------#
+def _intercalar_parciais(caminhos: List[str]) -> Iterator[Tuple[str, array, array, bytearray]]:
+    # Intercalação k-way dos índices parciais. Cada parcial cobre DocIDs maiores que os do
+    # anterior e o merge é estável, então as postings de um termo (e seus blocos de
+    # posições, que não dependem do DocID) são só concatenadas.
+    arquivos = [open(c, 'rb') for c in caminhos]
+    try:
+        atual = None
+        for termo, docs, freqs, posicoes in heapq.merge(*map(_ler_parcial, arquivos), key=itemgetter(0)):
+            if termo == atual:
+                docs_atual.extend(docs)
+                freqs_atual.extend(freqs)
+                posicoes_atual.extend(posicoes)
+                continue
+            if atual is not None:
+                yield atual, docs_atual, freqs_atual, posicoes_atual
+            atual, docs_atual, freqs_atual, posicoes_atual = termo, docs, freqs, posicoes
+        if atual is not None:
+            yield atual, docs_atual, freqs_atual, posicoes_atual
+    finally:
+        for arquivo in arquivos:
+            arquivo.close()
+
+#----------------------------------------------------------------------------------------#
+def _esvaziar_postings(postings: Dict[str, Tuple[array, array, bytearray]]) -> Iterator[Tuple[str, array, array, bytearray]]:
+    # Postings em ordem de termo, retiradas da memória à medida que são consumidas
+    for termo in sorted(postings):
+        yield (termo, *postings.pop(termo))
+
+#----------------------------------------------------------------------------------------#
+def _despejar_parcial(postings: Dict[str, Tuple[array, array, bytearray]], parciais: List[str], prefixo: str):
+    # Grava as postings como um parcial novo; ao chegar a MAX_PARCIAIS, os parciais
+    # existentes (em sequência de DocIDs) são intercalados num só
+    if len(parciais) >= MAX_PARCIAIS:
+        caminho = f"{prefixo}.parcial{len(parciais)}"
+        termos = _intercalar_parciais(parciais)
+        try:
+            _gravar_parcial(termos, caminho)
+        finally:
+            termos.close()
+        for parcial in parciais:
+            os.remove(parcial)
+        os.replace(caminho, f"{prefixo}.parcial0")
+        parciais[:] = [f"{prefixo}.parcial0"]
+    parciais.append(_gravar_parcial(_esvaziar_postings(postings), f"{prefixo}.parcial{len(parciais)}"))
+
+#----------------------------------------------------------------------------------------#
+def escrever_indice(dados: Union[Dict[str, List[List]], Iterable[Tuple[str, Sequence]]], caminho: str,
+                    metadados: Dict = None, memoria_maxima: int = None) -> List[str]:
+    # Converte o formato de frequencies_summary.json ({ "Doc.pdf": [[termo, freq], ...] })
+    # para o índice binário. Os DocIDs seguem a ordem dos documentos no JSON. `dados` também
+    # pode ser um iterável de pares (nome, [(termo, freq), ...]) consumido um documento por
+    # vez: só as postings, em arrays, ficam em memória. Retorna os nomes na ordem dos DocIDs.
+    # Cada termo pode trazer suas posições no documento, (termo, freq, posições) como em
+    # termos_posicionais; termos sem posições (ex.: vindos do JSON) ficam sem elas.
+    # Com `memoria_maxima` (bytes), a construção é SPIMI: quando a estimativa das postings
+    # acumuladas passa do orçamento, elas são gravadas ordenadas num índice parcial em disco;
+    # no fim os parciais são intercalados termo a termo e os vetores dos documentos são
+    # montados a partir do disco. Em memória ficam só o léxico e as estatísticas por documento.
+    postings: Dict[str, Tuple[array, array, bytearray]] = {}
+    escritor = EscritorIndice(caminho, metadados, vetores_em_disco=memoria_maxima is not None)
+    documentos = dados.items() if isinstance(dados, Mapping) else dados
+    parciais: List[str] = []
+    estimativa = 0
+    try:
+        for pdf_nome, freq_list in documentos:
+            freqs = [int(par[1]) for par in freq_list]
+            doc = escritor.adicionar_documento(pdf_nome, max(freqs, default=1), sum(freqs), freq_list)
+            for par in freq_list:
+                entrada = postings.get(par[0])
+                if entrada is None:
+                    entrada = postings[par[0]] = (array('I'), array('I'), bytearray())
+                    estimativa += MEMORIA_POR_TERMO
+                entrada[0].append(doc)
+                entrada[1].append(int(par[1]))
+                if len(par) > 2:
+                    tamanho = len(entrada[2])
+                    codificar_posicoes(par[2], entrada[2])
+                    estimativa += len(entrada[2]) - tamanho
+                else:
+                    entrada[2].append(0)  # bloco vazio
+            estimativa += MEMORIA_POR_POSTING * len(freqs)
+            if memoria_maxima is not None and estimativa > memoria_maxima:
+                _despejar_parcial(postings, parciais, escritor.caminho_tmp)
+                estimativa = 0
+        if parciais:
+            if postings:
+                _despejar_parcial(postings, parciais, escritor.caminho_tmp)
+            termos = _intercalar_parciais(parciais)
+        else:
+            termos = _esvaziar_postings(postings)
+        try:
+            for termo, docs, freqs, posicoes in termos:
+                escritor.adicionar_termo(termo, docs, freqs, posicoes)
+        finally:
+            termos.close()
+        escritor.finalizar()
+    except BaseException:
+        escritor.descartar()
+        raise
+    finally:
+        for parcial in parciais:
+            os.remove(parcial)
+    return escritor.nomes
+
+#----------------------------------------------------------------------------------------#
+def mesclar_indices(fontes: Sequence[Tuple['IndiceInvertido', Set[int]]], caminho: str,
+                    metadados: Dict = None) -> List[str]:
+    # Grava num índice só os documentos das `fontes` (índices sem alterações em memória e os
+    # DocIDs removidos de cada um), na ordem das fontes e sem os removidos. A mesclagem é
+    # termo a termo: as postings e os blocos de posições de cada fonte são copiados com os
+    # DocIDs renumerados, sem reconstruir os documentos. Retorna os nomes na ordem dos DocIDs.
+    escritor = EscritorIndice(caminho, metadados, vetores_em_disco=True)
+    try:
+        novos: List[Dict[int, int]] = []  # por fonte: DocID local -> DocID no índice novo
+        for indice, removidos in fontes:
+            novos.append({})
+            for doc in range(indice.num_docs):
+                if doc not in removidos:
+                    max_freq, comprimento, _ = indice.estatisticas(doc)
+                    novos[-1][doc] = escritor.adicionar_documento(indice.nome(doc), max_freq, comprimento,
+                                                                  indice.vetor_documento(doc))
+        anterior = None
+        for termo in heapq.merge(*(indice.termos() for indice, _ in fontes)):
+            if termo == anterior:
+                continue
+            anterior = termo
+            docs, freqs, posicoes = array('I'), array('I'), bytearray()
+            for (indice, _), mapa in zip(fontes, novos):
+                reg = indice._registro(termo)
+                if reg is None:
+                    continue
+                docs_fonte, freqs_fonte = indice.postings(termo)
+                dados = indice.mapa[reg[7]:reg[7] + reg[8]]
+                inicio_bloco = 0
+                for doc, freq, (inicio, fim) in zip(docs_fonte, freqs_fonte, _blocos_posicoes(dados)):
+                    novo = mapa.get(doc)
+                    if novo is not None:
+                        docs.append(novo)
+                        freqs.append(freq)
+                        posicoes += dados[inicio_bloco:fim]
+                    inicio_bloco = fim
+            if docs:
+                escritor.adicionar_termo(termo, docs, freqs, posicoes)
+        escritor.finalizar()
+    except BaseException:
+        escritor.descartar()
+        raise
+    return escritor.nomes
+
+
+class NomesDocumentos(Mapping):
+    # Visão somente-leitura nome_arquivo -> nome_arquivo sobre a tabela de documentos do índice
+    def __init__(self, indice: 'IndiceInvertido'):
+        self.indice = indice
+
+    def __getitem__(self, nome: str) -> str:
+        if self.indice.id_documento(nome) is None:
+            raise KeyError(nome)
+        return nome
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.indice.nome(i) for i in self.indice.documentos())
+
+    def __len__(self) -> int:
+        return self.indice.num_docs_ativos
+
+    def __contains__(self, nome) -> bool:
+        return isinstance(nome, str) and self.indice.id_documento(nome) is not None
+
+
+class IdsDocumentos(Mapping):
+    # Visão somente-leitura nome_arquivo -> DocID inteiro
+    def __init__(self, indice: 'IndiceInvertido'):
+        self.indice = indice
+
+    def __getitem__(self, nome: str) -> int:
+        doc = self.indice.id_documento(nome)
+        if doc is None:
+            raise KeyError(nome)
+        return doc
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.indice.nome(i) for i in self.indice.documentos())
+
+    def __len__(self) -> int:
+        return self.indice.num_docs_ativos
+
+
+class TabelaDocumentos(Sequence):
+    # Visão somente-leitura DocID inteiro -> nome_arquivo
+    def __init__(self, indice: 'IndiceInvertido'):
+        self.indice = indice
+
+    def __getitem__(self, doc: int) -> str:
+        if not 0 <= doc < self.indice.num_docs:
+            raise IndexError(doc)
+        return self.indice.nome(doc)
+
+    def __len__(self) -> int:
+        return self.indice.num_docs
+
+
+class IndiceInvertido:
+    # Leitor do índice binário via mmap. Só o cabeçalho é lido na abertura; termos são
+    # localizados por busca binária no dicionário e as postings decodificadas sob demanda.
+    # Uma única instância é compartilhada pelos modelos booleano e vetorial, de modo que
+    # as postings decodificadas (cache LRU limitado) servem às duas buscas.
+    # O arquivo é imutável: documentos novos, alterados e removidos entram no índice como
+    # segmentos e lápides do conjunto (IndiceSegmentado), não neste leitor.
+    def __init__(self, caminho: str, max_postings_em_cache: int = 1024):
+        self.caminho = caminho
+        self.arquivo = open(caminho, 'rb')
+        try:
+            self.mapa = mmap.mmap(self.arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.arquivo.close()
+            raise ValueError(f"Índice vazio ou corrompido: {caminho}")
+
+        (magico, versao, self.num_docs, self.num_termos,
+         self.off_nomes, self.off_blob_nomes, self.off_ordem_nomes, self.off_estatisticas,
+         self.off_termos, self.off_blob_termos, self.off_meta, self.fim, self.off_somas) = CABECALHO.unpack_from(self.mapa, 0)
+        if magico != MAGICO or versao != VERSAO_FORMATO:
+            self.mapa.close()
+            self.arquivo.close()
+            raise ValueError(f"Formato de índice desconhecido: {caminho}")
+
+        self.posicoes: Dict[str, int] = {}  # termo -> posição no dicionário (cache das buscas binárias)
+        self.cache_postings: 'OrderedDict[str, Tuple[array, array]]' = OrderedDict()
+        self.max_postings_em_cache = max_postings_em_cache
+        self.nomes_documentos = NomesDocumentos(self)
+        self.ids_documentos = IdsDocumentos(self)
+        self.tabela_documentos = TabelaDocumentos(self)
+        self._metadados = None
+        self.versao = 0                    # o conteúdo não muda: caches de resultados valem sempre
+        self.removidos: Set[int] = set()   # sem lápides (as do conjunto ficam em IndiceSegmentado)
+        self.comprimento_base: Optional[int] = None  # soma dos comprimentos dos documentos
+
+    #----------------------------------------------------------------------------------------#
+    def fechar(self):
+        self.cache_postings.clear()
+        if self.mapa is not None:
+            self.mapa.close()
+            self.mapa = None
+        self.arquivo.close()
+
+    #----------------------------------------------------------------------------------------#
+    @property
+    def metadados(self) -> Dict:
+        if self._metadados is None:
+            self._metadados = json.loads(self.mapa[self.off_meta:self.fim].decode('utf-8'))
+        return self._metadados
+
+    @property
+    def analisador(self) -> Optional[Dict]:
+        # Configuração do analisador que gerou os termos (None: analisador antigo)
+        return self.metadados.get('analisador')
+
+    #----------------------------------------------------------------------------------------#
+    def _termo_na_posicao(self, i: int) -> str:
+        off, tam = struct.unpack_from('<QH', self.mapa, self.off_termos + i * REGISTRO_TERMO.size)
+        inicio = self.off_blob_termos + off
+        return self.mapa[inicio:inicio + tam].decode('utf-8')
+
+    #----------------------------------------------------------------------------------------#
+    def _posicao(self, termo: str) -> int:
+        # Busca binária no dicionário de termos; -1 se o termo não existir
+        pos = self.posicoes.get(termo)
+        if pos is not None:
+            return pos
+        baixo, alto = 0, self.num_termos - 1
+        pos = -1
+        while baixo <= alto:
+            meio = (baixo + alto) // 2
+            atual = self._termo_na_posicao(meio)
+            if atual == termo:
+                pos = meio
+                break
+            if atual < termo:
+                baixo = meio + 1
+            else:
+                alto = meio - 1
+        self.posicoes[termo] = pos
+        return pos
+
+    #----------------------------------------------------------------------------------------#
+    def _registro(self, termo: str) -> Optional[Tuple]:
+        pos = self._posicao(termo)
+        if pos < 0:
+            return None
+        return REGISTRO_TERMO.unpack_from(self.mapa, self.off_termos + pos * REGISTRO_TERMO.size)
+
+    #----------------------------------------------------------------------------------------#
+    def __contains__(self, termo: str) -> bool:
+        return self._posicao(termo) >= 0
+
+    def df(self, termo: str) -> int:
+        reg = self._registro(termo)
+        return reg[2] if reg else 0
+
+    def idf(self, termo: str) -> float:
+        reg = self._registro(termo)
+        return reg[3] if reg else 0.0
+
+    def limite_superior(self, termo: str) -> float:
+        reg = self._registro(termo)
+        return reg[4] if reg else 0.0
+
+    #----------------------------------------------------------------------------------------#
+    def postings(self, termo: str) -> Tuple[array, array]:
+        # Retorna (DocIDs, frequências) do termo, ambos ordenados por DocID.
+        # Os arrays são compartilhados via cache e não devem ser alterados pelo chamador.
+        par = self.cache_postings.get(termo)
+        if par is not None:
+            self.cache_postings.move_to_end(termo)
+            return par
+        reg = self._registro(termo)
+        if reg is None:
+            par = array('I'), array('I')
+        else:
+            off, tam = reg[5], reg[6]
+            par = decodificar_postings(self.mapa[off:off + tam])
+        self.cache_postings[termo] = par
+        if len(self.cache_postings) > self.max_postings_em_cache:
+            self.cache_postings.popitem(last=False)
+        return par
+
+    #----------------------------------------------------------------------------------------#
+    def posicoes_termo(self, termo: str, docs: Iterable[int] = None) -> Dict[int, array]:
+        # DocID -> posições do termo no documento (índices na sequência de termos normalizados,
+        # em ordem crescente); com `docs`, só para esses DocIDs, pulando os blocos dos demais.
+        # Documentos gravados sem posições não aparecem.
+        desejados = None if docs is None else set(docs)
+        if desejados is not None and not desejados:
+            return {}
+        reg = self._registro(termo)
+        if reg is None or not reg[8]:
+            return {}
+        docs_termo, _ = self.postings(termo)
+        return decodificar_posicoes(self.mapa[reg[7]:reg[7] + reg[8]], docs_termo, desejados)
+
+    #----------------------------------------------------------------------------------------#
+    def termos(self) -> Iterator[str]:
+        return (self._termo_na_posicao(i) for i in range(self.num_termos))
+
+    #----------------------------------------------------------------------------------------#
+    @property
+    def num_docs_ativos(self) -> int:
+        return self.num_docs
+
+    def documentos(self) -> Iterator[int]:
+        # DocIDs em uso, em ordem crescente
+        return iter(range(self.num_docs))
+
+    def docs_removidos(self) -> array:
+        return array('I')
+
+    #----------------------------------------------------------------------------------------#
+    @property
+    def comprimento_total(self) -> int:
+        # Soma dos comprimentos dos documentos, gravada nos metadados
+        if self.comprimento_base is None:
+            total = self.metadados.get('comprimento_total')
+            if total is None:  # índice gravado antes de o total ir para os metadados
+                total = sum(self.comprimento(d) for d in range(self.num_docs))
+            self.comprimento_base = total
+        return self.comprimento_base
+
+    @property
+    def comprimento_medio(self) -> float:
+        num_docs = self.num_docs_ativos
+        return self.comprimento_total / num_docs if num_docs else 0.0
+
+    #----------------------------------------------------------------------------------------#
+    def nome(self, doc: int) -> str:
+        inicio, fim = struct.unpack_from('<QQ', self.mapa, self.off_nomes + doc * 8)
+        return self.mapa[self.off_blob_nomes + inicio:self.off_blob_nomes + fim].decode('utf-8')
+
+    #----------------------------------------------------------------------------------------#
+    def id_documento(self, nome: str) -> Optional[int]:
+        # Busca binária sobre os DocIDs ordenados por nome
+        baixo, alto = 0, self.num_docs - 1
+        while baixo <= alto:
+            meio = (baixo + alto) // 2
+            doc = struct.unpack_from('<I', self.mapa, self.off_ordem_nomes + meio * 4)[0]
+            atual = self.nome(doc)
+            if atual == nome:
+                return doc
+            if atual < nome:
+                baixo = meio + 1
+            else:
+                alto = meio - 1
+        return None
+
+    #----------------------------------------------------------------------------------------#
+    def _estatisticas_base(self, doc: int) -> Tuple[int, int, float, int, int]:
+        return ESTATISTICA_DOC.unpack_from(self.mapa, self.off_estatisticas + doc * ESTATISTICA_DOC.size)
+
+    def estatisticas(self, doc: int) -> Tuple[int, int, float]:
+        # (frequência máxima, comprimento, norma) do documento
+        return self._estatisticas_base(doc)[:3]
+
+    def max_freq(self, doc: int) -> int:
+        return self._estatisticas_base(doc)[0]
+
+    def comprimento(self, doc: int) -> int:
+        return self._estatisticas_base(doc)[1]
+
+    def norma(self, doc: int) -> float:
+        return self._estatisticas_base(doc)[2]
+
+    #----------------------------------------------------------------------------------------#
+    def max_freqs(self) -> array:
+        # Frequência máxima de cada documento, na ordem dos DocIDs
+        dados = self.mapa[self.off_estatisticas:self.off_estatisticas + self.num_docs * ESTATISTICA_DOC.size]
+        return array('I', (estatistica[0] for estatistica in ESTATISTICA_DOC.iter_unpack(dados)))
+
+    def somas_pesos(self) -> Tuple[array, array, array]:
+        # (Σ tf², Σ tf²·log10(df), Σ tf²·log10(df)²) de cada documento, com o df deste índice
+        tamanho = 8 * self.num_docs
+        somas = []
+        for i in range(3):
+            somas.append(array('d'))
+            somas[-1].frombytes(self.mapa[self.off_somas + i * tamanho:self.off_somas + (i + 1) * tamanho])
+        return tuple(somas)
+
+    #----------------------------------------------------------------------------------------#
+    def vetor_documento(self, doc: int) -> List[Tuple[str, int]]:
+        # Pares (termo, frequência) do documento, em ordem crescente de termo; usados para
+        # recalcular df e normas quando o documento vira lápide num conjunto de segmentos
+        _, _, _, off, tam = self._estatisticas_base(doc)
+        posicoes, freqs = decodificar_postings(self.mapa[off:off + tam])
+        return [(self._termo_na_posicao(p), f) for p, f in zip(posicoes, freqs)]
+
+
+#----------------------------------------------------------------------------------------#
+def caminho_json_padrao() -> str:
+    src_dir = os.path.dirname(__file__)
+    raiz = os.path.abspath(os.path.join(src_dir, '..'))
+    return os.path.join(raiz, 'results', 'frequencies_summary.json')
+
+#----------------------------------------------------------------------------------------#
+def construir_de_json(freq_json_path: str, caminho_indice: str = None) -> str:
+    caminho_indice = caminho_indice or os.path.join(os.path.dirname(freq_json_path), NOME_INDICE)
+    with open(freq_json_path, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    escrever_indice(dados, caminho_indice, {'origem': os.path.basename(freq_json_path)})
+    return caminho_indice
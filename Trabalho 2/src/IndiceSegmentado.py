@@ -0,0 +1,797 @@
+import os
+import json
+import math
+import heapq
+import logging
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from IndiceInvertido import (IndiceInvertido, NomesDocumentos, IdsDocumentos, TabelaDocumentos,
+                             escrever_indice, mesclar_indices, termos_posicionais, calcular_tf,
+                             calcular_idf, caminho_json_padrao)
+
+# O índice é um conjunto de segmentos imutáveis (arquivos no formato de IndiceInvertido)
+# listados em segmentos.json na ordem de ingestão. Cada lote processado vira um segmento
+# novo; documentos removidos ou substituídos ficam como lápides (DocIDs locais) no segmento
+# em que estão, até que uma mesclagem reescreva esse segmento sem eles. A lista também
+# registra a configuração do analisador ({'etapas': [...]}) com que os termos foram gerados;
+# sem registro, o índice é do analisador antigo (plural simples).
+PASTA_SEGMENTOS = 'segmentos'
+NOME_LISTA_SEGMENTOS = 'segmentos.json'
+FATOR_MESCLAGEM = 4        # segmentos vizinhos do mesmo nível mesclados de uma vez
+TAMANHO_NIVEL_BASE = 16    # documentos vivos que cabem no menor nível
+FRACAO_LAPIDES = 0.5       # a partir desta fração de lápides o segmento é reescrito sozinho
+MEMORIA_INDEXACAO = 256 << 20  # orçamento (bytes) das postings em memória ao gravar um segmento
+
+# Documentos a gravar: dict { "Doc.pdf": [[termo, freq], ...] } ou iterável de pares
+# (nome, [(termo, freq), ...]) consumido um documento por vez; cada termo pode trazer também
+# suas posições no documento, (termo, freq, posições)
+Documentos = Union[Dict[str, List], Iterable[Tuple[str, List]]]
+
+_travas: Dict[str, Tuple[threading.Lock, threading.Lock]] = {}
+_trava_travas = threading.Lock()
+
+
+#----------------------------------------------------------------------------------------#
+def _travas_da_pasta(pasta: str) -> Tuple[threading.Lock, threading.Lock]:
+    # (lista de segmentos, mesclagem), compartilhadas por todas as instâncias da mesma pasta
+    chave = os.path.abspath(pasta)
+    with _trava_travas:
+        if chave not in _travas:
+            _travas[chave] = (threading.Lock(), threading.Lock())
+        return _travas[chave]
+
+#----------------------------------------------------------------------------------------#
+def nivel(num_docs: int) -> int:
+    # Nível de tamanho do segmento: cada nível comporta FATOR_MESCLAGEM vezes mais documentos
+    n = 0
+    limite = TAMANHO_NIVEL_BASE
+    while num_docs > limite:
+        limite *= FATOR_MESCLAGEM
+        n += 1
+    return n
+
+#----------------------------------------------------------------------------------------#
+def escolher_mesclagem(segmentos: List[Dict]) -> Optional[Tuple[int, int]]:
+    # Política em níveis: FATOR_MESCLAGEM segmentos vizinhos do mesmo nível viram um só, do
+    # nível seguinte, de modo que o número de segmentos cresce com log(N). Só segmentos
+    # vizinhos são mesclados, preservando a ordem dos DocIDs. Retorna o intervalo [início, fim).
+    for i, entrada in enumerate(segmentos):
+        if len(entrada['removidos']) >= entrada['num_docs'] * FRACAO_LAPIDES:
+            return i, i + 1
+
+    niveis = [nivel(e['num_docs'] - len(e['removidos'])) for e in segmentos]
+    fim = len(niveis)
+    while fim > 0:
+        inicio = fim - 1
+        while inicio > 0 and niveis[inicio - 1] == niveis[fim - 1]:
+            inicio -= 1
+        if fim - inicio >= FATOR_MESCLAGEM:
+            return fim - FATOR_MESCLAGEM, fim
+        fim = inicio
+
+    # Níveis fora de ordem (ex.: segmento que encolheu) podem impedir as sequências acima;
+    # acima do limite de segmentos, mescla o par vizinho menor
+    if len(segmentos) > (FATOR_MESCLAGEM - 1) * (max(niveis, default=0) + 2):
+        vivos = [e['num_docs'] - len(e['removidos']) for e in segmentos]
+        i = min(range(len(vivos) - 1), key=lambda j: vivos[j] + vivos[j + 1])
+        return i, i + 2
+    return None
+
+
+class ConjuntoSegmentos:
+    # Mantém a lista de segmentos de uma pasta: grava lotes, marca lápides e mescla.
+    # Alterações da lista são serializadas por uma trava; leitores (IndiceSegmentado) só
+    # leem a lista, que é sempre substituída de forma atômica. Segmentos maiores que o
+    # orçamento `memoria_maxima` são construídos com índices parciais em disco (SPIMI).
+    def __init__(self, pasta: str, memoria_maxima: Optional[int] = MEMORIA_INDEXACAO):
+        self.pasta = pasta
+        self.memoria_maxima = memoria_maxima
+        self.caminho = os.path.join(pasta, NOME_LISTA_SEGMENTOS)
+        self.trava, self.trava_mesclagem = _travas_da_pasta(pasta)
+
+    #----------------------------------------------------------------------------------------#
+    def existe(self) -> bool:
+        return os.path.exists(self.caminho)
+
+    #----------------------------------------------------------------------------------------#
+    def ler(self) -> Dict:
+        if not self.existe():
+            return {'proximo': 1, 'segmentos': []}
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    #----------------------------------------------------------------------------------------#
+    def _salvar(self, estado: Dict):
+        os.makedirs(self.pasta, exist_ok=True)
+        tmp = self.caminho + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.caminho)
+
+    #----------------------------------------------------------------------------------------#
+    def analisador(self) -> Optional[Dict]:
+        return self.ler().get('analisador')
+
+    #----------------------------------------------------------------------------------------#
+    def _novo_segmento(self, estado: Dict, dados: Documentos = None,
+                       fontes: List[Tuple[IndiceInvertido, Set[int]]] = None) -> Tuple[Optional[Dict], List[str]]:
+        # Grava um segmento com os documentos de `dados` ou, numa mesclagem, com os documentos
+        # vivos das `fontes` (segmentos abertos e suas lápides); retorna sua entrada na lista
+        # (None se não havia documentos) e os nomes gravados
+        arquivo = f"segmento_{estado['proximo']:06d}.bin"
+        estado['proximo'] += 1
+        os.makedirs(self.pasta, exist_ok=True)
+        metadados = {'segmento': arquivo}
+        if estado.get('analisador'):
+            metadados['analisador'] = estado['analisador']
+        caminho = os.path.join(self.pasta, arquivo)
+        if fontes is not None:
+            nomes = mesclar_indices(fontes, caminho, metadados)
+        else:
+            nomes = escrever_indice(dados, caminho, metadados, self.memoria_maxima)
+        if not nomes:
+            self._apagar_arquivos([arquivo])
+            return None, nomes
+        return {'arquivo': arquivo, 'num_docs': len(nomes), 'removidos': []}, nomes
+
+    #----------------------------------------------------------------------------------------#
+    def _apagar_arquivos(self, arquivos: List[str]):
+        # No Windows um segmento ainda mapeado por um leitor não pode ser apagado;
+        # nesse caso ele fica para a limpeza da próxima mesclagem
+        for arquivo in arquivos:
+            try:
+                os.remove(os.path.join(self.pasta, arquivo))
+            except OSError:
+                pass
+
+    #----------------------------------------------------------------------------------------#
+    def recriar(self, dados: Documentos, analisador: Dict = None) -> List[str]:
+        # Substitui todo o conjunto por um segmento único (reconstrução completa). Sem
+        # `analisador`, mantém a configuração registrada antes. Retorna os nomes gravados.
+        with self.trava:
+            estado = self.ler()
+            antigos = [e['arquivo'] for e in estado['segmentos']]
+            novo = {'proximo': estado['proximo'], 'segmentos': []}
+            analisador = analisador or estado.get('analisador')
+            if analisador:
+                novo['analisador'] = analisador
+            entrada, nomes = self._novo_segmento(novo, dados)
+            if entrada is not None:
+                novo['segmentos'].append(entrada)
+            self._salvar(novo)
+        self._apagar_arquivos(antigos)
+        return nomes
+
+    #----------------------------------------------------------------------------------------#
+    def adicionar_lote(self, dados: Documentos, removidos: List[str] = ()) -> List[str]:
+        # Grava os documentos do lote ({ "Doc.pdf": [[termo, freq], ...] }) num segmento novo.
+        # Versões anteriores desses documentos e os documentos removidos viram lápides.
+        # Retorna os nomes gravados.
+        with self.trava:
+            estado = self.ler()
+            entrada, nomes = self._novo_segmento(estado, dados)
+            saem = set(removidos) | set(nomes)
+            if saem:
+                self._marcar_lapides(estado, saem)
+            if entrada is not None:
+                estado['segmentos'].append(entrada)
+            self._salvar(estado)
+        return nomes
+
+    #----------------------------------------------------------------------------------------#
+    def _marcar_lapides(self, estado: Dict, nomes: Set[str]):
+        for entrada in estado['segmentos']:
+            segmento = IndiceInvertido(os.path.join(self.pasta, entrada['arquivo']))
+            try:
+                removidos = set(entrada['removidos'])
+                for nome in nomes:
+                    doc = segmento.id_documento(nome)
+                    if doc is not None:
+                        removidos.add(doc)
+                entrada['removidos'] = sorted(removidos)
+            finally:
+                segmento.fechar()
+
+    #----------------------------------------------------------------------------------------#
+    def nomes(self) -> List[str]:
+        # Documentos vivos, na ordem dos DocIDs
+        nomes = []
+        for entrada in self.ler()['segmentos']:
+            segmento = IndiceInvertido(os.path.join(self.pasta, entrada['arquivo']))
+            try:
+                removidos = set(entrada['removidos'])
+                nomes.extend(segmento.nome(d) for d in range(segmento.num_docs) if d not in removidos)
+            finally:
+                segmento.fechar()
+        return nomes
+
+    #----------------------------------------------------------------------------------------#
+    def mesclar(self) -> bool:
+        # Executa um passo da política de mesclagem; False se não havia nada a mesclar.
+        # Os segmentos de entrada são lidos e o novo é escrito fora da trava da lista, de modo
+        # que lotes continuam sendo gravados durante a mesclagem; lápides marcadas nos
+        # segmentos de entrada nesse meio-tempo são transferidas para o segmento novo.
+        with self.trava_mesclagem:
+            with self.trava:
+                estado = self.ler()
+                self._limpar(estado)
+                escolha = escolher_mesclagem(estado['segmentos'])
+                if escolha is None:
+                    return False
+                inicio, fim = escolha
+                entradas = [dict(e, removidos=list(e['removidos'])) for e in estado['segmentos'][inicio:fim]]
+                reserva = {'proximo': estado['proximo'], 'analisador': estado.get('analisador')}
+                estado['proximo'] += 1
+                self._salvar(estado)
+
+            # O segmento novo é escrito termo a termo a partir dos segmentos de entrada, copiando
+            # postings e posições sem as lápides
+            origem: Dict[Tuple[str, int], int] = {}  # (segmento, DocID local) -> DocID no segmento novo
+            fontes: List[Tuple[IndiceInvertido, Set[int]]] = []
+            try:
+                for entrada in entradas:
+                    segmento = IndiceInvertido(os.path.join(self.pasta, entrada['arquivo']))
+                    removidos = set(entrada['removidos'])
+                    fontes.append((segmento, removidos))
+                    for doc in range(segmento.num_docs):
+                        if doc not in removidos:
+                            origem[(entrada['arquivo'], doc)] = len(origem)
+                novo, _ = self._novo_segmento(reserva, fontes=fontes)
+            finally:
+                for segmento, _ in fontes:
+                    segmento.fechar()
+
+            arquivos = [e['arquivo'] for e in entradas]
+            with self.trava:
+                estado = self.ler()
+                atuais = [e['arquivo'] for e in estado['segmentos']]
+                if arquivos[0] not in atuais:
+                    # o conjunto foi recriado enquanto a mesclagem rodava
+                    if novo is not None:
+                        self._apagar_arquivos([novo['arquivo']])
+                    return False
+                pos = atuais.index(arquivos[0])
+                for antiga, atual in zip(entradas, estado['segmentos'][pos:pos + len(entradas)]):
+                    for doc in set(atual['removidos']) - set(antiga['removidos']):
+                        novo['removidos'].append(origem[(antiga['arquivo'], doc)])
+                if novo is not None:
+                    novo['removidos'].sort()
+                estado['segmentos'][pos:pos + len(entradas)] = [novo] if novo is not None else []
+                self._salvar(estado)
+            self._apagar_arquivos(arquivos)
+            return True
+
+    #----------------------------------------------------------------------------------------#
+    def _limpar(self, estado: Dict):
+        # Apaga segmentos que não estão mais na lista (sobras de mesclagens anteriores)
+        if not os.path.isdir(self.pasta):
+            return
+        em_uso = {e['arquivo'] for e in estado['segmentos']}
+        sobras = [f for f in os.listdir(self.pasta)
+                  if f.startswith('segmento_') and f.endswith('.bin') and f not in em_uso]
+        self._apagar_arquivos(sobras)
+
+#----------------------------------------------------------------------------------------#
+class Mesclagem(threading.Thread):
+    # Mescla segmentos numa thread até a política não ter mais o que fazer. Nada é chamado
+    # ao fim: quem lê o índice consulta is_alive() e `mesclou` na sua própria thread (a
+    # interface, com root.after) e só então chama recarregar().
+    def __init__(self, pasta: str):
+        super().__init__(name='mesclagem-segmentos', daemon=True)
+        self.pasta = pasta
+        self.mesclou = False
+
+    #----------------------------------------------------------------------------------------#
+    def run(self):
+        conjunto = ConjuntoSegmentos(self.pasta)
+        try:
+            while conjunto.mesclar():
+                self.mesclou = True
+        except Exception as e:
+            print(f"Erro ao mesclar segmentos: {e}")
+
+#----------------------------------------------------------------------------------------#
+def mesclar_em_segundo_plano(pasta: str) -> Mesclagem:
+    mesclagem = Mesclagem(pasta)
+    mesclagem.start()
+    return mesclagem
+
+
+class IndiceSegmentado:
+    # Leitor do conjunto de segmentos com a mesma interface de IndiceInvertido. Os DocIDs
+    # globais seguem a ordem dos segmentos (DocID = base do segmento + DocID local).
+    # df, IDF, normas e limites superiores são globais: com um único segmento sem lápides vêm
+    # prontos do arquivo. Caso contrário, df e IDF são somados sob demanda e as normas saem
+    # das somas dos pesos de cada segmento (IndiceInvertido.somas_pesos), corrigidas na carga
+    # só nas postings dos termos cujo df global mudou; os limites superiores são recalculados
+    # sob demanda. Tudo vale até a próxima recarga.
+    def __init__(self, pasta: str, max_postings_em_cache: int = 1024):
+        self.pasta = pasta
+        self.conjunto = ConjuntoSegmentos(pasta)
+        self.abertos: Dict[str, IndiceInvertido] = {}
+        self.segmentos: List[IndiceInvertido] = []
+        self.bases: List[int] = []
+        # arquivo -> (DocIDs locais, df e soma dos comprimentos das lápides)
+        self.lapides: Dict[str, Tuple[Set[int], Counter, int]] = {}
+        # arquivo -> (somas dos pesos corrigidas para o df global, frequências máximas,
+        # termo -> df global usado nas somas, quando difere do df do segmento)
+        self.pesos: Dict[str, Tuple[Tuple[array, array, array], array, Dict[str, int]]] = {}
+        self.pesos_segmentos: List[Tuple[Tuple[array, array, array], array, Dict[str, int]]] = []
+        self.log_num_docs = 0.0
+        self.df_lapides: Counter = Counter()
+        self.removidos: Set[int] = set()
+        self.unico: Optional[IndiceInvertido] = None
+        self.analisador: Optional[Dict] = None
+        self.num_docs = 0
+        self.comprimento_total = 0
+        self.versao = 0
+        self.cache_postings: 'OrderedDict[str, Tuple[array, array]]' = OrderedDict()
+        self.max_postings_em_cache = max_postings_em_cache
+        self.cache_df: Dict[str, int] = {}
+        self.cache_idf: Dict[str, float] = {}
+        self.cache_limites: Dict[str, float] = {}
+        self.nomes_documentos = NomesDocumentos(self)
+        self.ids_documentos = IdsDocumentos(self)
+        self.tabela_documentos = TabelaDocumentos(self)
+        self.recarregar()
+
+    #----------------------------------------------------------------------------------------#
+    def recarregar(self):
+        # Relê a lista de segmentos: segmentos que continuam na lista seguem abertos, os
+        # novos são abertos e os que saíram (mesclados) são fechados. Uma mesclagem pode
+        # apagar um segmento entre a leitura da lista e sua abertura: nesse caso, relê.
+        for tentativa in range(3):
+            try:
+                self._carregar(self.conjunto.ler())
+                return
+            except FileNotFoundError:
+                if tentativa == 2:
+                    raise
+
+    #----------------------------------------------------------------------------------------#
+    # Atualização de um documento por vez: cada chamada grava um lote (um segmento novo ou só
+    # lápides) e recarrega. Um documento atualizado vai para o segmento novo e ganha outro
+    # DocID. Para muitos documentos, prefira conjunto.adicionar_lote.
+    def adicionar_documento(self, nome: str, termos: List):
+        if self.id_documento(nome) is not None:
+            raise ValueError(f"Documento já indexado: {nome}")
+        self.conjunto.adicionar_lote({nome: termos})
+        self.recarregar()
+
+    def remover_documento(self, nome: str):
+        if self.id_documento(nome) is None:
+            raise KeyError(nome)
+        self.conjunto.adicionar_lote({}, removidos=[nome])
+        self.recarregar()
+
+    def atualizar_documento(self, nome: str, termos: List):
+        if self.id_documento(nome) is None:
+            raise KeyError(nome)
+        self.conjunto.adicionar_lote({nome: termos})
+        self.recarregar()
+
+    #----------------------------------------------------------------------------------------#
+    def _carregar(self, estado: Dict):
+        abertos: Dict[str, IndiceInvertido] = {}
+        segmentos, bases = [], []
+        lapides: Dict[str, Tuple[Set[int], Counter, int]] = {}
+        df_lapides: Counter = Counter()
+        removidos: Set[int] = set()
+        alterados: Set[str] = set()  # termos das lápides novas: o df global deles mudou
+        base = 0
+        comprimento_total = 0
+        try:
+            for entrada in estado['segmentos']:
+                arquivo = entrada['arquivo']
+                segmento = self.abertos.get(arquivo) or abertos.get(arquivo)
+                if segmento is None:
+                    segmento = IndiceInvertido(os.path.join(self.pasta, arquivo))
+                abertos[arquivo] = segmento
+
+                # df e comprimentos das lápides: só as lápides novas do segmento precisam ser lidas.
+                # O estado anterior é copiado antes de receber as novas, para continuar válido se
+                # a carga falhar no meio
+                docs, df, comprimento = self.lapides.get(arquivo) or (set(), Counter(), 0)
+                novas = [doc for doc in entrada['removidos'] if doc not in docs]
+                if novas:
+                    docs, df = set(docs), Counter(df)
+                for doc in novas:
+                    docs.add(doc)
+                    termos = [termo for termo, _ in segmento.vetor_documento(doc)]
+                    df.update(termos)
+                    alterados.update(termos)
+                    comprimento += segmento.comprimento(doc)
+                lapides[arquivo] = (docs, df, comprimento)
+                df_lapides.update(df)
+                removidos.update(base + doc for doc in docs)
+                comprimento_total += segmento.comprimento_total - comprimento
+
+                segmentos.append(segmento)
+                bases.append(base)
+                base += segmento.num_docs
+
+            arquivos = [entrada['arquivo'] for entrada in estado['segmentos']]
+            pesos = self._corrigir_pesos(segmentos, arquivos, df_lapides, alterados)
+        except BaseException:
+            for arquivo, segmento in abertos.items():
+                if arquivo not in self.abertos:
+                    segmento.fechar()
+            raise
+
+        for arquivo, segmento in self.abertos.items():
+            if arquivo not in abertos:
+                segmento.fechar()
+        self.abertos = abertos
+        self.segmentos = segmentos
+        self.bases = bases
+        self.lapides = lapides
+        self.df_lapides = df_lapides
+        self.removidos = removidos
+        self.pesos = pesos
+        self.pesos_segmentos = [pesos[arquivo] for arquivo in arquivos]
+        self.num_docs = base
+        self.log_num_docs = math.log10(self.num_docs_ativos) if self.num_docs_ativos else 0.0
+        self.comprimento_total = comprimento_total
+        self.unico = segmentos[0] if len(segmentos) == 1 and not removidos else None
+        self.analisador = estado.get('analisador')
+        self.versao += 1
+        self.cache_postings.clear()
+        self.cache_df.clear()
+        self.cache_idf.clear()
+        self.cache_limites.clear()
+
+    #----------------------------------------------------------------------------------------#
+    def _corrigir_pesos(self, segmentos: List[IndiceInvertido], arquivos: List[str], df_lapides: Counter,
+                        alterados: Set[str]) -> Dict[str, Tuple[Tuple[array, array, array], array, Dict[str, int]]]:
+        # Somas dos pesos de cada segmento com o df global do novo estado. Um segmento que
+        # acaba de ser aberto parte das somas gravadas nele (df do próprio segmento) e só os
+        # termos que também aparecem em outro segmento ou nas lápides podem ter outro df
+        # global. Um segmento já carregado parte das somas da carga anterior e só os termos
+        # dos segmentos novos, dos que saíram da lista (uma mesclagem descarta as lápides sem
+        # que elas tenham sido vistas) e das lápides novas podem ter mudado. Em cada termo cujo df
+        # mudou, B e C são corrigidos nas postings do termo; as somas anteriores são copiadas
+        # antes da correção, para continuarem válidas se a carga falhar.
+        df_global: Dict[str, int] = {}
+        def df(termo: str) -> int:
+            valor = df_global.get(termo)
+            if valor is None:
+                valor = df_global[termo] = sum(s.df(termo) for s in segmentos) - df_lapides.get(termo, 0)
+            return valor
+
+        novos = [s for s, arquivo in zip(segmentos, arquivos) if arquivo not in self.pesos]
+        if len(novos) < len(segmentos):
+            # termos cujo df global pode ter mudado desde a carga anterior
+            antigos = [self.abertos[arquivo] for arquivo in self.pesos if arquivo not in arquivos]
+            for segmento in novos + antigos:
+                alterados = alterados | set(segmento.termos())
+
+        pesos = {}
+        for segmento, arquivo in zip(segmentos, arquivos):
+            anterior = self.pesos.get(arquivo)
+            if anterior is not None:
+                somas, max_freqs, ajustes = anterior
+                candidatos = _termos_em_comum(segmento, alterados, len(alterados))
+            else:
+                somas, max_freqs, ajustes = segmento.somas_pesos(), segmento.max_freqs(), {}
+                outros = sum(s.num_termos for s in segmentos if s is not segmento) + len(df_lapides)
+                if segmento.num_termos <= outros:
+                    candidatos = segmento.termos()
+                else:
+                    termos_outros = set(df_lapides)
+                    for s in segmentos:
+                        if s is not segmento:
+                            termos_outros.update(s.termos())
+                    candidatos = _termos_em_comum(segmento, termos_outros, len(termos_outros))
+
+            copiado = anterior is None
+            for termo in candidatos:
+                alvo = df(termo)
+                usado = ajustes.get(termo) or segmento.df(termo)
+                if alvo == usado or alvo == 0:
+                    continue
+                if not copiado:
+                    somas = (somas[0], array('d', somas[1]), array('d', somas[2]))
+                    ajustes = dict(ajustes)
+                    copiado = True
+                log_alvo, log_usado = math.log10(alvo), math.log10(usado)
+                delta, delta_quadrado = log_alvo - log_usado, log_alvo * log_alvo - log_usado * log_usado
+                _, somas_log, somas_log2 = somas
+                docs, freqs = segmento.postings(termo)
+                for doc, freq in zip(docs, freqs):
+                    tf = calcular_tf(freq, max_freqs[doc])
+                    quadrado = tf * tf
+                    somas_log[doc] += quadrado * delta
+                    somas_log2[doc] += quadrado * delta_quadrado
+                ajustes[termo] = alvo
+            pesos[arquivo] = (somas, max_freqs, ajustes)
+        return pesos
+
+    #----------------------------------------------------------------------------------------#
+    def fechar(self):
+        for segmento in self.abertos.values():
+            segmento.fechar()
+        self.abertos = {}
+        self.segmentos = []
+        self.unico = None
+        self.cache_postings.clear()
+
+    #----------------------------------------------------------------------------------------#
+    @property
+    def metadados(self) -> Dict:
+        return {'segmentos': list(self.abertos), 'analisador': self.analisador}
+
+    #----------------------------------------------------------------------------------------#
+    def _localizar(self, doc: int) -> Tuple[IndiceInvertido, int]:
+        i = bisect_right(self.bases, doc) - 1
+        return self.segmentos[i], doc - self.bases[i]
+
+    #----------------------------------------------------------------------------------------#
+    def __contains__(self, termo: str) -> bool:
+        if self.unico is not None:
+            return termo in self.unico
+        return self.df(termo) > 0
+
+    def df(self, termo: str) -> int:
+        if self.unico is not None:
+            return self.unico.df(termo)
+        df = self.cache_df.get(termo)
+        if df is None:
+            df = sum(s.df(termo) for s in self.segmentos) - self.df_lapides.get(termo, 0)
+            self.cache_df[termo] = df
+        return df
+
+    def idf(self, termo: str) -> float:
+        if self.unico is not None:
+            return self.unico.idf(termo)
+        idf = self.cache_idf.get(termo)
+        if idf is None:
+            idf = self.cache_idf[termo] = calcular_idf(self.num_docs_ativos, self.df(termo))
+        return idf
+
+    def limite_superior(self, termo: str) -> float:
+        if self.unico is not None:
+            return self.unico.limite_superior(termo)
+        limite = self.cache_limites.get(termo)
+        if limite is None:
+            # Maior peso/norma entre os documentos do termo, como na escrita do índice, segmento
+            # a segmento com as somas dos pesos já corrigidas
+            idf = self.idf(termo)
+            log_n = self.log_num_docs
+            limite = 0.0
+            for segmento, base, pesos in zip(self.segmentos, self.bases, self.pesos_segmentos):
+                (somas_tf, somas_log, somas_log2), max_freqs, _ = pesos
+                docs, freqs = segmento.postings(termo)
+                for doc, freq in zip(docs, freqs):
+                    if base + doc in self.removidos:
+                        continue
+                    quadrado = somas_tf[doc] * log_n * log_n - 2 * log_n * somas_log[doc] + somas_log2[doc]
+                    if quadrado > 0:
+                        limite = max(limite, calcular_tf(freq, max_freqs[doc]) * idf / math.sqrt(quadrado))
+            self.cache_limites[termo] = limite
+        return limite
+
+    #----------------------------------------------------------------------------------------#
+    def postings(self, termo: str) -> Tuple[array, array]:
+        # Concatena as postings dos segmentos (já em ordem de DocID global), sem as lápides.
+        # Os arrays são compartilhados via cache e não devem ser alterados pelo chamador.
+        if self.unico is not None:
+            return self.unico.postings(termo)
+        par = self.cache_postings.get(termo)
+        if par is not None:
+            self.cache_postings.move_to_end(termo)
+            return par
+        docs, freqs = array('I'), array('I')
+        for segmento, base in zip(self.segmentos, self.bases):
+            docs_seg, freqs_seg = segmento.postings(termo)
+            if not docs_seg:
+                continue
+            if self.removidos:
+                for doc, freq in zip(docs_seg, freqs_seg):
+                    if base + doc not in self.removidos:
+                        docs.append(base + doc)
+                        freqs.append(freq)
+            else:
+                docs.extend(base + doc for doc in docs_seg)
+                freqs.extend(freqs_seg)
+        par = docs, freqs
+        self.cache_postings[termo] = par
+        if len(self.cache_postings) > self.max_postings_em_cache:
+            self.cache_postings.popitem(last=False)
+        return par
+
+    #----------------------------------------------------------------------------------------#
+    def posicoes_termo(self, termo: str, docs: Iterable[int] = None) -> Dict[int, array]:
+        # DocID global -> posições do termo, segmento a segmento, sem as lápides
+        if self.unico is not None:
+            return self.unico.posicoes_termo(termo, docs)
+        docs = None if docs is None else sorted(docs)
+        resultado: Dict[int, array] = {}
+        for segmento, base in zip(self.segmentos, self.bases):
+            locais = None
+            if docs is not None:
+                locais = docs[bisect_left(docs, base):bisect_left(docs, base + segmento.num_docs)]
+                if not locais:
+                    continue
+                locais = [doc - base for doc in locais]
+            for doc, posicoes in segmento.posicoes_termo(termo, locais).items():
+                if base + doc not in self.removidos:
+                    resultado[base + doc] = posicoes
+        return resultado
+
+    #----------------------------------------------------------------------------------------#
+    def termos(self) -> Iterator[str]:
+        if self.unico is not None:
+            yield from self.unico.termos()
+            return
+        anterior = None
+        for termo in heapq.merge(*(s.termos() for s in self.segmentos)):
+            if termo != anterior and self.df(termo) > 0:
+                yield termo
+            anterior = termo
+
+    #----------------------------------------------------------------------------------------#
+    @property
+    def num_docs_ativos(self) -> int:
+        return self.num_docs - len(self.removidos)
+
+    def documentos(self) -> Iterator[int]:
+        # DocIDs em uso, em ordem crescente
+        return (d for d in range(self.num_docs) if d not in self.removidos)
+
+    def docs_removidos(self) -> array:
+        return array('I', sorted(self.removidos))
+
+    @property
+    def comprimento_medio(self) -> float:
+        num_docs = self.num_docs_ativos
+        return self.comprimento_total / num_docs if num_docs else 0.0
+
+    #----------------------------------------------------------------------------------------#
+    def nome(self, doc: int) -> str:
+        segmento, local = self._localizar(doc)
+        return segmento.nome(local)
+
+    #----------------------------------------------------------------------------------------#
+    def id_documento(self, nome: str) -> Optional[int]:
+        # Do segmento mais novo para o mais antigo: versões antigas são lápides
+        for segmento, base in zip(reversed(self.segmentos), reversed(self.bases)):
+            local = segmento.id_documento(nome)
+            if local is not None and base + local not in self.removidos:
+                return base + local
+        return None
+
+    #----------------------------------------------------------------------------------------#
+    def estatisticas(self, doc: int) -> Tuple[int, int, float]:
+        # (frequência máxima, comprimento, norma) do documento
+        if self.unico is not None:
+            return self.unico.estatisticas(doc)
+        return self.max_freq(doc), self.comprimento(doc), self.norma(doc)
+
+    def max_freq(self, doc: int) -> int:
+        if self.unico is not None:
+            return self.unico.max_freq(doc)
+        i = bisect_right(self.bases, doc) - 1
+        return self.pesos_segmentos[i][1][doc - self.bases[i]]
+
+    def comprimento(self, doc: int) -> int:
+        if self.unico is not None:
+            return self.unico.comprimento(doc)
+        segmento, local = self._localizar(doc)
+        return segmento.comprimento(local)
+
+    def norma(self, doc: int) -> float:
+        if self.unico is not None:
+            return self.unico.norma(doc)
+        # Norma com os IDFs globais a partir das somas dos pesos já corrigidas na carga
+        i = bisect_right(self.bases, doc) - 1
+        local = doc - self.bases[i]
+        (somas_tf, somas_log, somas_log2), _, _ = self.pesos_segmentos[i]
+        log_n = self.log_num_docs
+        quadrado = somas_tf[local] * log_n * log_n - 2 * log_n * somas_log[local] + somas_log2[local]
+        return math.sqrt(quadrado) if quadrado > 0 else 0.0
+
+    #----------------------------------------------------------------------------------------#
+    def vetor_documento(self, doc: int) -> List[Tuple[str, int]]:
+        segmento, local = self._localizar(doc)
+        return segmento.vetor_documento(local)
+
+
+#----------------------------------------------------------------------------------------#
+def _termos_em_comum(segmento: IndiceInvertido, termos: Iterable[str], quantidade: int) -> Iterator[str]:
+    # Termos de `termos` (`quantidade` deles) que existem no segmento, percorrendo o menor dos
+    # dois vocabulários
+    if segmento.num_termos < quantidade:
+        termos = set(termos)
+        return (termo for termo in segmento.termos() if termo in termos)
+    return (termo for termo in termos if termo in segmento)
+
+
+#----------------------------------------------------------------------------------------#
+def pasta_segmentos(freq_json_path: str = None) -> str:
+    freq_json_path = freq_json_path or caminho_json_padrao()
+    return os.path.join(os.path.dirname(freq_json_path), PASTA_SEGMENTOS)
+
+#----------------------------------------------------------------------------------------#
+def dados_de_normalizados(pasta_normalizado: str, ordem: List[str] = ()) -> Dict[str, List[Tuple]]:
+    # Frequências e posições dos termos de cada documento a partir dos arquivos _termos.txt,
+    # que sempre refletem o último processamento de cada PDF (inclusive os lotes que não
+    # regravam o JSON)
+    dados = {}
+    arquivos = {f[:-len('_termos.txt')] + '.pdf': f for f in os.listdir(pasta_normalizado) if f.endswith('_termos.txt')}
+    for pdf_nome in [n for n in ordem if n in arquivos] + sorted(set(arquivos) - set(ordem)):
+        with open(os.path.join(pasta_normalizado, arquivos[pdf_nome]), 'r', encoding='utf-8') as f:
+            dados[pdf_nome] = termos_posicionais(f.read().split())
+    return dados
+
+#----------------------------------------------------------------------------------------#
+def _com_posicoes(dados: Dict[str, List], pasta_normalizado: str) -> Iterator[Tuple[str, List]]:
+    # Documentos do JSON com as posições dos termos tiradas dos _termos.txt; um documento
+    # sem arquivo, ou cujo arquivo não corresponde mais às frequências do JSON, fica sem
+    # posições (frases e NEAR/k valem nele como conjunção, ver BuscaPosicional) e é avisado
+    sem_posicoes = []
+    for pdf_nome, pares in dados.items():
+        caminho = os.path.join(pasta_normalizado, os.path.splitext(pdf_nome)[0] + '_termos.txt')
+        termos = None
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                termos = termos_posicionais(f.read().split())
+        if termos is not None and {t: c for t, c, _ in termos} == {t: int(c) for t, c in pares}:
+            pares = termos
+        else:
+            sem_posicoes.append(pdf_nome)
+        yield pdf_nome, pares
+    if sem_posicoes:
+        logging.warning("%d documento(s) indexado(s) sem posições (_termos.txt ausente ou diferente do "
+                        "JSON; reprocesse-os para frases e NEAR/k exatos): %s",
+                        len(sem_posicoes), ', '.join(sem_posicoes[:5]) + (' ...' if len(sem_posicoes) > 5 else ''))
+
+#----------------------------------------------------------------------------------------#
+def preparar_segmentos(freq_json_path: str = None) -> str:
+    # Garante o conjunto de segmentos ao lado do JSON e retorna sua pasta. Sem conjunto, ou
+    # com o JSON mais novo que ele (processamento completo feito por fora), recria um
+    # segmento único a partir do JSON.
+    freq_json_path = freq_json_path or caminho_json_padrao()
+    pasta = pasta_segmentos(freq_json_path)
+    conjunto = ConjuntoSegmentos(pasta)
+    if not conjunto.existe() or (
+            os.path.exists(freq_json_path) and os.path.getmtime(conjunto.caminho) < os.path.getmtime(freq_json_path)):
+        if not os.path.exists(freq_json_path):
+            raise FileNotFoundError(f"Arquivo de índice não encontrado: {freq_json_path}")
+        with open(freq_json_path, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        conjunto.recriar(_com_posicoes(dados, os.path.join(os.path.dirname(freq_json_path), 'normalizado')))
+    return pasta
+
+#----------------------------------------------------------------------------------------#
+def abrir_indice(freq_json_path: str = None) -> IndiceSegmentado:
+    freq_json_path = freq_json_path or caminho_json_padrao()
+    pasta = preparar_segmentos(freq_json_path)
+    try:
+        return IndiceSegmentado(pasta)
+    except ValueError:
+        # Segmentos de uma versão anterior do formato (ex.: sem posições). O JSON não tem os
+        # lotes incrementais, então o conjunto é refeito a partir dos arquivos normalizados,
+        # que também dão as posições dos termos; sem eles, a partir do JSON.
+        pasta_normalizado = os.path.join(os.path.dirname(freq_json_path), 'normalizado')
+        if not os.path.exists(freq_json_path) and not os.path.isdir(pasta_normalizado):
+            raise FileNotFoundError(f"Índice em formato antigo e sem JSON nem arquivos normalizados "
+                                    f"para refazê-lo: {pasta}")
+        dados = {}
+        if os.path.exists(freq_json_path):
+            with open(freq_json_path, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        if os.path.isdir(pasta_normalizado):
+            dados = dados_de_normalizados(pasta_normalizado, list(dados)) or dados
+        ConjuntoSegmentos(pasta).recriar(dados)
+        return IndiceSegmentado(pasta)
+
+#----------------------------------------------------------------------------------------#
+def nomes_indexados(freq_json_path: str = None) -> List[str]:
+    try:
+        return ConjuntoSegmentos(preparar_segmentos(freq_json_path)).nomes()
+    except FileNotFoundError:
+        return []
@@ -8,9 +8,17 @@ from ModeloBooleano import ModeloBooleano
 from ModeloEspacoVetorial import ModeloEspacoVetorial
 from ExtratorDeResumos import ExtratorDeResumos
 from Normalizador import processar_pasta_results
+from Indexador import detectar_alteracoes, aplicar_alteracoes, registrar_manifesto_completo
+from FluxoIndexacao import indexar_em_fluxo
+from IndiceSegmentado import abrir_indice, mesclar_em_segundo_plano
+from CacheConsultas import CacheResultados
+from TarefaIndexacao import TarefaIndexacao, Cancelado, formatar_situacao
 from pathlib import Path
 from Reiniciar import apagar_conteudo
 
+# Intervalo entre as atualizações da barra de progresso da indexação em segundo plano
+INTERVALO_PROGRESSO_MS = 200
+
 
 class SistemaBuscaGUI:
     def __init__(self, root):
@@ -29,6 +37,10 @@ class SistemaBuscaGUI:
         )
         os.makedirs(self.pasta_data, exist_ok=True)
 
+        # Indexação em andamento (TarefaIndexacao) ou None
+        self.tarefa = None
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
+
         # Inicializa os modelos
         self.recarregar_modelos()
 
@@ -71,7 +83,7 @@ class SistemaBuscaGUI:
         # Área de instruções
         frame_instrucoes = ttk.Frame(self.tab_booleana)
         frame_instrucoes.pack(fill='x', padx=10, pady=5)
-        ttk.Label(frame_instrucoes, text="Operadores: AND, OR, NOT\nExemplos: termo1 AND termo2, termo1 OR NOT termo2",justify='left').pack(anchor='w')
+        ttk.Label(frame_instrucoes, text="Operadores: AND, OR, NOT e parênteses (precedência: NOT > AND > OR), \"frase exata\" e NEAR/k\nExemplos: termo1 AND termo2, termo1 OR NOT termo2, (termo1 OR termo2) AND NOT termo3, \"termo1 termo2\", termo1 NEAR/3 termo2",justify='left').pack(anchor='w')
 
         # Área de resultados
         frame_resultados = ttk.Frame(self.tab_booleana)
@@ -111,7 +123,7 @@ class SistemaBuscaGUI:
         # Área de instruções
         frame_instrucoes = ttk.Frame(self.tab_vetorial)
         frame_instrucoes.pack(fill='x', padx=10, pady=5)
-        ttk.Label(frame_instrucoes, text="Digite os termos da consulta separados por espaço.\nOs resultados serão ordenados por relevância.", justify='left').pack(anchor='w')
+        ttk.Label(frame_instrucoes, text="Digite os termos da consulta separados por espaço.\nOs resultados serão ordenados por relevância; \"frases\" e termo1 NEAR/k termo2 restringem os documentos.", justify='left').pack(anchor='w')
 
         # Área de resultados
         frame_resultados = ttk.Frame(self.tab_vetorial)
@@ -163,8 +175,20 @@ class SistemaBuscaGUI:
 
         # Botões para gerenciar documentos
         ttk.Button(frame_botoes, text="Abrir Pasta", command=self.abrir_pasta_docs).pack(side='left', padx=5)
-        ttk.Button(frame_botoes, text="Atualizar Documentos", command=self.atualizar_documentos_novos).pack(side='left', padx=5)
-        ttk.Button(frame_botoes, text="Reiniciar e Extrair", command=self.reiniciar_e_extrair).pack(side='left', padx=5)
+        self.botao_atualizar = ttk.Button(frame_botoes, text="Atualizar Documentos", command=self.atualizar_documentos_novos)
+        self.botao_atualizar.pack(side='left', padx=5)
+        self.botao_reiniciar = ttk.Button(frame_botoes, text="Reiniciar e Extrair", command=self.reiniciar_e_extrair)
+        self.botao_reiniciar.pack(side='left', padx=5)
+        self.botao_cancelar = ttk.Button(frame_botoes, text="Cancelar", command=self.cancelar_indexacao, state='disabled')
+        self.botao_cancelar.pack(side='right', padx=5)
+
+        # Andamento da indexação em segundo plano (as buscas continuam disponíveis)
+        frame_progresso = ttk.Frame(self.tab_arquivos)
+        frame_progresso.pack(fill='x', padx=10, pady=(0, 5))
+        self.barra_progresso = ttk.Progressbar(frame_progresso, mode='determinate')
+        self.barra_progresso.pack(fill='x')
+        self.texto_progresso = tk.StringVar()
+        ttk.Label(frame_progresso, textvariable=self.texto_progresso).pack(anchor='w')
 
         # Carrega lista inicial
         self.atualizar_lista_arquivos()
@@ -237,21 +261,55 @@ class SistemaBuscaGUI:
 
     #----------------------------------------------------------------------------------------#
     def recarregar_modelos(self):
-        """Libera os modelos existentes e carrega os novos a partir dos arquivos de índice."""
-        self.modelo_booleano = None
-        self.modelo_vetorial = None
-        self.modelos_carregados = False
+        """Carrega os modelos a partir dos arquivos de índice e só então libera os anteriores."""
         try:
-            self.modelo_booleano = ModeloBooleano()
-            self.modelo_vetorial = ModeloEspacoVetorial()
-            self.modelos_carregados = True
-            print("Modelos recarregados com sucesso.")
+            # Um único índice é aberto e compartilhado pelos dois modelos, assim como o cache
+            # de resultados das consultas
+            indice = abrir_indice()
         except FileNotFoundError:
-            self.modelos_carregados = False
+            self.liberar_modelos()
             print("Arquivos de índice não encontrados. Modelos não foram carregados.")
+            return
         except Exception as e:
-            self.modelos_carregados = False
+            self.liberar_modelos()
             messagebox.showerror("Erro ao Recarregar Modelos", f"Ocorreu um erro: {str(e)}")
+            return
+
+        # As buscas rodam nesta mesma thread: nenhuma vê a troca pela metade
+        antigo = getattr(self, 'indice', None)
+        cache_resultados = CacheResultados()
+        self.indice = indice
+        self.modelo_booleano = ModeloBooleano(indice, cache_resultados=cache_resultados)
+        self.modelo_vetorial = ModeloEspacoVetorial(indice, cache_resultados=cache_resultados)
+        self.modelos_carregados = True
+        if antigo is not None:
+            antigo.fechar()
+        print("Modelos recarregados com sucesso.")
+    #----------------------------------------------------------------------------------------#
+    def recarregar_segmentos(self):
+        # Chamado na thread da interface quando um lote novo ou uma mesclagem termina
+        if getattr(self, 'indice', None) is not None:
+            self.indice.recarregar()
+
+    #----------------------------------------------------------------------------------------#
+    def acompanhar_mesclagem(self, mesclagem):
+        # A thread da mesclagem não pode tocar no Tk: a interface consulta se ela terminou
+        # e, se algum segmento foi mesclado, recarrega os segmentos na sua própria thread
+        if mesclagem.is_alive():
+            self.root.after(INTERVALO_PROGRESSO_MS, self.acompanhar_mesclagem, mesclagem)
+        elif mesclagem.mesclou:
+            self.recarregar_segmentos()
+
+    #----------------------------------------------------------------------------------------#
+    def liberar_modelos(self):
+        """Fecha o índice mapeado em memória para que o arquivo possa ser regravado (Windows)."""
+        if getattr(self, 'indice', None) is not None:
+            self.indice.fechar()
+        self.indice = None
+        self.modelo_booleano = None
+        self.modelo_vetorial = None
+        self.modelos_carregados = False
+
     #----------------------------------------------------------------------------------------#
     def exibir_metadados(self, event):
         # Pega o item selecionado da árvore que disparou o evento
@@ -401,65 +459,81 @@ class SistemaBuscaGUI:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao processar documentos: {str(e)}")
         """
-        try:
-            # Extrai resumos para os arquivos especificados (ou todos se None)
+        # A extração e a normalização rodam em segundo plano; enquanto isso as buscas usam o
+        # índice atual, que só é trocado pelo novo quando tudo termina
+        trabalhadores = os.cpu_count() or 1
+
+        def indexar(tarefa):
+            if not arquivos_para_processar:
+                # Processamento completo: extração, normalização e índice em fluxo
+                indexados = indexar_em_fluxo(trabalhadores=trabalhadores, progresso=tarefa.etapa('Indexação'))
+                # Registra o conteúdo indexado para as próximas atualizações incrementais
+                registrar_manifesto_completo()
+                return indexados
+
+            # Extrai resumos para os arquivos especificados
             extrator = ExtratorDeResumos()
-            resultado_extracao = extrator.processar_documentos(arquivos_para_processar)
+            resultado_extracao = extrator.processar_documentos(arquivos_para_processar, trabalhadores,
+                                                               tarefa.etapa('Extração'))
 
-            # Se estamos processando arquivos específicos, precisamos passar os nomes dos resumos para o normalizador
-            if arquivos_para_processar:
-                nomes_resumos = [os.path.splitext(f)[0] + '_resumo.txt' for f in arquivos_para_processar]
-                processar_pasta_results(apenas_novos=nomes_resumos)
-            else: # Processamento completo
-                processar_pasta_results()
+            # Precisamos passar os nomes dos resumos para o normalizador
+            nomes_resumos = [os.path.splitext(f)[0] + '_resumo.txt' for f in arquivos_para_processar]
+            processar_pasta_results(apenas_novos=nomes_resumos, trabalhadores=trabalhadores,
+                                    progresso=tarefa.etapa('Normalização'))
+            return resultado_extracao
 
+        def concluir(resultado_extracao):
             # Monta a mensagem de sucesso
             if arquivos_para_processar:
                 msg = f"Atualização concluída. {len(resultado_extracao)} novo(s) arquivo(s) processado(s) e adicionado(s) ao índice."
             else:
                 msg = f"Extração completa concluída ({len(resultado_extracao)} arquivos) e normalização finalizada."
 
-            messagebox.showinfo("Sucesso", msg)
-            
-            # Libera modelos antigos e recarrega com os novos dados
+            # Troca os modelos antigos pelos novos dados
             self.recarregar_modelos()
             self.atualizar_lista_arquivos()
+            messagebox.showinfo("Sucesso", msg)
 
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao processar documentos: {str(e)}")
+        self.iniciar_indexacao(indexar, concluir)
 
     #----------------------------------------------------------------------------------------#
-    def atualizar_documentos_novos(self):
-        # Esta função foi substituída pela lógica dentro de `reiniciar_e_extrair` e `atualizar_documentos_novos`
-        # A função `extrair_e_normalizar` agora lida com ambos os casos.
-        pass
-    #----------------------------------------------------------------------------------------#
     def reiniciar_e_extrair(self):
-        # Reinicia o sistema, limpa os arquivos e executa extração/normalização
-        try:
-            # Confirma com o usuário
-            if not messagebox.askyesno("Reiniciar Sistema", 
-                "Tem certeza que deseja reiniciar?\n\nEsta ação irá apagar todos os dados existentes (índices, resumos, metadados) e recriá-los a partir dos documentos na pasta 'docs'."):
-                return
+        # Reinicia o sistema: recria resumos e índice do zero a partir da pasta 'docs'. Tudo é
+        # gerado em segundo plano numa pasta separada; os dados atuais só são apagados (e as
+        # buscas passam ao índice novo) quando a reconstrução termina. Se ela for cancelada
+        # ou falhar, nada muda.
+        if not messagebox.askyesno("Reiniciar Sistema",
+            "Tem certeza que deseja reiniciar?\n\nEsta ação irá apagar todos os dados existentes (índices, resumos, metadados) e recriá-los a partir dos documentos na pasta 'docs'."):
+            return
+
+        trabalhadores = os.cpu_count() or 1
+        results_path = Path(os.path.dirname(self.pasta_docs)) / 'results'
+        data_path = Path(self.pasta_data)
+        pasta_nova = results_path.with_name('results_reconstrucao')
+
+        def indexar(tarefa):
+            if pasta_nova.exists():
+                shutil.rmtree(pasta_nova)
+            indexados = indexar_em_fluxo(pasta_results=str(pasta_nova), trabalhadores=trabalhadores,
+                                         progresso=tarefa.etapa('Indexação'))
+            registrar_manifesto_completo(str(pasta_nova))
+            return indexados
 
+        def concluir(indexados):
             # Libera os modelos para evitar erro de arquivo em uso no Windows
-            self.modelo_booleano = None
-            self.modelo_vetorial = None
-            self.modelos_carregados = False
+            self.liberar_modelos()
             for i in self.tree_booleana.get_children():
                 self.tree_booleana.delete(i)
             for i in self.tree_vetorial.get_children():
                 self.tree_vetorial.delete(i)
-            # Usa a função apagar_conteudo do Reiniciar.py para limpeza segura e recursiva
-            results_path = Path(os.path.dirname(self.pasta_docs)) / 'results'
-            data_path = Path(self.pasta_data)
 
+            # Usa a função apagar_conteudo do Reiniciar.py para limpeza segura e recursiva
             resumo_msgs = []
-
             if results_path.exists():
                 files, dirs = apagar_conteudo(results_path)
                 resumo_msgs.append(f"results: {files} arquivos, {dirs} pastas removidos")
             else:
+                results_path.mkdir()
                 resumo_msgs.append("results: pasta não encontrada")
 
             if data_path.exists():
@@ -468,63 +542,143 @@ class SistemaBuscaGUI:
             else:
                 resumo_msgs.append("data: pasta não encontrada")
 
-            # Executa extração e normalização após limpar
-            try:
-                extrator = ExtratorDeResumos()
-                self.extrair_e_normalizar() # Chama a função que agora faz tudo
-                
-                # Tenta recarregar os modelos
-                self.recarregar_modelos()
-                
-                msg_sucesso = "Sistema reiniciado e dados reprocessados!\n"
-                msg_sucesso += "\n".join(resumo_msgs)
-                # A mensagem de sucesso agora é mostrada dentro de extrair_e_normalizar
-                
-                messagebox.showinfo("Sucesso", msg_sucesso)
-                
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao processar documentos: {str(e)}")
-                self.modelos_carregados = False
-            
-            # Atualiza a lista de arquivos
+            # Move o resultado da reconstrução para results/
+            for item in pasta_nova.iterdir():
+                os.replace(item, results_path / item.name)
+            pasta_nova.rmdir()
+
+            self.recarregar_modelos()
             self.atualizar_lista_arquivos()
 
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao reiniciar sistema: {str(e)}")
+            msg_sucesso = f"Sistema reiniciado e dados reprocessados ({len(indexados)} arquivos)!\n"
+            msg_sucesso += "\n".join(resumo_msgs)
+            messagebox.showinfo("Sucesso", msg_sucesso)
+
+        def interromper():
+            shutil.rmtree(pasta_nova, ignore_errors=True)
+
+        self.iniciar_indexacao(indexar, concluir, interromper)
 
     #----------------------------------------------------------------------------------------#
     def atualizar_documentos_novos(self):
-        """Verifica se há novos arquivos na pasta 'docs' e os processa."""
+        """Verifica, pelo manifesto de hashes, PDFs novos, modificados e removidos e atualiza só eles."""
         try:
-            # 1. Obter lista de arquivos PDF na pasta 'docs'
-            pdfs_na_pasta = {f for f in os.listdir(self.pasta_docs) if f.lower().endswith('.pdf')}
-
-            # 2. Obter lista de arquivos já processados (chaves do modelo vetorial são os nomes dos PDFs)
+            # 1. Sem índice carregado, processa tudo
             if not self.modelos_carregados:
-                # Se os modelos não estiverem carregados, processa tudo
                 messagebox.showinfo("Informação", "Nenhum índice carregado. Processando todos os documentos.")
                 self.extrair_e_normalizar()
                 return
-            
-            pdfs_processados = set(self.modelo_vetorial.doc_names.values())
 
-            # 3. Encontrar a diferença
-            novos_arquivos = list(pdfs_na_pasta - pdfs_processados)
+            # 2. Compara a pasta 'docs' com o manifesto (tamanho/mtime e, se preciso, SHA-256)
+            alteracoes = detectar_alteracoes()
+            novos, modificados, removidos = alteracoes['novos'], alteracoes['modificados'], alteracoes['removidos']
 
-            if not novos_arquivos:
-                messagebox.showinfo("Atualizar Documentos", "Nenhum documento novo encontrado.")
+            if not (novos or modificados or removidos):
+                messagebox.showinfo("Atualizar Documentos", "Nenhum documento novo, modificado ou removido encontrado.")
                 return
 
-            # 4. Confirmar com o usuário e processar os novos arquivos
-            msg_confirmacao = "Os seguintes novos arquivos foram encontrados:\n\n" + "\n".join(novos_arquivos) + "\n\nDeseja processá-los e adicioná-los ao índice?"
-            if messagebox.askyesno("Novos Documentos Encontrados", msg_confirmacao):
-                self.extrair_e_normalizar(arquivos_para_processar=novos_arquivos)
+            # 3. Confirmar com o usuário
+            partes = []
+            if novos:
+                partes.append("Novos:\n" + "\n".join(novos))
+            if modificados:
+                partes.append("Modificados:\n" + "\n".join(modificados))
+            if removidos:
+                partes.append("Removidos:\n" + "\n".join(removidos))
+            msg_confirmacao = "\n\n".join(partes) + "\n\nDeseja atualizar o índice?"
+            if not messagebox.askyesno("Alterações Encontradas", msg_confirmacao):
+                return
+
+            # 4. O lote vira um segmento novo, gravado em segundo plano; o índice aberto passa a
+            #    vê-lo sem recarregar os modelos. Segmentos pequenos são mesclados depois
+            def indexar(tarefa):
+                return aplicar_alteracoes(alteracoes, trabalhadores=os.cpu_count() or 1, tarefa=tarefa)
+
+            def concluir(resultado):
+                self.recarregar_segmentos()
+                self.acompanhar_mesclagem(mesclar_em_segundo_plano(self.indice.pasta))
+
+                msg = (f"Atualização concluída.\n{len(novos)} novo(s), {len(modificados)} modificado(s), "
+                       f"{len(removidos)} removido(s).")
+                if resultado['falhas']:
+                    msg += "\n\nFalha na extração de:\n" + "\n".join(resultado['falhas'])
+                messagebox.showinfo("Sucesso", msg)
+
+                self.atualizar_lista_arquivos()
+
+            self.iniciar_indexacao(indexar, concluir)
 
         except Exception as e:
             messagebox.showerror("Erro ao Atualizar", f"Ocorreu um erro ao verificar novos documentos: {str(e)}")
+            # Volta a um estado consistente: segmentos desatualizados são refeitos a partir de
+            # results/normalizado
+            self.recarregar_modelos()
+
+    #----------------------------------------------------------------------------------------#
+    def iniciar_indexacao(self, indexar, ao_concluir, ao_interromper=None):
+        # Executa indexar(tarefa) numa thread separada e acompanha o progresso pela barra da aba
+        # de arquivos. Na thread da interface, ao_concluir(resultado) troca o índice pelo novo;
+        # após erro ou cancelamento, ao_interromper() descarta o que ficou pela metade.
+        if self.tarefa is not None:
+            messagebox.showinfo("Indexação em Andamento", "Aguarde o fim da indexação atual ou cancele-a.")
+            return
+        self.tarefa = TarefaIndexacao(indexar).iniciar()
+        self.botao_atualizar.state(['disabled'])
+        self.botao_reiniciar.state(['disabled'])
+        self.botao_cancelar.state(['!disabled'])
+        self.acompanhar_indexacao(ao_concluir, ao_interromper)
+
+    #----------------------------------------------------------------------------------------#
+    def acompanhar_indexacao(self, ao_concluir, ao_interromper):
+        tarefa = self.tarefa
+        situacao = tarefa.situacao()
+        self.barra_progresso.configure(maximum=max(situacao['total'], 1), value=situacao['feitos'])
+        if tarefa.cancelada:
+            self.texto_progresso.set("Cancelando...")
+        elif situacao['etapa']:
+            self.texto_progresso.set(formatar_situacao(situacao))
+        if not tarefa.concluida:
+            self.root.after(INTERVALO_PROGRESSO_MS, self.acompanhar_indexacao, ao_concluir, ao_interromper)
+            return
+
+        self.tarefa = None
+        self.botao_atualizar.state(['!disabled'])
+        self.botao_reiniciar.state(['!disabled'])
+        self.botao_cancelar.state(['disabled'])
+        self.barra_progresso.configure(value=0)
+        self.texto_progresso.set("")
 
+        if tarefa.erro is None:
+            try:
+                ao_concluir(tarefa.resultado)
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao processar documentos: {str(e)}")
+                # Volta a um estado consistente a partir dos arquivos em disco
+                self.recarregar_modelos()
+            return
 
+        if ao_interromper is not None:
+            ao_interromper()
+        if isinstance(tarefa.erro, Cancelado):
+            messagebox.showinfo("Indexação Cancelada", "A indexação foi cancelada. O índice anterior continua em uso.")
+        else:
+            messagebox.showerror("Erro", f"Erro ao processar documentos: {str(tarefa.erro)}")
+
+    #----------------------------------------------------------------------------------------#
+    def cancelar_indexacao(self):
+        if self.tarefa is not None:
+            self.tarefa.cancelar()
+            self.botao_cancelar.state(['disabled'])
+            self.texto_progresso.set("Cancelando...")
 
+    #----------------------------------------------------------------------------------------#
+    def fechar(self):
+        # Cancela a indexação em andamento e espera ela desfazer os arquivos temporários
+        if self.tarefa is not None:
+            self.tarefa.cancelar()
+            self.tarefa.aguardar()
+        self.liberar_modelos()
+        self.root.destroy()
 
     #----------------------------------------------------------------------------------------#
     def atualizar_lista_arquivos(self):
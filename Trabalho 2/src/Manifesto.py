@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+from typing import Dict, Iterable, List, Tuple
+
+NOME_MANIFESTO = 'manifesto.json'
+
+
+#----------------------------------------------------------------------------------------#
+def calcular_hash(caminho: str, tamanho_bloco: int = 1 << 20) -> str:
+    # SHA-256 do conteúdo do arquivo, lido em blocos
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        while True:
+            bloco = f.read(tamanho_bloco)
+            if not bloco:
+                break
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class Manifesto:
+    # Registra, para cada PDF indexado, tamanho, mtime e hash do conteúdo.
+    # Tamanho e mtime iguais dispensam o hash; se mudarem, o hash decide se o
+    # conteúdo realmente mudou (ex.: arquivo apenas copiado ou tocado).
+    def __init__(self, pasta_results: str):
+        self.caminho = os.path.join(pasta_results, NOME_MANIFESTO)
+        self.entradas: Dict[str, Dict] = {}
+        self.existia = os.path.exists(self.caminho)
+        if self.existia:
+            try:
+                with open(self.caminho, 'r', encoding='utf-8') as f:
+                    self.entradas = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                print("Arquivo manifesto.json corrompido. Criando um novo.")
+                self.entradas = {}
+                self.existia = False
+
+    #----------------------------------------------------------------------------------------#
+    def salvar(self):
+        tmp = self.caminho + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entradas, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.caminho)
+
+    #----------------------------------------------------------------------------------------#
+    def registrar(self, nome: str, caminho: str, sha256: str = None):
+        st = os.stat(caminho)
+        self.entradas[nome] = {
+            'tamanho': st.st_size,
+            'mtime': st.st_mtime,
+            'sha256': sha256 or calcular_hash(caminho),
+        }
+
+    #----------------------------------------------------------------------------------------#
+    def remover(self, nome: str):
+        self.entradas.pop(nome, None)
+
+    #----------------------------------------------------------------------------------------#
+    def detectar_alteracoes(self, pasta_docs: str, docs_indexados: Iterable[str] = ()) -> Tuple[List[str], List[str], List[str]]:
+        # Compara a pasta de PDFs com o manifesto e retorna (novos, modificados, removidos).
+        # Sem manifesto anterior, PDFs que já estão no índice são tomados como atualizados
+        # e só passam a ser registrados, evitando reprocessar o acervo inteiro.
+        # Documentos indexados que não estão mais na pasta também contam como removidos.
+        pdfs = sorted(f for f in os.listdir(pasta_docs) if f.lower().endswith('.pdf'))
+        indexados = set(docs_indexados)
+        if not self.existia:
+            for nome in pdfs:
+                if nome in indexados:
+                    self.registrar(nome, os.path.join(pasta_docs, nome))
+            self.existia = True
+
+        novos, modificados = [], []
+        for nome in pdfs:
+            caminho = os.path.join(pasta_docs, nome)
+            entrada = self.entradas.get(nome)
+            if entrada is None:
+                novos.append(nome)
+                continue
+            st = os.stat(caminho)
+            if st.st_size == entrada['tamanho'] and st.st_mtime == entrada['mtime']:
+                continue
+            sha256 = calcular_hash(caminho)
+            if sha256 != entrada['sha256']:
+                modificados.append(nome)
+            else:
+                # conteúdo igual: só atualiza os metadados para pular o hash da próxima vez
+                self.registrar(nome, caminho, sha256)
+
+        presentes = set(pdfs)
+        removidos = sorted((self.entradas.keys() | indexados) - presentes)
+        return novos, modificados, removidos
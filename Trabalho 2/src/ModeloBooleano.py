@@ -1,120 +1,185 @@
-import os
-import json
-from typing import Set, Dict, List
-from Normalizador import normalizar_token
+from collections import OrderedDict
+from typing import List, Optional
+from Normalizador import Analisador, analisador_do_indice
+from ConsultaBooleana import Termo, E, Ou, Nao, Frase, Proximidade, analisar_consulta, simplificar
+from BuscaPosicional import documentos_posicionais
+from IndiceInvertido import IndiceInvertido
+from IndiceSegmentado import abrir_indice
+from Postings import ListaOrdenada, MapaDeBits, criar_postings
+from CacheConsultas import CacheResultados
 
 class ModeloBooleano:
-    def __init__(self):
-        self.indice: Dict[str, Set[str]] = {}  # termo -> conjunto de DocIDs
-        self.doc_ids: Dict[str, str] = {}      # nome_arquivo -> DocID
-        self.doc_names: Dict[str, str] = {}    # DocID -> nome_arquivo
-        self.carregar_indice()
+    def __init__(self, indice: IndiceInvertido = None, freq_json_path: str = None, backend: str = 'auto',
+                 cache_resultados: CacheResultados = None):
+        # backend: 'lista' (arrays ordenados), 'bitmap' (mapas de bits) ou 'auto' (por densidade do termo)
+        # cache_resultados pode ser compartilhado com o modelo vetorial (as chaves incluem o modelo)
+        if backend not in ('auto', 'lista', 'bitmap'):
+            raise ValueError(f"Backend de postings desconhecido: {backend}")
+        self.backend = backend
+        self.indice: IndiceInvertido = None  # índice binário: termo -> DocIDs ordenados
+        self.doc_ids = {}                    # nome_arquivo -> DocID
+        self.doc_names = []                  # DocID -> nome_arquivo
+        self.cache_postings = OrderedDict()  # termo -> ListaOrdenada/MapaDeBits já montado
+        self.max_postings_em_cache = 256
+        self.versao_indice = 0                # versão do índice a que o cache corresponde
+        self.cache_resultados = cache_resultados if cache_resultados is not None else CacheResultados()
+        self.carregar_indice(indice, freq_json_path)
 
     #----------------------------------------------------------------------------------------#
-    def carregar_indice(self):
-        # Carrega o índice do arquivo frequencies_summary.json
-        src_dir = os.path.dirname(__file__)
-        raiz = os.path.abspath(os.path.join(src_dir, '..'))
-        freq_json_path = os.path.join(raiz, 'results', 'frequencies_summary.json')
-        
-        with open(freq_json_path, 'r', encoding='utf-8') as f:
-            dados = json.load(f)
-
-        # Constrói índice invertido: termo -> conjunto de document names (PDF)
-        for pdf_nome, freq_list in dados.items():
-            # Usamos o nome do PDF como o identificador do documento (doc_id)
-            doc_id = pdf_nome if pdf_nome.endswith('.pdf') else f"{pdf_nome}.pdf"
-            self.doc_ids[pdf_nome] = doc_id
-            self.doc_names[doc_id] = pdf_nome
-
-            for termo, freq in freq_list:
-                if termo not in self.indice:
-                    self.indice[termo] = set()
-                if freq > 0:
-                    self.indice[termo].add(doc_id)
+    @property
+    def analisador(self) -> Analisador:
+        # Mesmas etapas (e stopwords) da indexação, conforme registrado no índice
+        return analisador_do_indice(self.indice)
 
     #----------------------------------------------------------------------------------------#
-    def buscar_termo(self, termo: str) -> Set[str]:
+    def carregar_indice(self, indice: IndiceInvertido = None, freq_json_path: str = None):
+        # Usa o índice compartilhado recebido ou abre o índice binário via mmap.
+        # Os documentos têm DocIDs inteiros densos; os nomes dos PDFs só são
+        # resolvidos para o resultado final da consulta.
+        self.indice = indice if indice is not None else abrir_indice(freq_json_path)
+        self.doc_ids = self.indice.ids_documentos
+        self.doc_names = self.indice.tabela_documentos
+        self.cache_postings.clear()
+        self.versao_indice = self.indice.versao
+        self.cache_resultados.limpar()
+
+    #----------------------------------------------------------------------------------------#
+    def buscar_termo(self, termo: str):
         # Busca documentos que contêm um termo específico
         # Normaliza o termo da mesma forma que os documentos foram normalizados
-        termo_normalizado = normalizar_token(termo)
-        return self.indice.get(termo_normalizado, set())
+        return self.postings_termo(self.analisador.termo(termo))
+
+    #----------------------------------------------------------------------------------------#
+    def postings_termo(self, termo_normalizado: str):
+        # Postings de um termo já normalizado
+        if self.versao_indice != self.indice.versao:
+            # o índice recebeu lotes novos (segmentos ou lápides) desde que o cache foi montado
+            self.cache_postings.clear()
+            self.versao_indice = self.indice.versao
+        postings = self.cache_postings.get(termo_normalizado)
+        if postings is not None:
+            self.cache_postings.move_to_end(termo_normalizado)
+            return postings
+
+        # Termos densos viram mapas de bits e esparsos ficam como arrays ordenados
+        docs, _ = self.indice.postings(termo_normalizado)
+        postings = criar_postings(docs, self.indice.num_docs, self.backend)
+        self.cache_postings[termo_normalizado] = postings
+        if len(self.cache_postings) > self.max_postings_em_cache:
+            self.cache_postings.popitem(last=False)
+        return postings
+
+    #----------------------------------------------------------------------------------------#
+    def operador_and(self, conjunto1, conjunto2):
+        # Implementa o operador AND entre duas listas de postings
+        return conjunto1.e(conjunto2)
 
     #----------------------------------------------------------------------------------------#
-    def operador_and(self, conjunto1: Set[str], conjunto2: Set[str]) -> Set[str]:
-        # Implementa o operador AND entre dois conjuntos de documentos
-        return conjunto1 & conjunto2
+    def operador_or(self, conjunto1, conjunto2):
+        # Implementa o operador OR entre duas listas de postings
+        return conjunto1.ou(conjunto2)
 
     #----------------------------------------------------------------------------------------#
-    def operador_or(self, conjunto1: Set[str], conjunto2: Set[str]) -> Set[str]:
-        # Implementa o operador OR entre dois conjuntos de documentos
-        return conjunto1 | conjunto2
+    def operador_not(self, conjunto):
+        # Implementa o operador NOT como complemento em relação a todos os DocIDs.
+        # Fora do backend de listas, o complemento é feito sobre o mapa de bits.
+        # DocIDs de documentos removidos do índice (lápides) ficam de fora.
+        if self.backend != 'lista':
+            conjunto = MapaDeBits.de_postings(conjunto)
+        resultado = conjunto.complemento(self.indice.num_docs)
+        if self.indice.removidos:
+            resultado = resultado.menos(ListaOrdenada(self.indice.docs_removidos()))
+        return resultado
 
     #----------------------------------------------------------------------------------------#
-    def operador_not(self, conjunto: Set[str]) -> Set[str]:
-        # Implementa o operador NOT para um conjunto de documentos
-        todos_docs = set(self.doc_ids.values())
-        return todos_docs - conjunto
+    def operador_and_not(self, conjunto1, conjunto2):
+        # Implementa AND NOT como diferença, sem construir o complemento de conjunto2
+        return conjunto1.menos(conjunto2)
+
+    #----------------------------------------------------------------------------------------#
+    def normalizar_termo_consulta(self, termo: str) -> Optional[str]:
+        # Normaliza como na indexação; termos descartados lá (stopwords, muito curtos) somem da consulta
+        return self.analisador.termo(termo) or None
 
     #----------------------------------------------------------------------------------------#
     def processar_consulta(self, consulta: str) -> List[str]:
-        # Processa uma consulta booleana e retorna a lista de documentos que correspondem
-        # Divide a consulta em tokens (não precisa lowercase aqui, normalizar_token já faz isso)
-        tokens = consulta.split()
-        
-        if not tokens:
+        # Processa uma consulta booleana e retorna a lista de documentos que correspondem.
+        # A consulta vira uma árvore (NOT > AND > OR, com parênteses), que é simplificada
+        # e avaliada pelo planejador de custo.
+        arvore = analisar_consulta(consulta)
+        if arvore is None:
+            return []
+        arvore = simplificar(arvore, self.normalizar_termo_consulta)
+        if arvore is None:
             return []
 
-        # Pilha para armazenar resultados intermediários
-        pilha: List[Set[str]] = []
-        
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
-            
-            if token == 'not':
-                # NOT deve ser seguido por um termo
-                if i + 1 >= len(tokens):
-                    raise ValueError("Operador NOT deve ser seguido por um termo")
-                    
-                # Pega o próximo termo e aplica NOT
-                prox_termo = tokens[i + 1]
-                resultado = self.operador_not(self.buscar_termo(prox_termo))
-                pilha.append(resultado)
-                i += 2
-                
-            elif token.lower() == 'and' or token.lower() == 'or':
-                # AND/OR precisa de dois operandos
-                if len(pilha) < 1 or i + 1 >= len(tokens):
-                    raise ValueError(f"Operador {token.upper()} precisa de dois operandos")
-                    
-                op1 = pilha.pop()
-                # Pega próximo termo
-                prox_termo = tokens[i + 1]
-                
-                if prox_termo.lower() == 'not':
-                    # Se próximo for NOT, processa ele primeiro
-                    if i + 2 >= len(tokens):
-                        raise ValueError("NOT deve ser seguido por um termo")
-                    op2 = self.operador_not(self.buscar_termo(tokens[i + 2]))
-                    i += 3
-                else:
-                    op2 = self.buscar_termo(prox_termo)
-                    i += 2
-                    # Aplica o operador
-                if token.lower() == 'and':
-                    pilha.append(self.operador_and(op1, op2))
-                else:  # OR
-                    pilha.append(self.operador_or(op1, op2))
-                
-            else:
-                # Termo normal
-                pilha.append(self.buscar_termo(token))
-                i += 1
+        # Consultas repetidas (mesma árvore depois da normalização) saem do cache de resultados
+        return list(self.cache_resultados.consultar(self.indice, ('booleano', repr(arvore)),
+                                                    lambda: tuple(self._documentos(arvore))))
 
-        if not pilha:
-            return []
-        return sorted(list(pilha[0]))
+    #----------------------------------------------------------------------------------------#
+    def _documentos(self, arvore) -> List[str]:
+        resultado = self.avaliar(arvore)
+        # Só agora os DocIDs são convertidos em nomes de arquivo
+        return sorted(self.indice.nome(doc) for doc in resultado)
+
+    #----------------------------------------------------------------------------------------#
+    def estimar(self, no) -> int:
+        # Estimativa do tamanho do resultado de um nó, a partir do df dos termos
+        total = self.indice.num_docs_ativos
+        if isinstance(no, Termo):
+            return self.indice.df(no.termo)
+        if isinstance(no, Frase):
+            return min(self.indice.df(t) for t in no.termos)
+        if isinstance(no, Proximidade):
+            return min(self.estimar(no.esquerda), self.estimar(no.direita))
+        if isinstance(no, Nao):
+            return total - self.estimar(no.filho)
+        if isinstance(no, Ou):
+            return min(total, sum(self.estimar(f) for f in no.filhos))
+        positivos = [f for f in no.filhos if not isinstance(f, Nao)]
+        if positivos:
+            return min(self.estimar(f) for f in positivos)
+        return total - min(total, sum(self.estimar(f.filho) for f in no.filhos))
+
+    #----------------------------------------------------------------------------------------#
+    def avaliar(self, no):
+        if isinstance(no, Termo):
+            return self.postings_termo(no.termo)
+        if isinstance(no, (Frase, Proximidade)):
+            # Intersecção posicional: DocIDs primeiro, posições só dos documentos em comum
+            return criar_postings(documentos_posicionais(self.indice, no), self.indice.num_docs, self.backend)
+        if isinstance(no, Nao):
+            return self.operador_not(self.avaliar(no.filho))
+        if isinstance(no, Ou):
+            resultado = self.avaliar(no.filhos[0])
+            for filho in no.filhos[1:]:
+                resultado = self.operador_or(resultado, self.avaliar(filho))
+            return resultado
+        return self._avaliar_e(no)
+
+    #----------------------------------------------------------------------------------------#
+    def _avaliar_e(self, no: E):
+        # AND: operandos positivos do menor para o maior, parando quando o resultado
+        # esvazia; operandos negados viram diferenças (AND NOT) sobre o resultado
+        positivos = [f for f in no.filhos if not isinstance(f, Nao)]
+        negativos = [f.filho for f in no.filhos if isinstance(f, Nao)]
+
+        if not positivos:
+            # NOT a AND NOT b = NOT (a OR b): um único complemento
+            return self.operador_not(self.avaliar(Ou(negativos) if len(negativos) > 1 else negativos[0]))
+
+        positivos.sort(key=self.estimar)
+        resultado = self.avaliar(positivos[0])
+        for filho in positivos[1:]:
+            if not len(resultado):
+                return resultado
+            resultado = self.operador_and(resultado, self.avaliar(filho))
+        for filho in negativos:
+            if not len(resultado):
+                break
+            resultado = self.operador_and_not(resultado, self.avaliar(filho))
+        return resultado
 
 #----------------------------------------------------------------------------------------#
 def main():
@@ -122,12 +187,15 @@ def main():
     
     print("\nBusca Booleana em Documentos")
     print("============================")
-    print("Operadores disponíveis: AND, OR, NOT")
+    print("Operadores disponíveis: AND, OR, NOT, \"frase exata\" e NEAR/k")
     print("Exemplos: ")
     print("  - termo1 AND termo2")
     print("  - termo1 OR termo2")
     print("  - termo1 AND NOT termo2")
-    print("  - termo1 OR termo2 AND termo3")
+    print("  - termo1 OR termo2 AND termo3   (AND tem precedência sobre OR)")
+    print("  - (termo1 OR termo2) AND NOT termo3")
+    print("  - \"termo1 termo2\" AND termo3         (termos consecutivos)")
+    print("  - termo1 NEAR/3 termo2               (até 3 posições de distância)")
     print("\nDigite 'sair' para encerrar")
     
     while True:
@@ -1,151 +1,460 @@
-import os
-import json
 import math
-from typing import Dict, List, Tuple
+import heapq
+import argparse
+from typing import Dict, List, Set, Tuple
 from collections import Counter
-from Normalizador import normalizar_token
+from Normalizador import Analisador, analisador_do_indice
+from IndiceInvertido import IndiceInvertido, calcular_tf, calcular_idf
+from IndiceSegmentado import abrir_indice
+from CacheConsultas import CacheResultados
+from ConsultaBooleana import restricoes_posicionais, simplificar
+from BuscaPosicional import documentos_restritos
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # sem NumPy/SciPy, buscar_lote consulta uma a uma
+    np = None
+    sparse = None
+
+TAMANHO_BLOCO_LOTE = 256  # consultas por produto de matrizes em buscar_lote
+K1_PADRAO = 1.2           # saturação da frequência no BM25
+B_PADRAO = 0.75           # peso da normalização pelo comprimento no BM25
+
+
+# Pontuadores: definem os pesos de consulta e de documento que o modelo acumula termo a termo
+# sobre as postings, e o fator pelo qual o escore acumulado de cada documento é dividido no
+# final. Cada um tem uma `chave` que entra na chave do cache de resultados.
+class PontuadorCosseno:
+    # TF aumentado (0.5 + 0.5 * freq/max_freq) com IDF log10 nos dois vetores e similaridade
+    # do cosseno: o produto escalar é dividido pelas normas da consulta e do documento
+    chave = ('cosseno',)
+
+    #----------------------------------------------------------------------------------------#
+    def vetor_consulta(self, indice, freq_consulta: Counter) -> Dict[str, float]:
+        # Vetor TF-IDF a partir das frequências dos termos normalizados da consulta
+        if not freq_consulta:
+            return {}
+        max_freq = max(freq_consulta.values())
+
+        # Calcula pesos TF-IDF
+        pesos: Dict[str, float] = {}
+        for termo, freq in freq_consulta.items():
+            if termo in indice:  # só considera termos que existem no índice
+                tf = calcular_tf(freq, max_freq)
+                pesos[termo] = tf * indice.idf(termo)
+
+        return pesos
+
+    #----------------------------------------------------------------------------------------#
+    def pesos_documentos(self, indice, termo: str) -> Dict[int, float]:
+        # Decodifica as postings do termo e calcula o peso TF-IDF de cada documento
+        docs, freqs = indice.postings(termo)
+        idf = indice.idf(termo)
+        max_freq = indice.max_freq
+        return {doc: calcular_tf(freq, max_freq(doc)) * idf for doc, freq in zip(docs, freqs)}
+
+    #----------------------------------------------------------------------------------------#
+    def fator_consulta(self, vetor_consulta: Dict[str, float]) -> float:
+        return math.sqrt(sum(peso**2 for peso in vetor_consulta.values()))
+
+    def fator_documento(self, indice, doc: int) -> float:
+        return indice.norma(doc)
+
+    def limite_superior(self, indice, termo: str, pesos: Dict[int, float]) -> float:
+        # Maior peso/norma do termo, pré-calculado na escrita do índice
+        return indice.limite_superior(termo)
+
+    #----------------------------------------------------------------------------------------#
+    def estatisticas_matriz(self, indice):
+        # Por DocID: frequência máxima e inverso da norma (0 para documentos sem norma)
+        max_freqs = np.ones(indice.num_docs)
+        inversos_normas = np.zeros(indice.num_docs)
+        for doc in indice.documentos():
+            max_freqs[doc] = indice.max_freq(doc)
+            norma_doc = indice.norma(doc)
+            if norma_doc > 0:
+                inversos_normas[doc] = 1.0 / norma_doc
+        return max_freqs, inversos_normas
+
+    def pesos_matriz(self, indice, estatisticas, termo: str, docs, freqs):
+        # Pesos das postings já divididos pela norma de cada documento
+        max_freqs, inversos_normas = estatisticas
+        tf = 0.5 + 0.5 * (freqs / max_freqs[docs])
+        return tf * indice.idf(termo) * inversos_normas[docs]
+
+
+class PontuadorBM25:
+    # Okapi BM25: peso do documento idf * f * (k1 + 1) / (f + k1 * (1 - b + b * comprimento /
+    # comprimento médio)), com idf = ln(1 + (N - df + 0.5) / (df + 0.5)); o termo pesa na
+    # consulta pelo número de vezes em que aparece nela e o escore é a soma, sem normalização.
+    # Os comprimentos vêm das estatísticas dos documentos e o médio, da soma gravada no índice.
+    # Os documentos têm um único campo (o resumo), caso em que o BM25F coincide com o BM25.
+    def __init__(self, k1: float = K1_PADRAO, b: float = B_PADRAO):
+        if k1 < 0:
+            raise ValueError(f"k1 deve ser não negativo: {k1}")
+        if not 0 <= b <= 1:
+            raise ValueError(f"b deve estar entre 0 e 1: {b}")
+        self.k1 = k1
+        self.b = b
+        self.chave = ('bm25', k1, b)
+
+    #----------------------------------------------------------------------------------------#
+    def idf(self, indice, termo: str) -> float:
+        df = indice.df(termo)
+        return math.log(1 + (indice.num_docs_ativos - df + 0.5) / (df + 0.5))
+
+    #----------------------------------------------------------------------------------------#
+    def vetor_consulta(self, indice, freq_consulta: Counter) -> Dict[str, float]:
+        return {termo: float(freq) for termo, freq in freq_consulta.items() if termo in indice}
+
+    #----------------------------------------------------------------------------------------#
+    def pesos_documentos(self, indice, termo: str) -> Dict[int, float]:
+        docs, freqs = indice.postings(termo)
+        if not docs:
+            return {}
+        fator = self.idf(indice, termo) * (self.k1 + 1)
+        # k1 * (1 - b + b * comprimento / médio) = constante + proporcao * comprimento
+        medio = indice.comprimento_medio or 1.0
+        constante = self.k1 * (1 - self.b)
+        proporcao = self.k1 * self.b / medio
+        comprimento = indice.comprimento
+        return {doc: fator * freq / (freq + (constante + proporcao * comprimento(doc)))
+                for doc, freq in zip(docs, freqs)}
+
+    #----------------------------------------------------------------------------------------#
+    def fator_consulta(self, vetor_consulta: Dict[str, float]) -> float:
+        return 1.0
+
+    def fator_documento(self, indice, doc: int) -> float:
+        return 1.0
+
+    def limite_superior(self, indice, termo: str, pesos: Dict[int, float]) -> float:
+        # Os pesos do termo já foram calculados para a consulta: o limite é o maior deles
+        return max(pesos.values(), default=0.0)
+
+    #----------------------------------------------------------------------------------------#
+    def estatisticas_matriz(self, indice):
+        # Por DocID: a parte do denominador que não depende da frequência
+        medio = indice.comprimento_medio or 1.0
+        comprimentos = np.zeros(indice.num_docs)
+        for doc in indice.documentos():
+            comprimentos[doc] = indice.comprimento(doc)
+        return self.k1 * (1 - self.b) + self.k1 * self.b / medio * comprimentos
+
+    def pesos_matriz(self, indice, estatisticas, termo: str, docs, freqs):
+        return self.idf(indice, termo) * (self.k1 + 1) * freqs / (freqs + estatisticas[docs])
+
+
+PONTUADORES = {'cosseno': PontuadorCosseno, 'bm25': PontuadorBM25}
+
 
 class ModeloEspacoVetorial:
-    def __init__(self):
-        self.documentos: Dict[str, Dict] = {}  # DocID -> info do documento
-        self.doc_names: Dict[str, str] = {}    # DocID -> nome do arquivo
-        self.indice: Dict[str, Dict[str, float]] = {}  # termo -> {DocID -> peso tf-idf}
-        self.idf: Dict[str, float] = {}        # termo -> valor idf
-        self.normas: Dict[str, float] = {}     # DocID -> norma do vetor
-        self.carregar_indice()
+    def __init__(self, indice: IndiceInvertido = None, freq_json_path: str = None,
+                 cache_resultados: CacheResultados = None, pontuador=None):
+        self.indice: IndiceInvertido = None  # índice binário (termo -> postings, normas, idf)
+        self.doc_names = {}                  # DocID -> nome do arquivo
+        # consultas já respondidas; pode ser compartilhado com o modelo booleano
+        self.cache_resultados = cache_resultados if cache_resultados is not None else CacheResultados()
+        # ranking: similaridade do cosseno com TF-IDF (padrão) ou PontuadorBM25
+        self.pontuador = pontuador if pontuador is not None else PontuadorCosseno()
+        self.matriz = None                   # (índice, versão, chave do pontuador, termo -> linha, matriz)
+        self.carregar_indice(indice, freq_json_path)
 
     #----------------------------------------------------------------------------------------#
     def calcular_tf(self, freq: int, max_freq: int) -> float:
         #Calcula TF normalizado (0.5 + 0.5 * freq/max_freq)
-        return 0.5 + 0.5 * (freq / max_freq)
+        return calcular_tf(freq, max_freq)
 
     #----------------------------------------------------------------------------------------#
     def calcular_idf(self, termo: str, total_docs: int, docs_com_termo: int) -> float:
         #Calcula IDF (log(N/df))
-        return math.log10(total_docs / docs_com_termo) if docs_com_termo > 0 else 0
-
-    #----------------------------------------------------------------------------------------#
-    def carregar_indice(self):
-        #Carrega dados do arquivo frequencies_summary.json e calcula os pesos TF-IDF
-        src_dir = os.path.dirname(__file__)
-        raiz = os.path.abspath(os.path.join(src_dir, '..'))
-        freq_json_path = os.path.join(raiz, 'results', 'frequencies_summary.json')
-
-        # Novo formato simples: { "Doc.pdf": [[termo, freq], ...], ... }
-        with open(freq_json_path, 'r', encoding='utf-8') as f:
-            dados = json.load(f)
-
-        # Primeiro, coleta informações básicas e calcula TF
-        total_docs = len(dados)
-        docs_por_termo: Dict[str, int] = Counter()  # termo -> número de docs que contém
-
-        # Para cada documento (nome do PDF), processa suas frequências
-        for pdf_nome, freq_list in dados.items():
-            doc_id = pdf_nome  # usamos o nome do PDF como identificador
-            # converte lista de pares em dict de frequências
-            freqs = {t: int(c) for t, c in freq_list}
-            self.documentos[doc_id] = {"frequencias": freqs}
-            self.doc_names[doc_id] = pdf_nome
-
-            # Encontra frequência máxima no documento para normalização do TF
-            max_freq = max(freqs.values()) if freqs else 1
-
-            # Para cada termo no documento
-            for termo, freq in freqs.items():
-                if termo not in self.indice:
-                    self.indice[termo] = {}
-                # Calcula e armazena TF normalizado
-                self.indice[termo][doc_id] = self.calcular_tf(freq, max_freq)
-                docs_por_termo[termo] += 1
-
-        # Calcula IDF para cada termo
-        for termo, num_docs in docs_por_termo.items():
-            self.idf[termo] = self.calcular_idf(termo, total_docs, num_docs)
-
-        # Aplica IDF aos pesos TF e calcula normas dos documentos
-        for termo, docs in self.indice.items():
-            idf = self.idf[termo]
-            for doc_id in docs:
-                self.indice[termo][doc_id] *= idf
-
-        # Calcula norma de cada documento
-        for doc_id in self.documentos:
-            soma_quadrados = 0
-            for termo, docs in self.indice.items():
-                if doc_id in docs:
-                    soma_quadrados += docs[doc_id] ** 2
-            self.normas[doc_id] = math.sqrt(soma_quadrados)
+        return calcular_idf(total_docs, docs_com_termo)
 
     #----------------------------------------------------------------------------------------#
-    def criar_vetor_consulta(self, consulta: str) -> Dict[str, float]:
-        # Cria vetor TF-IDF para a consulta
-        # Tokeniza, normaliza e conta frequências
-        tokens_raw = consulta.split()
-        if not tokens_raw:
-            return {}
-        
-        # Normaliza cada token da mesma forma que os documentos foram normalizados
+    def carregar_indice(self, indice: IndiceInvertido = None, freq_json_path: str = None):
+        # Usa o índice compartilhado recebido ou abre o índice binário via mmap.
+        # IDF, normas e limites superiores já vêm pré-calculados; as postings de cada
+        # termo só são decodificadas quando uma consulta o utiliza.
+        self.indice = indice if indice is not None else abrir_indice(freq_json_path)
+        self.doc_names = self.indice.nomes_documentos
+        self.cache_resultados.limpar()
+        self.matriz = None
+
+    #----------------------------------------------------------------------------------------#
+    @property
+    def analisador(self) -> Analisador:
+        # Mesmas etapas (e stopwords) da indexação, conforme registrado no índice
+        return analisador_do_indice(self.indice)
+
+    #----------------------------------------------------------------------------------------#
+    def pesos_documentos(self, termo: str) -> Dict[int, float]:
+        # Decodifica as postings do termo e calcula o peso de cada documento (TF-IDF no cosseno)
+        return self.pontuador.pesos_documentos(self.indice, termo)
+
+    #----------------------------------------------------------------------------------------#
+    def termos_consulta(self, consulta: str) -> List[str]:
+        # Normaliza cada token da mesma forma que os documentos foram normalizados. As
+        # palavras das frases entre aspas e dos operandos de NEAR/k também entram no vetor.
+        analisador = self.analisador
         termos_normalizados = []
-        for token in tokens_raw:
-            termo_norm = normalizar_token(token)
+        for token in restricoes_posicionais(consulta)[0]:
+            termo_norm = analisador.termo(token)
             if termo_norm:  # Ignora tokens vazios após normalização
                 termos_normalizados.append(termo_norm)
-        
-        if not termos_normalizados:
-            return {}
+        return termos_normalizados
 
-        # Conta frequências
-        freq_consulta = Counter(termos_normalizados)
-        max_freq = max(freq_consulta.values())
+    #----------------------------------------------------------------------------------------#
+    def restricoes_consulta(self, consulta: str) -> List:
+        # Frases e NEAR/k da consulta, com os termos normalizados: só os documentos que
+        # satisfazem todas são ranqueados
+        analisador = self.analisador
+        restricoes = (simplificar(r, lambda t: analisador.termo(t) or None)
+                      for r in restricoes_posicionais(consulta)[1])
+        return [r for r in restricoes if r is not None]
 
-        # Calcula pesos TF-IDF
-        pesos: Dict[str, float] = {}
-        for termo, freq in freq_consulta.items():
-            if termo in self.idf:  # só considera termos que existem no índice
-                tf = self.calcular_tf(freq, max_freq)
-                pesos[termo] = tf * self.idf[termo]
+    #----------------------------------------------------------------------------------------#
+    def criar_vetor_consulta(self, consulta: str) -> Dict[str, float]:
+        # Cria vetor TF-IDF para a consulta
+        # Tokeniza, normaliza e conta frequências
+        return self.vetor_de_frequencias(Counter(self.termos_consulta(consulta)))
 
-        return pesos
+    #----------------------------------------------------------------------------------------#
+    def vetor_de_frequencias(self, freq_consulta: Counter) -> Dict[str, float]:
+        # Vetor da consulta (TF-IDF no cosseno) a partir das frequências dos termos normalizados
+        return self.pontuador.vetor_consulta(self.indice, freq_consulta)
 
     #----------------------------------------------------------------------------------------#
     def similaridade_cosseno(self, vetor_consulta: Dict[str, float], doc_id: str) -> float:
-        # Calcula similaridade por cosseno entre consulta e documento
-        if not vetor_consulta or doc_id not in self.normas:
+        # Calcula similaridade por cosseno entre consulta e documento (com outro pontuador,
+        # o escore dele para o documento)
+        doc = self.indice.id_documento(doc_id)
+        if not vetor_consulta or doc is None:
             return 0.0
 
         # Calcula produto escalar
         produto = 0.0
         for termo, peso_consulta in vetor_consulta.items():
-            if termo in self.indice and doc_id in self.indice[termo]:
-                produto += peso_consulta * self.indice[termo][doc_id]
+            peso_doc = self.pesos_documentos(termo).get(doc)
+            if peso_doc is not None:
+                produto += peso_consulta * peso_doc
 
         # Calcula norma do vetor de consulta
-        norma_consulta = math.sqrt(sum(peso**2 for peso in vetor_consulta.values()))
-        
+        norma_consulta = self.pontuador.fator_consulta(vetor_consulta)
+        norma_doc = self.pontuador.fator_documento(self.indice, doc)
+
         # Evita divisão por zero
-        if norma_consulta == 0 or self.normas[doc_id] == 0:
+        if norma_consulta == 0 or norma_doc == 0:
             return 0.0
 
-        return produto / (norma_consulta * self.normas[doc_id])
+        return produto / (norma_consulta * norma_doc)
 
     #----------------------------------------------------------------------------------------#
-    def buscar(self, consulta: str, limite: int = 10) -> List[Tuple[str, float]]:
+    def buscar(self, consulta: str, limite: int = 10, modo: str = 'exaustivo') -> List[Tuple[str, float]]:
         # Realiza busca vetorial e retorna documentos ranqueados por similaridade
+        # modo='exaustivo' pontua todos os documentos das listas de postings;
+        # modo='maxscore' descarta cedo documentos que não podem chegar ao top-k.
+        if modo not in ('exaustivo', 'maxscore'):
+            raise ValueError(f"Modo de busca desconhecido: {modo}")
+        freq_consulta = Counter(self.termos_consulta(consulta))
+        if not freq_consulta or limite <= 0:
+            return []
+        restricoes = self.restricoes_consulta(consulta)
+
+        # Consultas repetidas (mesmos termos normalizados, em qualquer ordem) saem do cache
+        chave = ('vetorial', self.pontuador.chave, modo, tuple(sorted(freq_consulta.items())), limite,
+                 tuple(map(repr, restricoes)))
+        return list(self.cache_resultados.consultar(
+            self.indice, chave, lambda: tuple(self._ranquear(freq_consulta, limite, modo, restricoes))))
+
+    #----------------------------------------------------------------------------------------#
+    def _ranquear(self, freq_consulta: Counter, limite: int, modo: str,
+                  restricoes: List = ()) -> List[Tuple[str, float]]:
         # Cria vetor para a consulta
-        vetor_consulta = self.criar_vetor_consulta(consulta)
+        vetor_consulta = self.vetor_de_frequencias(freq_consulta)
         if not vetor_consulta:
             return []
 
-        # Calcula similaridade com cada documento
-        similaridades: List[Tuple[str, float]] = []
-        for doc_id in self.documentos:
-            sim = self.similaridade_cosseno(vetor_consulta, doc_id)
+        # Frases e NEAR/k restringem os candidatos, calculados antes por intersecção posicional
+        candidatos = None
+        if restricoes:
+            candidatos = set(documentos_restritos(self.indice, restricoes))
+            if not candidatos:
+                return []
+
+        # Norma da consulta é calculada uma única vez
+        norma_consulta = self.pontuador.fator_consulta(vetor_consulta)
+        if norma_consulta == 0:
+            return []
+
+        # Decodifica uma vez as postings dos termos da consulta
+        postings = {termo: self.pesos_documentos(termo) for termo in vetor_consulta}
+        normas: Dict[int, float] = {}
+
+        if candidatos is not None:
+            # a poda do MaxScore não vale com restrições: os candidatos já são poucos
+            acumuladores = self._acumular(vetor_consulta, postings, candidatos)
+        elif modo == 'maxscore':
+            candidatos = self._candidatos_maxscore(vetor_consulta, postings, normas, limite)
+            acumuladores = self._acumular(vetor_consulta, postings, candidatos)
+        else:
+            acumuladores = self._acumular(vetor_consulta, postings)
+
+        # Normaliza uma vez no final, só para os documentos acumulados
+        similaridades: List[Tuple[int, float]] = []
+        for doc, produto in acumuladores.items():
+            norma_doc = normas.get(doc)
+            if norma_doc is None:
+                norma_doc = self.pontuador.fator_documento(self.indice, doc)
+            if norma_doc == 0:
+                continue
+            sim = produto / (norma_consulta * norma_doc)
             if sim > 0:  # só inclui documentos com alguma similaridade
-                similaridades.append((doc_id, sim))
+                similaridades.append((doc, sim))
+
+        # Seleciona os `limite` melhores com um heap limitado, desempatando pelo DocID
+        # (ordem dos documentos no índice) e só então resolve os nomes
+        melhores = heapq.nsmallest(limite, similaridades, key=lambda x: (-x[1], x[0]))
+        return [(self.indice.nome(doc), sim) for doc, sim in melhores]
+
+    #----------------------------------------------------------------------------------------#
+    def buscar_lote(self, consultas: List[str], limite: int = 10) -> List[List[Tuple[str, float]]]:
+        # Busca vetorial de várias consultas de uma vez, com o mesmo ranking de buscar: a matriz
+        # esparsa das consultas (pesos divididos pela norma de cada consulta) é
+        # multiplicada pela matriz termos x documentos já normalizada, em blocos de
+        # TAMANHO_BLOCO_LOTE consultas, e o top-k de cada linha é selecionado com NumPy.
+        # Consultas com frases ou NEAR/k têm a linha filtrada pelos documentos que as satisfazem.
+        # Sem NumPy/SciPy, cai no laço de buscar.
+        if sparse is None:
+            return [self.buscar(c, limite) for c in consultas]
+        if limite <= 0:
+            return [[] for _ in consultas]
+        linhas, matriz = self.matriz_documentos()
+        resultados = []
+        for inicio in range(0, len(consultas), TAMANHO_BLOCO_LOTE):
+            bloco = consultas[inicio:inicio + TAMANHO_BLOCO_LOTE]
+            indices, dados, indptr = [], [], [0]
+            filtros = []
+            for consulta in bloco:
+                restricoes = self.restricoes_consulta(consulta)
+                filtros.append(documentos_restritos(self.indice, restricoes) if restricoes else None)
+                vetor_consulta = self.vetor_de_frequencias(Counter(self.termos_consulta(consulta)))
+                norma_consulta = self.pontuador.fator_consulta(vetor_consulta)
+                if norma_consulta > 0:
+                    for termo, peso in vetor_consulta.items():
+                        indices.append(linhas[termo])
+                        dados.append(peso / norma_consulta)
+                indptr.append(len(indices))
+            matriz_consultas = sparse.csr_matrix((dados, indices, indptr), shape=(len(bloco), matriz.shape[0]))
+            similaridades = (matriz_consultas @ matriz).tocsr()
+            for i in range(len(bloco)):
+                ini, fim = similaridades.indptr[i], similaridades.indptr[i + 1]
+                docs, sims = similaridades.indices[ini:fim], similaridades.data[ini:fim]
+                if filtros[i] is not None:
+                    selecao = np.isin(docs, np.frombuffer(filtros[i], dtype=np.uint32))
+                    docs, sims = docs[selecao], sims[selecao]
+                resultados.append(self._melhores(docs, sims, limite))
+        return resultados
 
-        # Ordena por similaridade (decrescente) e limita número de resultados
-        similaridades.sort(key=lambda x: x[1], reverse=True)
-        return similaridades[:limite]
+    #----------------------------------------------------------------------------------------#
+    def _melhores(self, docs, sims, limite: int) -> List[Tuple[str, float]]:
+        # Top-k de uma linha de similaridades, desempatando pelo DocID como em buscar
+        positivos = sims > 0
+        docs, sims = docs[positivos], sims[positivos]
+        if len(sims) > limite:
+            # todos os empatados com o k-ésimo escore entram na ordenação final
+            limiar = np.partition(sims, len(sims) - limite)[len(sims) - limite]
+            selecao = sims >= limiar
+            docs, sims = docs[selecao], sims[selecao]
+        ordem = np.lexsort((docs, -sims))[:limite]
+        return [(self.indice.nome(int(docs[j])), float(sims[j])) for j in ordem]
+
+    #----------------------------------------------------------------------------------------#
+    def matriz_documentos(self):
+        # Matriz esparsa (CSR) termos x documentos com os pesos de cada posting já divididos
+        # pelo fator do documento (a norma, no cosseno), e o mapa termo -> linha. É montada na
+        # primeira busca em lote e refeita quando o índice muda de versão ou de pontuador.
+        chave = (self.indice, self.indice.versao, self.pontuador.chave)
+        if self.matriz is not None and self.matriz[0] is chave[0] and self.matriz[1:3] == chave[1:]:
+            return self.matriz[3], self.matriz[4]
+        indice = self.indice
+        estatisticas = self.pontuador.estatisticas_matriz(indice)
+        linhas: Dict[str, int] = {}
+        indices, dados, indptr = [], [], [0]
+        for termo in indice.termos():
+            docs, freqs = indice.postings(termo)
+            docs = np.frombuffer(docs, dtype=np.uint32).astype(np.int64)
+            linhas[termo] = len(linhas)
+            indices.append(docs)
+            dados.append(self.pontuador.pesos_matriz(indice, estatisticas, termo, docs,
+                                                     np.frombuffer(freqs, dtype=np.uint32)))
+            indptr.append(indptr[-1] + len(docs))
+        matriz = sparse.csr_matrix((np.concatenate(dados) if dados else np.zeros(0),
+                                    np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+                                    np.array(indptr)), shape=(len(linhas), indice.num_docs))
+        self.matriz = chave + (linhas, matriz)
+        return linhas, matriz
+
+    #----------------------------------------------------------------------------------------#
+    def _acumular(self, vetor_consulta: Dict[str, float], postings: Dict[str, Dict[int, float]],
+                  candidatos: Set[int] = None) -> Dict[int, float]:
+        # Termo a termo: percorre só as listas de postings dos termos da consulta,
+        # acumulando o produto escalar parcial de cada documento encontrado.
+        # Com `candidatos`, só esses documentos são pontuados (na mesma ordem de soma).
+        acumuladores: Dict[int, float] = {}
+        for termo, peso_consulta in vetor_consulta.items():
+            pesos = postings[termo]
+            if candidatos is not None and len(candidatos) < len(pesos):
+                itens = ((doc, pesos[doc]) for doc in candidatos if doc in pesos)
+            else:
+                itens = pesos.items()
+            for doc, peso_doc in itens:
+                if candidatos is not None and doc not in candidatos:
+                    continue
+                acumuladores[doc] = acumuladores.get(doc, 0.0) + peso_consulta * peso_doc
+        return acumuladores
+
+    #----------------------------------------------------------------------------------------#
+    def _candidatos_maxscore(self, vetor_consulta: Dict[str, float], postings: Dict[str, Dict[int, float]],
+                             normas: Dict[int, float], limite: int) -> Set[int]:
+        # MaxScore termo a termo: processa os termos do maior para o menor limite superior.
+        # Quando a soma dos limites dos termos restantes fica abaixo do k-ésimo melhor escore
+        # parcial, nenhum documento novo pode entrar no top-k e só os já vistos são atualizados.
+        contribuicao = {t: vetor_consulta[t] * self.pontuador.limite_superior(self.indice, t, postings[t])
+                        for t in vetor_consulta}
+        termos = sorted(vetor_consulta, key=contribuicao.get, reverse=True)
+        restante = [0.0] * (len(termos) + 1)
+        for i in range(len(termos) - 1, -1, -1):
+            restante[i] = restante[i + 1] + contribuicao[termos[i]]
+
+        parciais: Dict[int, float] = {}  # DocID -> escore parcial já dividido pela norma
+        for i, termo in enumerate(termos):
+            pesos = postings[termo]
+            peso_consulta = vetor_consulta[termo]
+
+            aceita_novos = True
+            if len(parciais) >= limite:
+                limiar = heapq.nlargest(limite, parciais.values())[-1]
+                # margem relativa para não podar por erro de arredondamento
+                aceita_novos = restante[i] * (1 + 1e-9) >= limiar
+
+            if aceita_novos:
+                for doc, peso_doc in pesos.items():
+                    norma_doc = normas.get(doc)
+                    if norma_doc is None:
+                        norma_doc = normas[doc] = self.pontuador.fator_documento(self.indice, doc)
+                    if norma_doc > 0:
+                        parciais[doc] = parciais.get(doc, 0.0) + peso_consulta * peso_doc / norma_doc
+            elif len(pesos) < len(parciais):
+                for doc, peso_doc in pesos.items():
+                    if doc in parciais:
+                        parciais[doc] += peso_consulta * peso_doc / normas[doc]
+            else:
+                for doc in parciais:
+                    peso_doc = pesos.get(doc)
+                    if peso_doc is not None:
+                        parciais[doc] += peso_consulta * peso_doc / normas[doc]
+        return set(parciais)
 
     #----------------------------------------------------------------------------------------#
     def mostrar_resultados(self, resultados: List[Tuple[str, float]]):
@@ -159,13 +468,29 @@ class ModeloEspacoVetorial:
         
         for i, (doc_id, similaridade) in enumerate(resultados, 1):
             nome_original = self.doc_names[doc_id]
-            info = self.documentos[doc_id]
             
             print(f"{i}. {nome_original}")
 
+#----------------------------------------------------------------------------------------#
+def criar_pontuador(nome: str = 'cosseno', k1: float = K1_PADRAO, b: float = B_PADRAO):
+    # Pontuador pelo nome ('cosseno' ou 'bm25'); k1 e b só valem para o BM25
+    if nome not in PONTUADORES:
+        raise ValueError(f"Pontuação desconhecida: {nome}")
+    return PontuadorBM25(k1, b) if nome == 'bm25' else PONTUADORES[nome]()
+
 #----------------------------------------------------------------------------------------#
 def main():
-    modelo = ModeloEspacoVetorial()
+    parser = argparse.ArgumentParser(description="Busca por similaridade no modelo espaço vetorial.")
+    parser.add_argument("--pontuacao", choices=sorted(PONTUADORES), default='cosseno',
+                        help="cosseno (TF-IDF) ou bm25.")
+    parser.add_argument("--k1", type=float, default=K1_PADRAO, help="Saturação da frequência no BM25.")
+    parser.add_argument("--b", type=float, default=B_PADRAO, help="Normalização pelo comprimento no BM25 (0 a 1).")
+    args = parser.parse_args()
+    try:
+        pontuador = criar_pontuador(args.pontuacao, args.k1, args.b)
+    except ValueError as e:
+        parser.error(str(e))
+    modelo = ModeloEspacoVetorial(pontuador=pontuador)
     
     print("\nBusca por Similaridade (Modelo Espaço Vetorial)")
     print("=============================================")
@@ -2,8 +2,19 @@ import os
 import re
 import unicodedata
 import json
-from typing import List
-from collections import Counter
+from array import array
+from typing import Callable, Dict, Iterator, List, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from IndiceSegmentado import ConjuntoSegmentos, pasta_segmentos, preparar_segmentos, MEMORIA_INDEXACAO
+from IndiceInvertido import termos_posicionais
+from Radicalizador import radical
+
+# Formas distintas de tokens guardadas pelo cache de cada analisador (LRU)
+TAMANHO_CACHE_TERMOS = 1 << 16
+# Resumos em andamento por processo na normalização paralela
+PENDENTES_POR_TRABALHADOR = 4
 
 #----------------------------------------------------------------------------------------#
 def remover_acentos(texto: str) -> str:
@@ -33,7 +44,7 @@ def carregar_stopwords(caminho_stopwords: str) -> set:
 	return palavras
 
 #----------------------------------------------------------------------------------------#
-def normalizar_token(token: str) -> str:
+def limpar_token(token: str) -> str:
 	# Remove acentos
 	t = remover_acentos(token)
 	# Mantém hífens que aparecem entre duas letras (ex: "micro-ambiente")
@@ -46,70 +57,314 @@ def normalizar_token(token: str) -> str:
 		else:
 			# ignora outros caracteres
 			continue
-	t = ''.join(chars).lower()
-	
+	return ''.join(chars).lower()
+
+#----------------------------------------------------------------------------------------#
+def remover_plural(t: str) -> str:
 	# Normalização simples para plural: remove 's' e 'es' no final
 	if t.endswith('es') and len(t) > 3:
 		t = t[:-2]
 	elif t.endswith('s') and len(t) > 2:
 		t = t[:-1]
 	return t
-	
 
 #----------------------------------------------------------------------------------------#
-def normalizar_arquivo(caminho_entrada: str, caminho_saida: str, stopwords: set) -> Counter:
-	with open(caminho_entrada, 'r', encoding='utf-8') as f:
-		texto = f.read()
+def normalizar_token(token: str) -> str:
+	return remover_plural(limpar_token(token))
+
+
+# Etapas do analisador, aplicadas em ordem a cada token já limpo (sem acentos, minúsculo,
+# só letras e hífens internos). 'stopwords' descarta o token; as demais o transformam.
+# As etapas usadas na indexação ficam registradas no índice e as consultas usam as mesmas.
+ETAPAS = {'plural': remover_plural, 'rslp': radical}
+ETAPAS_LEGADO = ('plural', 'stopwords')   # índices sem análise registrada
+ETAPAS_PADRAO = ('stopwords', 'rslp')     # stopwords antes do radical ("para" viraria "par")
+
+
+class Analisador:
+	# Limpeza seguida das etapas, com um LRU limitado de token bruto -> termo ('' quando o
+	# token é descartado). Em texto com distribuição de Zipf as mesmas formas ("Qualidade,",
+	# "vida.") se repetem o tempo todo; por isso há uma instância por configuração,
+	# compartilhada pela indexação e pelas consultas dos dois modelos (obter_analisador).
+	# termo_limpo é a entrada para tokens que já passaram por limpar_token (tokenizar):
+	# só aplica as etapas, com seu próprio LRU.
+	def __init__(self, etapas=ETAPAS_PADRAO, stopwords: set = None):
+		for etapa in etapas:
+			if etapa != 'stopwords' and etapa not in ETAPAS:
+				raise ValueError(f"Etapa de análise desconhecida: {etapa}")
+		self.etapas = tuple(etapas)
+		self.stopwords = stopwords if stopwords is not None else set()
+		self.termo = lru_cache(maxsize=TAMANHO_CACHE_TERMOS)(self._termo)
+		self.termo_limpo = lru_cache(maxsize=TAMANHO_CACHE_TERMOS)(self._aplicar_etapas)
+
+	#----------------------------------------------------------------------------------------#
+	def _termo(self, token: str) -> str:
+		return self._aplicar_etapas(limpar_token(token))
+
+	#----------------------------------------------------------------------------------------#
+	def _aplicar_etapas(self, t: str) -> str:
+		for etapa in self.etapas:
+			if etapa == 'stopwords':
+				if t in self.stopwords:
+					return ''
+			else:
+				t = ETAPAS[etapa](t)
+		return t if len(t) >= 2 else ''
+
+	#----------------------------------------------------------------------------------------#
+	@property
+	def configuracao(self) -> Dict:
+		return {'etapas': list(self.etapas)}
+
+	#----------------------------------------------------------------------------------------#
+	def estatisticas_cache(self) -> Dict[str, float]:
+		# Soma dos dois caches (tokens brutos e tokens já limpos)
+		infos = (self.termo.cache_info(), self.termo_limpo.cache_info())
+		acertos = sum(info.hits for info in infos)
+		falhas = sum(info.misses for info in infos)
+		consultas = acertos + falhas
+		return {
+			'acertos': acertos,
+			'falhas': falhas,
+			'taxa_acertos': acertos / consultas if consultas else 0.0,
+			'tamanho': sum(info.currsize for info in infos),
+			'capacidade': sum(info.maxsize for info in infos),
+		}
+
+	#----------------------------------------------------------------------------------------#
+	def limpar_cache(self):
+		self.termo.cache_clear()
+		self.termo_limpo.cache_clear()
+
+
+_analisadores: Dict[Tuple[str, ...], Analisador] = {}
+
+#----------------------------------------------------------------------------------------#
+def caminho_stopwords_padrao() -> str:
+	return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'stopwords.txt'))
+
+#----------------------------------------------------------------------------------------#
+def obter_analisador(etapas=ETAPAS_PADRAO) -> Analisador:
+	# Instância compartilhada (e seu cache) de cada configuração, com as stopwords de stopwords.txt
+	etapas = tuple(etapas)
+	analisador = _analisadores.get(etapas)
+	if analisador is None:
+		caminho_stop = caminho_stopwords_padrao()
+		stopwords = carregar_stopwords(caminho_stop) if os.path.exists(caminho_stop) else set()
+		analisador = _analisadores[etapas] = Analisador(etapas, stopwords)
+	return analisador
+
+#----------------------------------------------------------------------------------------#
+def analisador_do_indice(indice) -> Analisador:
+	# Analisador com as etapas registradas no índice; índices sem registro usam as etapas antigas
+	configuracao = indice.analisador
+	return obter_analisador(configuracao['etapas'] if configuracao else ETAPAS_LEGADO)
 
-	# Substitui quebras de linha e hífens que separam palavras ao fim da linha
+#----------------------------------------------------------------------------------------#
+@lru_cache(maxsize=256)
+def _padrao_caracteres(caracteres: str) -> re.Pattern:
+	# Classe de caracteres compilada uma vez por conjunto (os documentos repetem os mesmos
+	# acentos e pontuações); re.sub apaga muito mais rápido que str.translate com dict
+	return re.compile('[' + re.escape(caracteres) + ']')
+
+#----------------------------------------------------------------------------------------#
+def tokenizar(texto: str, analisador: Analisador) -> Iterator[str]:
+	# Mesmo resultado de aplicar analisador.termo a cada token separado por espaços, mas
+	# com o texto inteiro tratado de uma vez por NFD e expressões regulares:
+	# 1. remove os acentos (marcas combinantes) do documento todo;
+	# 2. marca os hífens entre duas letras com um caractere sentinela;
+	# 3. apaga tudo que não é letra, espaço ou sentinela (que volta a ser hífen);
+	# 4. lower() no documento todo; cada token, já limpo, só passa pelas etapas do
+	#    analisador (termo_limpo, sem repetir limpar_token).
 	texto = texto.replace('-\n', '')
 	texto = texto.replace('\n', ' ')
+	texto = unicodedata.normalize('NFD', texto)
+	caracteres = set(texto)
+	acentos = ''.join(sorted(c for c in caracteres if unicodedata.combining(c)))
+	if acentos:
+		texto = _padrao_caracteres(acentos).sub('', texto)
+		caracteres = set(texto)
 
-	# Tokeniza por espaços
-	raw_tokens = re.split(r"\s+", texto)
+	sentinela = None
+	if '-' in caracteres:
+		sentinela = next(chr(cp) for cp in range(0xE000, 0xF900) if chr(cp) not in caracteres)
+		partes = texto.split('-')
+		pedacos = [partes[0]]
+		for anterior, proxima in zip(partes, partes[1:]):
+			entre_letras = anterior[-1:].isalpha() and proxima[:1].isalpha()
+			pedacos.append(sentinela if entre_letras else '-')
+			pedacos.append(proxima)
+		texto = ''.join(pedacos)
+	apagar = ''.join(sorted(c for c in caracteres if not (c.isalpha() or c.isspace())))
+	if apagar:
+		texto = _padrao_caracteres(apagar).sub('', texto)
+	if sentinela is not None:
+		texto = texto.replace(sentinela, '-')
 
-	tokens_norm = []
-	for tok in raw_tokens:
-		if not tok:
-			continue
-		t = normalizar_token(tok)
-		if not t or len(t) < 2:
-			continue
-		if t in stopwords:
-			continue
-		tokens_norm.append(t)
+	for t in texto.lower().split():
+		t = analisador.termo_limpo(t)
+		if t:
+			yield t
 
-	# Escreve arquivo de saída
-	with open(caminho_saida, 'w', encoding='utf-8') as f:
-		f.write(' '.join(tokens_norm))
+#----------------------------------------------------------------------------------------#
+def normalizar_arquivo(caminho_entrada: str, caminho_saida: str, analisador: Analisador) -> List[Tuple[str, int, array]]:
+	with open(caminho_entrada, 'r', encoding='utf-8') as f:
+		texto = f.read()
+	return normalizar_texto(texto, analisador, caminho_saida)
+
+#----------------------------------------------------------------------------------------#
+def normalizar_texto(texto: str, analisador: Analisador, caminho_saida: str = None) -> List[Tuple[str, int, array]]:
+	# (termo, frequência, posições) em ordem de frequência decrescente, como most_common. A
+	# posição é o índice do termo na sequência normalizada (a do _termos.txt), de modo que
+	# as stopwords removidas não separam os termos de uma frase.
+	tokens_norm = list(tokenizar(texto, analisador))
+
+	# Escreve arquivo de saída (opcional quando o texto não vem de um arquivo)
+	if caminho_saida is not None:
+		with open(caminho_saida, 'w', encoding='utf-8') as f:
+			f.write(' '.join(tokens_norm))
 
-	return Counter(tokens_norm)
+	return termos_posicionais(tokens_norm)
 
 #----------------------------------------------------------------------------------------#
-def processar_pasta_results(apenas_novos: List[str] = None):
+def _normalizar_em_processo(caminho_entrada: str, caminho_saida: str,
+							etapas: Tuple[str, ...]) -> Tuple[str, array, array]:
+	# Normaliza um resumo (também nos processos trabalhadores). Devolve os termos numa única
+	# string separada por '\n', em ordem de frequência decrescente (como most_common), as
+	# frequências num array('I') e as posições de todos os termos, na mesma ordem, num único
+	# array('I'): os três vão pelo pickle como blocos contíguos
+	termos = normalizar_arquivo(caminho_entrada, caminho_saida, obter_analisador(etapas))
+	posicoes = array('I')
+	for _, _, lista in termos:
+		posicoes.extend(lista)
+	return '\n'.join(t for t, _, _ in termos), array('I', (c for _, c, _ in termos)), posicoes
+
+#----------------------------------------------------------------------------------------#
+def _documentos_normalizados(tarefas: List[Tuple[str, str, str, str]], analisador: Analisador,
+							 trabalhadores: int, progresso: Callable[[int, int], None] = None
+							 ) -> Iterator[Tuple[str, List[Tuple[str, int, array]]]]:
+	# Normaliza as tarefas (nome do resumo, caminho do resumo, caminho de saída, nome do PDF) e
+	# gera (nome do PDF, [(termo, freq, posições), ...]) na ordem das tarefas, um documento por vez. Com
+	# trabalhadores > 1 os resumos são distribuídos entre processos, com no máximo
+	# PENDENTES_POR_TRABALHADOR tarefas em andamento por processo.
+	# `progresso(feitos, total)` é chamado a cada resumo concluído (inclusive os que falharam).
+	paralelo = trabalhadores > 1 and len(tarefas) > 1
+	executor = ProcessPoolExecutor(max_workers=trabalhadores) if paralelo else None
+	limite = trabalhadores * PENDENTES_POR_TRABALHADOR if paralelo else 1
+	pendentes = deque()
+	proximas = iter(tarefas)
+	feitos = 0
+	if progresso is not None:
+		progresso(feitos, len(tarefas))
+	try:
+		while True:
+			for tarefa in proximas:
+				futuro = executor.submit(_normalizar_em_processo, tarefa[1], tarefa[2], analisador.etapas) if paralelo else None
+				pendentes.append((tarefa, futuro))
+				if len(pendentes) >= limite:
+					break
+			if not pendentes:
+				break
+
+			(nome, caminho, caminho_saida, pdf_nome), futuro = pendentes.popleft()
+			try:
+				if futuro is not None:
+					termos, freqs, posicoes = futuro.result()
+				else:
+					termos, freqs, posicoes = _normalizar_em_processo(caminho, caminho_saida, analisador.etapas)
+			except Exception as e:
+				print(f"Erro ao normalizar {nome}: {e}")
+				termos = None
+			feitos += 1
+			if progresso is not None:
+				progresso(feitos, len(tarefas))
+			if termos is None:
+				continue
+			pares = []
+			inicio = 0
+			for termo, freq in zip(termos.split('\n') if termos else (), freqs):
+				pares.append((termo, freq, posicoes[inicio:inicio + freq]))
+				inicio += freq
+			print(f"Arquivo normalizado e adicionado ao índice: {nome} (termos únicos: {len(pares)})")
+			yield pdf_nome, pares
+	finally:
+		if executor is not None:
+			executor.shutdown(cancel_futures=True)
+
+#----------------------------------------------------------------------------------------#
+def gravando_json(documentos: Iterator[Tuple[str, List]], caminho: str) -> Iterator[Tuple[str, List]]:
+	# Repassa os documentos gravando cada um no JSON assim que chega, com o mesmo conteúdo de
+	# json.dump(..., indent=2); as posições dos termos vão só para o índice. O arquivo só
+	# substitui o anterior depois do último documento, antes de o índice ser finalizado (o
+	# JSON não pode ficar mais novo que os segmentos).
+	tmp = caminho + '.tmp'
+	try:
+		with open(tmp, 'w', encoding='utf-8') as jf:
+			jf.write('{')
+			separador = '\n'
+			for pdf_nome, pares in documentos:
+				entrada = json.dumps({pdf_nome: [par[:2] for par in pares]}, ensure_ascii=False, indent=2)
+				jf.write(separador + entrada[2:-2])
+				separador = ',\n'
+				yield pdf_nome, pares
+			jf.write('}' if separador == '\n' else '\n}')
+	except BaseException:
+		# Interrompido (erro ou cancelamento): o JSON anterior continua valendo
+		os.remove(tmp)
+		raise
+	os.replace(tmp, caminho)
+
+#----------------------------------------------------------------------------------------#
+def processar_pasta_results(apenas_novos: List[str] = None, removidos: List[str] = None,
+							trabalhadores: int = 1, pasta_results: str = None,
+							memoria_maxima: int = MEMORIA_INDEXACAO,
+							progresso: Callable[[int, int], None] = None,
+							pasta_resumos: str = None) -> List[str]:
+	# Sem argumentos: normaliza todos os resumos, grava o JSON e recria o índice com um único segmento.
+	# Incremental (lote): apenas_novos são resumos (_resumo.txt) a (re)normalizar e removidos são
+	# PDFs que saem do índice, junto com seus arquivos _termos.txt. O lote vira um segmento novo
+	# e o JSON, que só é regravado no processamento completo, não é tocado.
+	# Os documentos seguem direto para o JSON e para o índice à medida que são normalizados:
+	# só as postings do segmento em construção ficam em memória, e acima de `memoria_maxima`
+	# (bytes) elas vão para índices parciais em disco.
+	# `progresso(feitos, total)` acompanha os resumos normalizados; uma exceção lançada por ele
+	# interrompe o processamento sem alterar o índice nem o JSON.
+	# `pasta_resumos` substitui results/resumo como origem dos resumos (lotes gravados à parte).
+	# Retorna os PDFs normalizados.
 	src_dir = os.path.dirname(__file__)
 	raiz = os.path.abspath(os.path.join(src_dir, '..'))
-	pasta_results = os.path.join(raiz, 'results')
-	pasta_resumos = os.path.join(pasta_results, 'resumo')
+	pasta_results = pasta_results or os.path.join(raiz, 'results')
+	pasta_resumos = pasta_resumos or os.path.join(pasta_results, 'resumo')
 	pasta_normalizado = os.path.join(pasta_results, 'normalizado')
-	caminho_stop = os.path.join(raiz, 'stopwords.txt')
-
-	stopwords = carregar_stopwords(caminho_stop)
 	os.makedirs(pasta_normalizado, exist_ok=True)
 
-	# Carrega o JSON existente se estivermos atualizando
 	freq_json_path = os.path.join(pasta_results, 'frequencies_summary.json')
-	dados_simples = {}
-	if apenas_novos and os.path.exists(freq_json_path):
-		try:
-			with open(freq_json_path, 'r', encoding='utf-8') as jf:
-				dados_simples = json.load(jf)
-		except (json.JSONDecodeError, FileNotFoundError):
-			print("Arquivo frequencies_summary.json não encontrado ou corrompido. Criando um novo.")
-			dados_simples = {}
+	incremental = apenas_novos is not None or removidos is not None
+	conjunto = ConjuntoSegmentos(pasta_segmentos(freq_json_path), memoria_maxima)
+	if incremental:
+		# Garante o conjunto de segmentos antes do lote (criado a partir do JSON, se preciso).
+		# O lote é analisado com as mesmas etapas do índice existente.
+		preparar_segmentos(freq_json_path)
+		configuracao = conjunto.analisador()
+		analisador = obter_analisador(configuracao['etapas'] if configuracao else ETAPAS_LEGADO)
+	else:
+		analisador = obter_analisador(ETAPAS_PADRAO)
 
-	arquivos_a_processar = apenas_novos if apenas_novos else os.listdir(pasta_resumos)
+	pdfs_removidos = []
+	for pdf_nome in removidos or []:
+		base_nome = os.path.splitext(pdf_nome)[0]
+		pdfs_removidos.append(f"{base_nome}.pdf")
+		caminho_termos = os.path.join(pasta_normalizado, f"{base_nome}_termos.txt")
+		if os.path.exists(caminho_termos):
+			os.remove(caminho_termos)
+		print(f"Documento removido do índice: {pdf_nome}")
 
+	if incremental:
+		arquivos_a_processar = apenas_novos or []
+	else:
+		arquivos_a_processar = os.listdir(pasta_resumos)
+
+	tarefas = []
 	for nome in arquivos_a_processar:
 		if not nome.lower().endswith('.txt'):
 			continue
@@ -123,23 +378,20 @@ def processar_pasta_results(apenas_novos: List[str] = None):
 
 		caminho = os.path.join(pasta_resumos, nome)
 		caminho_saida = os.path.join(pasta_normalizado, saida_nome)
+		tarefas.append((nome, caminho, caminho_saida, f"{base_nome}.pdf"))
 
-		try:
-			freqs = normalizar_arquivo(caminho, caminho_saida, stopwords) # freqs é um Counter
-			
-			pdf_nome = f"{base_nome}.pdf"
-			freq_list = [[t, c] for t, c in freqs.most_common()]
-			dados_simples[pdf_nome] = freq_list
-
-			print(f"Arquivo normalizado e adicionado ao índice: {nome} (termos únicos: {len(freqs)})")
-		except Exception as e:
-			print(f"Erro ao normalizar {nome}: {e}")
-
-	# Escreve o JSON simples
-	with open(freq_json_path, 'w', encoding='utf-8') as jf:
-		json.dump(dados_simples, jf, ensure_ascii=False, indent=2)
+	documentos = _documentos_normalizados(tarefas, analisador, trabalhadores, progresso)
+	if incremental:
+		# O lote vira um segmento novo; versões antigas e removidos viram lápides
+		normalizados = conjunto.adicionar_lote(documentos, pdfs_removidos)
+		print(f'Normalização concluída.\n\nSegmento gravado em: {conjunto.pasta}')
+		return normalizados
 
-	print(f'Normalização concluída.\n\nSalvo em: {freq_json_path}')
+	# Escreve o JSON simples e gera o índice consultado pelos modelos, registrando as etapas
+	# de análise usadas
+	normalizados = conjunto.recriar(gravando_json(documentos, freq_json_path), analisador.configuracao)
+	print(f'Normalização concluída.\n\nSalvo em: {freq_json_path}\nÍndice: {conjunto.pasta}')
+	return normalizados
 
 #----------------------------------------------------------------------------------------#
 if __name__ == '__main__':
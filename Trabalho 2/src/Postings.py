@@ -0,0 +1,289 @@
+from array import array
+from bisect import bisect_left
+
+# Operações sobre listas de postings representadas como array('I') de DocIDs
+# inteiros, densos e em ordem crescente (também usadas nos blocos array('H') dos
+# mapas de bits). Todas produzem arrays ordenados do mesmo tipo da entrada.
+
+#----------------------------------------------------------------------------------------#
+def intersecao(a: array, b: array) -> array:
+    # AND: merge linear quando as listas têm tamanhos parecidos; galopante quando uma é
+    # muito menor, de modo que o custo acompanha a lista menor
+    if len(a) > len(b):
+        a, b = b, a
+    if not a:
+        return array(a.typecode)
+    if len(b) > 8 * len(a):
+        return _intersecao_galopante(a, b)
+
+    resultado = array(a.typecode)
+    i = j = 0
+    na, nb = len(a), len(b)
+    while i < na and j < nb:
+        x, y = a[i], b[j]
+        if x == y:
+            resultado.append(x)
+            i += 1
+            j += 1
+        elif x < y:
+            i += 1
+        else:
+            j += 1
+    return resultado
+
+#----------------------------------------------------------------------------------------#
+def _intersecao_galopante(menor: array, maior: array) -> array:
+    # Para cada DocID da lista menor, avança na maior com passos dobrados e termina
+    # com busca binária na janela encontrada
+    resultado = array(menor.typecode)
+    n = len(maior)
+    lo = 0
+    for x in menor:
+        limite = lo
+        passo = 1
+        while limite < n and maior[limite] < x:
+            lo = limite + 1
+            limite = lo + passo
+            passo <<= 1
+        lo = bisect_left(maior, x, lo, min(limite + 1, n))
+        if lo >= n:
+            break
+        if maior[lo] == x:
+            resultado.append(x)
+    return resultado
+
+#----------------------------------------------------------------------------------------#
+def uniao(a: array, b: array) -> array:
+    # OR: merge linear das duas listas
+    if not a:
+        return array(b.typecode, b)
+    if not b:
+        return array(a.typecode, a)
+    resultado = array(a.typecode)
+    i = j = 0
+    na, nb = len(a), len(b)
+    while i < na and j < nb:
+        x, y = a[i], b[j]
+        if x == y:
+            resultado.append(x)
+            i += 1
+            j += 1
+        elif x < y:
+            resultado.append(x)
+            i += 1
+        else:
+            resultado.append(y)
+            j += 1
+    resultado.extend(a[i:])
+    resultado.extend(b[j:])
+    return resultado
+
+#----------------------------------------------------------------------------------------#
+def diferenca(a: array, b: array) -> array:
+    # AND NOT: elementos de `a` que não estão em `b`
+    if not a or not b:
+        return array(a.typecode, a)
+    resultado = array(a.typecode)
+    i = j = 0
+    na, nb = len(a), len(b)
+    while i < na:
+        x = a[i]
+        while j < nb and b[j] < x:
+            j += 1
+        if j >= nb:
+            resultado.extend(a[i:])
+            break
+        if b[j] != x:
+            resultado.append(x)
+        i += 1
+    return resultado
+
+#----------------------------------------------------------------------------------------#
+def complemento(a: array, total_docs: int) -> array:
+    # NOT: todos os DocIDs em [0, total_docs) ausentes de `a`, gerados por faixas
+    resultado = array('I')
+    proximo = 0
+    for x in a:
+        resultado.extend(range(proximo, x))
+        proximo = x + 1
+    resultado.extend(range(proximo, total_docs))
+    return resultado
+
+
+# Backends de postings para o modelo booleano. Listas esparsas ficam como arrays
+# ordenados (ListaOrdenada); listas densas viram mapas de bits comprimidos no estilo
+# Roaring (MapaDeBits): o espaço de DocIDs é dividido em blocos de 2^16 e cada bloco
+# guarda um array('H') quando tem até 4096 documentos ou um bitmap (int) quando tem mais.
+BITS_BLOCO = 16
+TAMANHO_BLOCO = 1 << BITS_BLOCO
+MAX_ARRAY_BLOCO = 4096
+DENSIDADE_BITMAP = 1 / 32  # a partir daqui o bitmap ocupa menos que 4 bytes por posting
+
+_BITS_DO_BYTE = [tuple(b for b in range(8) if v >> b & 1) for v in range(256)]
+
+#----------------------------------------------------------------------------------------#
+def _bits_do_bloco(bloco) -> int:
+    # Bloco (array ou bitmap) como bitmap int
+    if isinstance(bloco, int):
+        return bloco
+    buffer = bytearray(TAMANHO_BLOCO // 8)
+    for x in bloco:
+        buffer[x >> 3] |= 1 << (x & 7)
+    return int.from_bytes(buffer, 'little')
+
+#----------------------------------------------------------------------------------------#
+def _posicoes_do_bloco(bloco) -> array:
+    # Bloco (array ou bitmap) como array('H') ordenado
+    if not isinstance(bloco, int):
+        return bloco
+    posicoes = array('H')
+    for i, byte in enumerate(bloco.to_bytes(TAMANHO_BLOCO // 8, 'little')):
+        if byte:
+            base = i << 3
+            posicoes.extend(base + b for b in _BITS_DO_BYTE[byte])
+    return posicoes
+
+#----------------------------------------------------------------------------------------#
+def _compactar_bloco(bits: int):
+    # Escolhe a representação do bloco pela cardinalidade; None se vazio
+    cardinalidade = bin(bits).count('1')
+    if cardinalidade == 0:
+        return None
+    if cardinalidade > MAX_ARRAY_BLOCO:
+        return bits
+    return _posicoes_do_bloco(bits)
+
+
+class ListaOrdenada:
+    # Postings esparsas: array('I') de DocIDs em ordem crescente
+    def __init__(self, docs: array):
+        self.docs = docs
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def __iter__(self):
+        return iter(self.docs)
+
+    def __contains__(self, doc: int) -> bool:
+        i = bisect_left(self.docs, doc)
+        return i < len(self.docs) and self.docs[i] == doc
+
+    def e(self, outro):
+        if isinstance(outro, ListaOrdenada):
+            return ListaOrdenada(intersecao(self.docs, outro.docs))
+        return ListaOrdenada(array('I', (d for d in self.docs if d in outro)))
+
+    def ou(self, outro):
+        if isinstance(outro, ListaOrdenada):
+            return ListaOrdenada(uniao(self.docs, outro.docs))
+        return outro.ou(self)
+
+    def menos(self, outro):
+        if isinstance(outro, ListaOrdenada):
+            return ListaOrdenada(diferenca(self.docs, outro.docs))
+        return ListaOrdenada(array('I', (d for d in self.docs if d not in outro)))
+
+    def complemento(self, total_docs: int):
+        return ListaOrdenada(complemento(self.docs, total_docs))
+
+
+class MapaDeBits:
+    # Postings densas: bloco (DocID >> 16) -> array('H') ou bitmap int dos 16 bits baixos
+    def __init__(self, blocos: dict = None):
+        self.blocos = blocos or {}
+
+    @classmethod
+    def de_docs(cls, docs) -> 'MapaDeBits':
+        agrupados = {}
+        for d in docs:
+            chave = d >> BITS_BLOCO
+            bloco = agrupados.get(chave)
+            if bloco is None:
+                bloco = agrupados[chave] = array('H')
+            bloco.append(d & (TAMANHO_BLOCO - 1))
+        blocos = {}
+        for chave, posicoes in agrupados.items():
+            blocos[chave] = _bits_do_bloco(posicoes) if len(posicoes) > MAX_ARRAY_BLOCO else posicoes
+        return cls(blocos)
+
+    @classmethod
+    def de_postings(cls, postings) -> 'MapaDeBits':
+        return postings if isinstance(postings, MapaDeBits) else cls.de_docs(postings)
+
+    def __len__(self) -> int:
+        return sum(bin(b).count('1') if isinstance(b, int) else len(b) for b in self.blocos.values())
+
+    def __iter__(self):
+        for chave in sorted(self.blocos):
+            base = chave << BITS_BLOCO
+            for x in _posicoes_do_bloco(self.blocos[chave]):
+                yield base + x
+
+    def __contains__(self, doc: int) -> bool:
+        bloco = self.blocos.get(doc >> BITS_BLOCO)
+        if bloco is None:
+            return False
+        x = doc & (TAMANHO_BLOCO - 1)
+        if isinstance(bloco, int):
+            return bool(bloco >> x & 1)
+        i = bisect_left(bloco, x)
+        return i < len(bloco) and bloco[i] == x
+
+    def _combinar(self, outro: 'MapaDeBits', chaves, op_bits, op_arrays) -> 'MapaDeBits':
+        # Combina bloco a bloco: dois arrays usam o algoritmo de listas ordenadas,
+        # qualquer outro caso usa operações de bits sobre o bloco inteiro
+        blocos = {}
+        for chave in chaves:
+            a = self.blocos.get(chave, array('H'))
+            b = outro.blocos.get(chave, array('H'))
+            if isinstance(a, int) or isinstance(b, int):
+                bloco = _compactar_bloco(op_bits(_bits_do_bloco(a), _bits_do_bloco(b)))
+            else:
+                posicoes = op_arrays(a, b)
+                if len(posicoes) > MAX_ARRAY_BLOCO:
+                    bloco = _bits_do_bloco(posicoes)
+                else:
+                    bloco = array('H', posicoes) if posicoes else None
+            if bloco is not None:
+                blocos[chave] = bloco
+        return MapaDeBits(blocos)
+
+    def e(self, outro):
+        if isinstance(outro, ListaOrdenada):
+            return outro.e(self)
+        chaves = self.blocos.keys() & outro.blocos.keys()
+        return self._combinar(outro, chaves, lambda a, b: a & b, intersecao)
+
+    def ou(self, outro):
+        outro = MapaDeBits.de_postings(outro)
+        chaves = self.blocos.keys() | outro.blocos.keys()
+        return self._combinar(outro, chaves, lambda a, b: a | b, uniao)
+
+    def menos(self, outro):
+        outro = MapaDeBits.de_postings(outro)
+        return self._combinar(outro, self.blocos.keys(), lambda a, b: a & ~b, diferenca)
+
+    def complemento(self, total_docs: int) -> 'MapaDeBits':
+        # NOT bloco a bloco: inverte os bits e corta no último DocID válido
+        blocos = {}
+        num_blocos = (total_docs + TAMANHO_BLOCO - 1) >> BITS_BLOCO
+        for chave in range(num_blocos):
+            tamanho = min(TAMANHO_BLOCO, total_docs - (chave << BITS_BLOCO))
+            mascara = (1 << tamanho) - 1
+            bloco = self.blocos.get(chave)
+            bits = ~_bits_do_bloco(bloco) & mascara if bloco is not None else mascara
+            bloco = _compactar_bloco(bits)
+            if bloco is not None:
+                blocos[chave] = bloco
+        return MapaDeBits(blocos)
+
+#----------------------------------------------------------------------------------------#
+def criar_postings(docs: array, total_docs: int, backend: str = 'auto'):
+    # Escolhe a representação da lista de postings de um termo.
+    # 'auto' usa bitmap só quando a densidade do termo compensa.
+    if backend == 'lista':
+        return ListaOrdenada(docs)
+    if backend == 'bitmap' or (backend == 'auto' and total_docs and len(docs) >= total_docs * DENSIDADE_BITMAP):
+        return MapaDeBits.de_docs(docs)
+    return ListaOrdenada(docs)
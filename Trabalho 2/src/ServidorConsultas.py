@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from ModeloBooleano import ModeloBooleano
+from ModeloEspacoVetorial import ModeloEspacoVetorial, PONTUADORES, K1_PADRAO, B_PADRAO, criar_pontuador
+from IndiceInvertido import caminho_json_padrao
+from IndiceSegmentado import abrir_indice, pasta_segmentos, NOME_LISTA_SEGMENTOS
+from CacheConsultas import CacheResultados
+
+# Servidor HTTP/JSON de consultas (asyncio, só biblioteca padrão). O índice é aberto uma vez
+# e fica em memória entre as requisições; cada recarga abre uma geração nova (índice e os
+# dois modelos) fora do laço de eventos e a troca pela antiga é uma única atribuição.
+#   GET  /busca/booleana?q=...            {"consulta", "documentos", "total", "geracao", "tempo_ms"}
+#   GET  /busca/vetorial?q=...&limite=10  {"consulta", "resultados": [{"documento", "similaridade"}], ...}
+#   POST nas mesmas rotas com corpo JSON {"q": ..., "limite": ...}
+#   GET  /estado                          documentos, geração e estatísticas do cache
+#   POST /recarregar                      reabre o índice (também feito ao detectar re-indexação)
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8080
+INTERVALO_VERIFICACAO = 2.0   # segundos entre verificações da lista de segmentos
+LIMITE_PADRAO = 10
+LIMITE_MAXIMO = 1000
+TAMANHO_MAXIMO_CORPO = 1 << 20
+MOTIVOS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class RequisicaoInvalida(Exception):
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+#----------------------------------------------------------------------------------------#
+def assinatura_indice(freq_json_path: str) -> Tuple:
+    # Muda quando o índice em disco é regravado: lote novo, mesclagem ou reconstrução
+    assinatura = []
+    for caminho in (os.path.join(pasta_segmentos(freq_json_path), NOME_LISTA_SEGMENTOS), freq_json_path):
+        try:
+            estado = os.stat(caminho)
+            assinatura.append((estado.st_mtime_ns, estado.st_size))
+        except OSError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+
+class Geracao:
+    # Índice aberto com os dois modelos sobre ele; substituída inteira a cada recarga
+    def __init__(self, numero: int, freq_json_path: str, pontuador=None):
+        self.numero = numero
+        self.assinatura = assinatura_indice(freq_json_path)  # antes de abrir: nada se perde
+        self.indice = abrir_indice(freq_json_path)
+        self.cache_resultados = CacheResultados()
+        self.booleano = ModeloBooleano(self.indice, cache_resultados=self.cache_resultados)
+        self.vetorial = ModeloEspacoVetorial(self.indice, cache_resultados=self.cache_resultados,
+                                             pontuador=pontuador)
+        self.carregada_em = time.time()
+
+
+class ServidorConsultas:
+    def __init__(self, freq_json_path: str = None, intervalo: float = INTERVALO_VERIFICACAO, pontuador=None):
+        self.freq_json_path = freq_json_path or caminho_json_padrao()
+        self.intervalo = intervalo
+        self.pontuador = pontuador  # ranking da busca vetorial (None: cosseno)
+        self.geracao: Optional[Geracao] = None
+        self.endereco: Optional[Tuple[str, int]] = None  # (host, porta) em que servir escuta
+        # As consultas rodam numa única thread, em ordem de chegada: os modelos e os caches de
+        # postings não são thread-safe. O laço de eventos segue aceitando e lendo conexões.
+        self.executor_consultas = ThreadPoolExecutor(1, thread_name_prefix='consultas')
+        self.executor_recarga = ThreadPoolExecutor(1, thread_name_prefix='recarga')
+        self.trava_recarga: Optional[asyncio.Lock] = None
+
+    #----------------------------------------------------------------------------------------#
+    async def recarregar(self) -> Geracao:
+        # Abre a geração nova em outra thread enquanto a atual continua respondendo. O índice
+        # antigo é fechado na thread das consultas, depois das que já estavam na fila.
+        async with self.trava_recarga:
+            loop = asyncio.get_running_loop()
+            numero = self.geracao.numero + 1 if self.geracao is not None else 1
+            nova = await loop.run_in_executor(self.executor_recarga, Geracao, numero, self.freq_json_path,
+                                              self.pontuador)
+            antiga, self.geracao = self.geracao, nova
+            if antiga is not None:
+                loop.run_in_executor(self.executor_consultas, antiga.indice.fechar)
+            print(f"Geração {nova.numero} carregada: {nova.indice.num_docs_ativos} documentos", flush=True)
+            return nova
+
+    #----------------------------------------------------------------------------------------#
+    async def vigiar(self):
+        # Recarrega quando a lista de segmentos (ou o JSON) muda em disco
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                if self.geracao is None or assinatura_indice(self.freq_json_path) != self.geracao.assinatura:
+                    await self.recarregar()
+            except Exception as e:
+                print(f"Erro ao recarregar o índice: {e}", flush=True)
+
+    #----------------------------------------------------------------------------------------#
+    async def atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        # Uma conexão, com várias requisições em sequência (keep-alive)
+        try:
+            while True:
+                try:
+                    requisicao = await ler_requisicao(leitor)
+                    if requisicao is None:
+                        break
+                    metodo, alvo, versao_http, cabecalhos, corpo = requisicao
+                    status, resposta = await self.responder(metodo, alvo, corpo)
+                    conexao = cabecalhos.get('connection', '').lower()
+                    manter = conexao == 'keep-alive' if versao_http == 'HTTP/1.0' else conexao != 'close'
+                except RequisicaoInvalida as e:
+                    status, resposta, manter = e.status, {'erro': str(e)}, False
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    status, resposta, manter = 500, {'erro': f"Erro inesperado: {e}"}, False
+                escrever_resposta(escritor, status, resposta, manter)
+                await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    #----------------------------------------------------------------------------------------#
+    async def responder(self, metodo: str, alvo: str, corpo: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(alvo)
+        rota = url.path.rstrip('/') or '/'
+        parametros = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+        if metodo == 'POST' and corpo:
+            try:
+                dados = json.loads(corpo)
+            except ValueError:
+                raise RequisicaoInvalida(400, "Corpo da requisição não é JSON válido")
+            if not isinstance(dados, dict):
+                raise RequisicaoInvalida(400, "Corpo da requisição deve ser um objeto JSON")
+            parametros.update(dados)
+
+        if rota == '/estado':
+            self._exigir_metodo(metodo, ('GET',))
+            return 200, self.estado()
+        if rota == '/recarregar':
+            self._exigir_metodo(metodo, ('POST',))
+            geracao = await self.recarregar()
+            return 200, {'geracao': geracao.numero, 'documentos': geracao.indice.num_docs_ativos}
+        if rota in ('/busca/booleana', '/busca/vetorial'):
+            self._exigir_metodo(metodo, ('GET', 'POST'))
+            return await self.buscar(rota.rsplit('/', 1)[1], parametros)
+        return 404, {'erro': f"Rota desconhecida: {url.path}"}
+
+    #----------------------------------------------------------------------------------------#
+    def _exigir_metodo(self, metodo: str, permitidos: Tuple[str, ...]):
+        if metodo not in permitidos:
+            raise RequisicaoInvalida(405, f"Método {metodo} não permitido")
+
+    #----------------------------------------------------------------------------------------#
+    async def buscar(self, modelo: str, parametros: Dict) -> Tuple[int, Dict]:
+        consulta = parametros.get('q', parametros.get('consulta'))
+        if not isinstance(consulta, str) or not consulta.strip():
+            raise RequisicaoInvalida(400, "Parâmetro 'q' (consulta) ausente")
+        try:
+            limite = int(parametros.get('limite', LIMITE_PADRAO))
+        except (TypeError, ValueError):
+            raise RequisicaoInvalida(400, "Parâmetro 'limite' deve ser inteiro")
+        limite = max(0, min(limite, LIMITE_MAXIMO))
+
+        geracao = self.geracao  # a consulta inteira usa a geração vigente na chegada
+        if geracao is None:
+            return 503, {'erro': "Índice ainda não carregado"}
+        loop = asyncio.get_running_loop()
+        inicio = time.perf_counter()
+        try:
+            if modelo == 'booleana':
+                documentos = await loop.run_in_executor(self.executor_consultas, geracao.booleano.processar_consulta, consulta)
+                resposta = {'consulta': consulta, 'documentos': documentos, 'total': len(documentos)}
+            else:
+                resultados = await loop.run_in_executor(self.executor_consultas, geracao.vetorial.buscar, consulta, limite)
+                resposta = {'consulta': consulta,
+                            'resultados': [{'documento': d, 'similaridade': s} for d, s in resultados]}
+        except ValueError as e:
+            raise RequisicaoInvalida(400, f"Erro na consulta: {e}")
+        resposta['geracao'] = geracao.numero
+        resposta['tempo_ms'] = (time.perf_counter() - inicio) * 1000
+        return 200, resposta
+
+    #----------------------------------------------------------------------------------------#
+    def estado(self) -> Dict:
+        geracao = self.geracao
+        if geracao is None:
+            return {'carregado': False}
+        return {
+            'carregado': True,
+            'geracao': geracao.numero,
+            'documentos': geracao.indice.num_docs_ativos,
+            'carregada_em': geracao.carregada_em,
+            'cache': geracao.cache_resultados.estatisticas(),
+        }
+
+    #----------------------------------------------------------------------------------------#
+    async def servir(self, host: str = HOST_PADRAO, porta: int = PORTA_PADRAO):
+        self.trava_recarga = asyncio.Lock()
+        await self.recarregar()
+        servidor = await asyncio.start_server(self.atender, host, porta)
+        self.endereco = servidor.sockets[0].getsockname()[:2]
+        print(f"Servindo consultas em http://{self.endereco[0]}:{self.endereco[1]}", flush=True)
+        vigia = asyncio.create_task(self.vigiar())
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            vigia.cancel()
+            if self.geracao is not None:
+                self.geracao.indice.fechar()
+
+
+#----------------------------------------------------------------------------------------#
+async def ler_requisicao(leitor: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+    # Linha de requisição, cabeçalhos e corpo (Content-Length); None se a conexão fechou
+    linha = await leitor.readline()
+    if not linha.strip():
+        return None
+    partes = linha.decode('latin-1').split()
+    if len(partes) != 3:
+        raise RequisicaoInvalida(400, "Linha de requisição malformada")
+    metodo, alvo, versao_http = partes
+    cabecalhos: Dict[str, str] = {}
+    while True:
+        linha = await leitor.readline()
+        if not linha:
+            raise asyncio.IncompleteReadError(linha, None)
+        if linha in (b'\r\n', b'\n'):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    try:
+        tamanho = int(cabecalhos.get('content-length', 0))
+    except ValueError:
+        raise RequisicaoInvalida(400, "Content-Length inválido")
+    if tamanho > TAMANHO_MAXIMO_CORPO:
+        raise RequisicaoInvalida(413, "Corpo da requisição muito grande")
+    corpo = await leitor.readexactly(tamanho) if tamanho > 0 else b''
+    return metodo.upper(), alvo, versao_http.upper(), cabecalhos, corpo
+
+#----------------------------------------------------------------------------------------#
+def escrever_resposta(escritor: asyncio.StreamWriter, status: int, resposta: Dict, manter: bool):
+    corpo = json.dumps(resposta, ensure_ascii=False).encode('utf-8')
+    cabecalho = (f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}\r\n"
+                 f"Content-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(corpo)}\r\n"
+                 f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n")
+    escritor.write(cabecalho.encode('latin-1') + corpo)
+
+#----------------------------------------------------------------------------------------#
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON de consultas booleanas e vetoriais.")
+    parser.add_argument("--host", default=HOST_PADRAO)
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help="0 escolhe uma porta livre.")
+    parser.add_argument("--json", default=None, help="frequencies_summary.json do índice (padrão: results/).")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_VERIFICACAO,
+                        help="Segundos entre verificações de re-indexação.")
+    parser.add_argument("--pontuacao", choices=sorted(PONTUADORES), default='cosseno',
+                        help="Ranking da busca vetorial: cosseno (TF-IDF) ou bm25.")
+    parser.add_argument("--k1", type=float, default=K1_PADRAO, help="Saturação da frequência no BM25.")
+    parser.add_argument("--b", type=float, default=B_PADRAO, help="Normalização pelo comprimento no BM25 (0 a 1).")
+    args = parser.parse_args()
+    try:
+        pontuador = criar_pontuador(args.pontuacao, args.k1, args.b)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        asyncio.run(ServidorConsultas(args.json, args.intervalo, pontuador).servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        print("Servidor encerrado.")
+
+#----------------------------------------------------------------------------------------#
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class Cancelado(Exception):
+    pass
+
+
+class TarefaIndexacao:
+    # Executa uma indexação (extração, normalização, gravação do índice) numa thread
+    # separada, para que a interface continue respondendo e o índice atual continue
+    # atendendo consultas até o novo ficar pronto. A função recebe a própria tarefa e
+    # anuncia cada etapa com `etapa(nome)`, que devolve o callback progresso(feitos, total)
+    # esperado por ExtratorDeResumos e processar_pasta_results. O cancelamento é
+    # cooperativo: a próxima chamada de progresso lança Cancelado.
+    def __init__(self, funcao: Callable[['TarefaIndexacao'], Any]):
+        self.funcao = funcao
+        self.cancelamento = threading.Event()
+        self.trava = threading.Lock()
+        self.nome_etapa = ''
+        self.feitos = 0
+        self.total = 0
+        self.inicio_etapa = time.monotonic()
+        self.resultado = None
+        self.erro: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self._executar, name='indexacao', daemon=True)
+
+    #----------------------------------------------------------------------------------------#
+    def iniciar(self) -> 'TarefaIndexacao':
+        self.thread.start()
+        return self
+
+    #----------------------------------------------------------------------------------------#
+    def _executar(self):
+        try:
+            self.resultado = self.funcao(self)
+        except BaseException as e:
+            self.erro = e
+
+    #----------------------------------------------------------------------------------------#
+    def etapa(self, nome: str) -> Callable[[int, int], None]:
+        with self.trava:
+            self.nome_etapa = nome
+            self.feitos = 0
+            self.total = 0
+            self.inicio_etapa = time.monotonic()
+        self.verificar()
+        return self.progresso
+
+    #----------------------------------------------------------------------------------------#
+    def progresso(self, feitos: int, total: int):
+        with self.trava:
+            self.feitos = feitos
+            self.total = total
+        self.verificar()
+
+    #----------------------------------------------------------------------------------------#
+    def verificar(self):
+        if self.cancelamento.is_set():
+            raise Cancelado()
+
+    #----------------------------------------------------------------------------------------#
+    def cancelar(self):
+        self.cancelamento.set()
+
+    #----------------------------------------------------------------------------------------#
+    @property
+    def cancelada(self) -> bool:
+        return self.cancelamento.is_set()
+
+    #----------------------------------------------------------------------------------------#
+    @property
+    def concluida(self) -> bool:
+        return self.thread.ident is not None and not self.thread.is_alive()
+
+    #----------------------------------------------------------------------------------------#
+    def aguardar(self, timeout: float = None) -> bool:
+        self.thread.join(timeout)
+        return self.concluida
+
+    #----------------------------------------------------------------------------------------#
+    def situacao(self) -> Dict[str, Any]:
+        # Etapa atual, arquivos concluídos, ritmo (arquivos/s) e tempo restante estimado
+        # (None enquanto não há ritmo medido)
+        with self.trava:
+            etapa, feitos, total, inicio = self.nome_etapa, self.feitos, self.total, self.inicio_etapa
+        decorrido = time.monotonic() - inicio
+        por_segundo = feitos / decorrido if feitos and decorrido > 0 else 0.0
+        restante = (total - feitos) / por_segundo if por_segundo else None
+        return {'etapa': etapa, 'feitos': feitos, 'total': total,
+                'arquivos_por_segundo': por_segundo, 'restante_s': restante}
+
+#----------------------------------------------------------------------------------------#
+def formatar_situacao(situacao: Dict[str, Any]) -> str:
+    # "Extração: 12/40 arquivos · 3.1 arquivos/s · restam ~9s"
+    texto = f"{situacao['etapa']}: {situacao['feitos']}/{situacao['total']} arquivos"
+    if situacao['arquivos_por_segundo']:
+        texto += f" · {situacao['arquivos_por_segundo']:.1f} arquivos/s"
+    if situacao['restante_s'] is not None:
+        restante = int(round(situacao['restante_s']))
+        texto += f" · restam ~{restante // 60}min {restante % 60:02d}s" if restante >= 60 else f" · restam ~{restante}s"
+    return texto
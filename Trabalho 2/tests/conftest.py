@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos de src/ importam uns aos outros pelo nome
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+
+from BuscaPosicional import documentos_posicionais, ocorrencias
+from ConsultaBooleana import Frase, Proximidade, Termo, analisar_consulta, restricoes_posicionais
+from IndiceInvertido import IndiceInvertido, escrever_indice, termos_posicionais
+from IndiceSegmentado import ConjuntoSegmentos, IndiceSegmentado, _com_posicoes
+
+TEXTOS = {
+    'a.pdf': 'dor cronica afeta sono qualidade vida',
+    'b.pdf': 'sono ruim piora dor cronica',
+    'c.pdf': 'dor intensa cronica sono',
+    'd.pdf': 'qualidade sono',
+}
+
+#----------------------------------------------------------------------------------------#
+@pytest.fixture
+def indice(tmp_path):
+    caminho = str(tmp_path / 'indice.bin')
+    escrever_indice({nome: termos_posicionais(texto.split()) for nome, texto in TEXTOS.items()}, caminho)
+    indice = IndiceInvertido(caminho)
+    yield indice
+    indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+def nomes(indice, no):
+    return {indice.nome(doc) for doc in documentos_posicionais(indice, no)}
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('consulta', ['dor NEAR/0 sono', 'dor near/0 sono'])
+def test_near_zero_rejeitado(consulta):
+    with pytest.raises(ValueError, match='pelo menos 1'):
+        analisar_consulta(consulta)
+    with pytest.raises(ValueError, match='pelo menos 1'):
+        restricoes_posicionais(consulta)
+
+#----------------------------------------------------------------------------------------#
+def test_near_um_aceito():
+    no = analisar_consulta('dor NEAR/1 sono')
+    assert no.distancia == 1
+
+#----------------------------------------------------------------------------------------#
+def test_frase(indice):
+    assert nomes(indice, Frase(['dor', 'cronica'])) == {'a.pdf', 'b.pdf'}
+    assert nomes(indice, Frase(['cronica', 'dor'])) == set()
+    assert nomes(indice, Frase(['qualidade', 'sono'])) == {'d.pdf'}
+    assert {indice.nome(d): list(p) for d, p in ocorrencias(indice, Frase(['dor', 'cronica'])).items()} == \
+        {'a.pdf': [0], 'b.pdf': [3]}
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('esquerda, direita', [('dor', 'sono'), ('sono', 'dor')])
+def test_near_nas_duas_ordens(indice, esquerda, direita):
+    # a: dor(0) ... sono(3); b: sono(0) ... dor(3); c: dor(0) ... sono(3)
+    assert nomes(indice, Proximidade(Termo(esquerda), Termo(direita), 2)) == set()
+    assert nomes(indice, Proximidade(Termo(esquerda), Termo(direita), 3)) == {'a.pdf', 'b.pdf', 'c.pdf'}
+
+#----------------------------------------------------------------------------------------#
+def test_near_com_frase_conta_do_fim_da_frase(indice):
+    # a: "dor cronica" termina em 1, sono em 3; b: sono em 0, "dor cronica" começa em 3
+    assert nomes(indice, Proximidade(Frase(['dor', 'cronica']), Termo('sono'), 2)) == {'a.pdf'}
+    assert nomes(indice, Proximidade(Termo('sono'), Frase(['dor', 'cronica']), 3)) == {'a.pdf', 'b.pdf'}
+
+#----------------------------------------------------------------------------------------#
+def test_documentos_sem_posicoes(tmp_path, caplog):
+    # b.pdf tem _termos.txt desatualizado, d.pdf não tem: ficam sem posições e são avisados
+    pasta_normalizado = tmp_path / 'normalizado'
+    pasta_normalizado.mkdir()
+    for nome, texto in TEXTOS.items():
+        if nome != 'd.pdf':
+            conteudo = 'sono ruim' if nome == 'b.pdf' else texto
+            (pasta_normalizado / (nome[:-4] + '_termos.txt')).write_text(conteudo, encoding='utf-8')
+    dados = {nome: [[t, c] for t, c, _ in termos_posicionais(texto.split())] for nome, texto in TEXTOS.items()}
+    conjunto = ConjuntoSegmentos(str(tmp_path / 'segmentos'))
+    with caplog.at_level(logging.WARNING):
+        conjunto.recriar(_com_posicoes(dados, str(pasta_normalizado)))
+    assert '2 documento(s) indexado(s) sem posições' in caplog.text and 'b.pdf, d.pdf' in caplog.text
+
+    indice = IndiceSegmentado(conjunto.pasta)
+    # Sem posições, frases e NEAR/k valem como conjunção; com posições, continuam exatos
+    assert nomes(indice, Frase(['cronica', 'dor'])) == {'b.pdf'}
+    assert nomes(indice, Frase(['dor', 'cronica'])) == {'a.pdf', 'b.pdf'}
+    assert nomes(indice, Frase(['qualidade', 'sono'])) == {'d.pdf'}
+    assert nomes(indice, Proximidade(Termo('dor'), Termo('sono'), 1)) == {'b.pdf'}
+    assert nomes(indice, Proximidade(Termo('sono'), Frase(['qualidade', 'vida']), 1)) == {'a.pdf'}
+    assert nomes(indice, Proximidade(Frase(['dor', 'cronica']), Termo('sono'), 2)) == {'a.pdf', 'b.pdf'}
+    indice.fechar()
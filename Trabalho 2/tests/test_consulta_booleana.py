@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from ConsultaBooleana import E, Nao, Termo, analisar_consulta, simplificar
+from IndiceInvertido import IndiceInvertido, escrever_indice
+from ModeloBooleano import ModeloBooleano
+
+#----------------------------------------------------------------------------------------#
+def arvore(consulta: str) -> str:
+    return repr(analisar_consulta(consulta))
+
+#----------------------------------------------------------------------------------------#
+def test_precedencia_near_not_and_or():
+    assert arvore('a OR b AND NOT c NEAR/2 d') == \
+        "Ou([Termo('a'), E([Termo('b'), Nao(Proximidade(Termo('c'), Termo('d'), 2))])])"
+    assert arvore('NOT a NEAR/1 b OR c') == "Ou([Nao(Proximidade(Termo('a'), Termo('b'), 1)), Termo('c')])"
+    assert arvore('a AND b OR c AND d') == "Ou([E([Termo('a'), Termo('b')]), E([Termo('c'), Termo('d')])])"
+
+#----------------------------------------------------------------------------------------#
+def test_and_implicito():
+    assert arvore('a b c') == arvore('a AND b AND c') == "E([Termo('a'), Termo('b'), Termo('c')])"
+    assert arvore('a NOT b OR c') == "Ou([E([Termo('a'), Nao(Termo('b'))]), Termo('c')])"
+    assert arvore('"dor cronica" sono') == "E([Frase(['dor', 'cronica']), Termo('sono')])"
+
+#----------------------------------------------------------------------------------------#
+def test_parenteses():
+    assert arvore('(a OR b) c') == "E([Ou([Termo('a'), Termo('b')]), Termo('c')])"
+    assert arvore('a AND (b OR (c AND NOT d))') == \
+        "E([Termo('a'), Ou([Termo('b'), E([Termo('c'), Nao(Termo('d'))])])])"
+    assert arvore('NOT (a OR b)') == "Nao(Ou([Termo('a'), Termo('b')]))"
+
+#----------------------------------------------------------------------------------------#
+def test_not_e_operadores_sem_diferenciar_maiusculas():
+    assert arvore('a and not b') == "E([Termo('a'), Nao(Termo('b'))])"
+    assert arvore('NOT NOT a') == "Nao(Nao(Termo('a')))"
+    assert repr(simplificar(analisar_consulta('NOT NOT a'), str)) == "Termo('a')"
+    assert arvore('') == 'None'
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('consulta, mensagem', [
+    ('(a OR b', 'Parêntese não fechado'),
+    ('((a) AND b', 'Parêntese não fechado'),
+    ('a OR b)', 'Token inesperado'),
+    (')', 'precisa de dois operandos'),
+    ('()', 'precisa de dois operandos'),
+    ('a AND', 'terminou'),
+    ('OR a', 'precisa de dois operandos'),
+    ('NOT', 'terminou'),
+    ('"dor cronica', 'Aspas não fechadas'),
+    ('(a OR b) NEAR/2 c', 'só liga termos ou frases'),
+])
+def test_consultas_invalidas(consulta, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        analisar_consulta(consulta)
+
+#----------------------------------------------------------------------------------------#
+def test_simplificar():
+    stopwords = {'de', 'a'}
+    normalizar = lambda termo: None if termo in stopwords else termo.upper()
+    simplificada = lambda consulta: repr(simplificar(analisar_consulta(consulta), normalizar))
+    assert simplificada('x AND (y AND z)') == "E([Termo('X'), Termo('Y'), Termo('Z')])"
+    assert simplificada('x OR (y OR de)') == "Ou([Termo('X'), Termo('Y')])"
+    assert simplificada('"qualidade de vida"') == "Frase(['QUALIDADE', 'VIDA'])"
+    assert simplificada('"de vida"') == "Termo('VIDA')"
+    assert simplificada('de NEAR/3 vida') == "Termo('VIDA')"
+    assert simplificada('NOT de') == 'None'
+    assert simplificada('de a') == 'None'
+
+#----------------------------------------------------------------------------------------#
+def e_da_esquerda_para_a_direita(conjuntos, todos, no: E) -> set:
+    # Referência: operandos na ordem escrita, NOT como complemento
+    resultado = set(todos)
+    for filho in no.filhos:
+        if isinstance(filho, Nao):
+            resultado -= conjuntos[filho.filho.termo]
+        else:
+            resultado &= conjuntos[filho.termo]
+    return resultado
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('backend', ['auto', 'lista', 'bitmap'])
+def test_e_planejado_igual_ao_da_esquerda_para_a_direita(tmp_path, backend):
+    rng = random.Random(5)
+    vocabulario = [f"t{i}" for i in range(12)]
+    # Termos com densidades bem diferentes, para o planejador reordenar os operandos
+    dados = {f"d{i:03d}.pdf": [[t, 1] for j, t in enumerate(vocabulario) if rng.random() < 0.9 / (j + 1)] or [['t0', 1]]
+             for i in range(300)}
+    caminho = str(tmp_path / 'indice.bin')
+    escrever_indice(dados, caminho)
+    indice = IndiceInvertido(caminho)
+    modelo = ModeloBooleano(indice, backend=backend)
+    todos = range(indice.num_docs)
+    conjuntos = {t: set(indice.postings(t)[0]) for t in vocabulario}
+
+    reordenadas = 0
+    for _ in range(200):
+        termos = rng.sample(vocabulario, rng.randint(2, 5))
+        no = E([Nao(Termo(t)) if rng.random() < 0.3 else Termo(t) for t in termos])
+        positivos = [f for f in no.filhos if not isinstance(f, Nao)]
+        reordenadas += sorted(positivos, key=modelo.estimar) != positivos
+        assert set(modelo._avaliar_e(no)) == e_da_esquerda_para_a_direita(conjuntos, todos, no)
+    assert reordenadas
+    indice.fechar()
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+from PyPDF2 import PageObject, PdfReader
+
+import ExtratorDeResumos as modulo
+from ExtratorDeResumos import ExtratorDeResumos, paginas_sob_demanda
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PASTA_DOCS = os.path.join(RAIZ, 'docs')
+PASTA_RESUMOS = os.path.join(RAIZ, 'results', 'resumo')
+# Os PDFs menores, para o teste não depender do tempo de extração do acervo todo
+PDFS = sorted((nome for nome in os.listdir(PASTA_DOCS) if nome.lower().endswith('.pdf')),
+              key=lambda nome: os.path.getsize(os.path.join(PASTA_DOCS, nome)))[:3]
+
+#----------------------------------------------------------------------------------------#
+def textos(paginas) -> list:
+    return [pagina.extract_text() or "" for pagina in paginas]
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('nome', PDFS)
+def test_paginas_sob_demanda_iguais_a_pages(tmp_path, nome):
+    caminho = os.path.join(PASTA_DOCS, nome)
+    esperado = textos(PdfReader(caminho).pages)
+    assert textos(paginas_sob_demanda(PdfReader(caminho))) == esperado
+    assert list(ExtratorDeResumos(pasta_resumo=str(tmp_path))._paginas_pdf(caminho)) == esperado
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('falha_na_pagina', [1, 3])
+def test_volta_para_pages_se_a_leitura_sob_demanda_falhar(tmp_path, monkeypatch, falha_na_pagina):
+    caminho = os.path.join(PASTA_DOCS, PDFS[0])
+    esperado = textos(PdfReader(caminho).pages)
+    criadas = []
+    def pagina_com_falha(leitor, referencia):
+        criadas.append(referencia)
+        if len(criadas) == falha_na_pagina:
+            raise TypeError('API interna do PyPDF2 mudou')
+        return PageObject(leitor, referencia)
+    monkeypatch.setattr(modulo, 'PageObject', pagina_com_falha)
+    extrator = ExtratorDeResumos(pasta_resumo=str(tmp_path))
+    assert list(extrator._paginas_pdf(caminho)) == esperado
+    assert len(criadas) == falha_na_pagina
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('nome', PDFS)
+def test_resumo_igual_ao_de_results(tmp_path, nome):
+    resultado = ExtratorDeResumos(pasta_resumo=str(tmp_path)).processar_arquivo(nome, gravar=False)
+    with open(os.path.join(PASTA_RESUMOS, os.path.splitext(nome)[0] + '_resumo.txt'), 'r', encoding='utf-8') as f:
+        assert resultado['texto'] == f.read()
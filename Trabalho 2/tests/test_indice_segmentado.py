@@ -0,0 +1,157 @@
+import random
+
+import pytest
+
+from Benchmarks import gerar_consultas, gerar_corpus_sintetico
+from IndiceInvertido import IndiceInvertido, escrever_indice, termos_posicionais
+from IndiceSegmentado import ConjuntoSegmentos, IndiceSegmentado
+from ModeloEspacoVetorial import ModeloEspacoVetorial
+
+#----------------------------------------------------------------------------------------#
+def estado_lapides(indice):
+    return {arquivo: (set(docs), dict(df), comprimento)
+            for arquivo, (docs, df, comprimento) in indice.lapides.items()}
+
+#----------------------------------------------------------------------------------------#
+def test_recarga_interrompida_preserva_o_estado(tmp_path, monkeypatch):
+    conjunto = ConjuntoSegmentos(str(tmp_path))
+    for i in range(3):
+        conjunto.adicionar_lote({f"d{i}{j}.pdf": termos_posicionais(['a', 'b', f"t{i}{j}"]) for j in range(4)})
+    indice = IndiceSegmentado(str(tmp_path))
+    conjunto.adicionar_lote({}, removidos=['d00.pdf', 'd20.pdf'])
+    antes = (estado_lapides(indice), set(indice.removidos), indice.df('a'))
+
+    # A segunda lápide nova falha no meio da carga
+    original = IndiceInvertido.comprimento
+    chamadas = []
+    def comprimento(segmento, doc):
+        chamadas.append(doc)
+        if len(chamadas) == 2:
+            raise RuntimeError('falha simulada')
+        return original(segmento, doc)
+    monkeypatch.setattr(IndiceInvertido, 'comprimento', comprimento)
+    with pytest.raises(RuntimeError):
+        indice.recarregar()
+    assert (estado_lapides(indice), set(indice.removidos), indice.df('a')) == antes
+
+    monkeypatch.setattr(IndiceInvertido, 'comprimento', original)
+    indice.recarregar()
+    assert indice.num_docs_ativos == 10
+    assert indice.df('a') == 10
+    indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+def documento_aleatorio(rng, vocabulario: int = 600) -> list:
+    return termos_posicionais([f"t{int(vocabulario ** rng.random())}" for _ in range(rng.randint(3, 25))])
+
+#----------------------------------------------------------------------------------------#
+def test_normas_e_limites_iguais_aos_de_uma_reconstrucao(tmp_path):
+    # Lotes, atualizações, remoções e mesclagens (inclusive de lápides que o leitor nunca
+    # chegou a ver) com recarga a cada passo: normas e limites superiores globais devem ser
+    # os de um índice único gravado do zero com os documentos vivos
+    rng = random.Random(5)
+    conjunto = ConjuntoSegmentos(str(tmp_path / 'segmentos'))
+    vivos = {}
+    indice = None
+    for lote in range(30):
+        dados, removidos = {}, []
+        for _ in range(rng.randint(1, 6)):
+            if rng.random() < 0.6 or not vivos:
+                nome = f"D{len(vivos) + lote * 10:04d}.pdf"
+            else:
+                nome = rng.choice(sorted(vivos))
+                if rng.random() < 0.4:
+                    removidos.append(nome)
+                    continue
+            dados[nome] = documento_aleatorio(rng)
+        removidos = [n for n in removidos if n not in dados]
+        for nome in removidos:
+            vivos.pop(nome, None)
+        for nome, termos in dados.items():
+            vivos.pop(nome, None)
+            vivos[nome] = termos
+        conjunto.adicionar_lote(dados, removidos)
+        if rng.random() < 0.3:
+            while conjunto.mesclar():
+                pass
+        if indice is None:
+            indice = IndiceSegmentado(conjunto.pasta)
+        else:
+            indice.recarregar()
+
+        caminho = str(tmp_path / f"referencia{lote}.bin")
+        escrever_indice({n: vivos[n] for n in conjunto.nomes()}, caminho)
+        referencia = IndiceInvertido(caminho)
+        for doc in indice.documentos():
+            ref = referencia.id_documento(indice.nome(doc))
+            assert indice.norma(doc) == pytest.approx(referencia.norma(ref), rel=1e-12)
+        for termo in referencia.termos():
+            assert indice.limite_superior(termo) == pytest.approx(referencia.limite_superior(termo), rel=1e-12)
+        referencia.fechar()
+    indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+def test_normas_apos_mesclagem_de_lapide_nao_vista(tmp_path):
+    # 'b.pdf' vira lápide e seu segmento é descartado pela mesclagem antes da recarga: o df
+    # de 'x' cai sem que o leitor veja a lápide
+    conjunto = ConjuntoSegmentos(str(tmp_path / 'segmentos'))
+    conjunto.adicionar_lote({f"a{i}.pdf": termos_posicionais(['comum', f"u{i}"] + ['x'] * (i < 3)) for i in range(20)})
+    conjunto.adicionar_lote({'b.pdf': termos_posicionais(['x', 'comum'])})
+    indice = IndiceSegmentado(conjunto.pasta)
+    conjunto.adicionar_lote({'c.pdf': termos_posicionais(['comum', 'z'])}, removidos=['b.pdf'])
+    while conjunto.mesclar():
+        pass
+    indice.recarregar()
+    assert len(indice.segmentos) == 2 and indice.df('x') == 3
+
+    caminho = str(tmp_path / 'referencia.bin')
+    escrever_indice({n: termos_posicionais(['comum', f"u{i}"] + ['x'] * (i < 3)) for i, n in
+                     enumerate(f"a{i}.pdf" for i in range(20))} | {'c.pdf': termos_posicionais(['comum', 'z'])}, caminho)
+    referencia = IndiceInvertido(caminho)
+    for doc in indice.documentos():
+        assert indice.norma(doc) == pytest.approx(referencia.norma(doc), rel=1e-12)
+    referencia.fechar()
+    indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+def test_documento_a_documento_igual_a_uma_reconstrucao(tmp_path):
+    corpus = gerar_corpus_sintetico(40, tam_vocab=300, termos_por_doc=20, semente=1)
+    nomes = list(corpus)
+    novas_versoes = list(gerar_corpus_sintetico(5, tam_vocab=300, termos_por_doc=20, semente=2).values())
+    vivos = {nome: corpus[nome] for nome in nomes[:30]}
+    conjunto = ConjuntoSegmentos(str(tmp_path / 'segmentos'))
+    conjunto.adicionar_lote(vivos)
+    indice = IndiceSegmentado(conjunto.pasta)
+
+    operacoes = [('adicionar', nome, corpus[nome]) for nome in nomes[30:]]
+    operacoes += [('remover', nome, None) for nome in nomes[:5]]
+    operacoes += [('atualizar', nome, termos) for nome, termos in zip(nomes[5:10], novas_versoes)]
+    consultas = gerar_consultas(20, tam_vocab=300, semente=3)
+    for passo, (operacao, nome, termos) in enumerate(operacoes):
+        if operacao == 'remover':
+            indice.remover_documento(nome)
+            del vivos[nome]
+        else:
+            getattr(indice, f"{operacao}_documento")(nome, termos)
+            vivos.pop(nome, None)
+            vivos[nome] = termos
+
+        caminho = str(tmp_path / f"referencia{passo}.bin")
+        escrever_indice(vivos, caminho)
+        referencia = IndiceInvertido(caminho)
+        assert sorted(indice.nomes_documentos.values()) == sorted(referencia.nomes_documentos.values())
+        modelo, esperado = ModeloEspacoVetorial(indice), ModeloEspacoVetorial(referencia)
+        for consulta in consultas:
+            # Documentos atualizados trocam de DocID, o que muda a ordem dos empates: compara
+            # os escores por documento
+            obtido = dict(modelo.buscar(consulta, len(vivos)))
+            assert obtido == pytest.approx(dict(esperado.buscar(consulta, len(vivos))), rel=1e-12)
+        referencia.fechar()
+
+    with pytest.raises(ValueError):
+        indice.adicionar_documento(nomes[30], corpus[nomes[30]])
+    with pytest.raises(KeyError):
+        indice.remover_documento(nomes[0])
+    with pytest.raises(KeyError):
+        indice.atualizar_documento(nomes[0], corpus[nomes[0]])
+    indice.fechar()
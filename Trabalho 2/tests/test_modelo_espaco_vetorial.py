@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from Benchmarks import gerar_consultas, gerar_corpus_sintetico
+from IndiceInvertido import IndiceInvertido, escrever_indice
+from IndiceSegmentado import ConjuntoSegmentos, IndiceSegmentado
+from ModeloEspacoVetorial import ModeloEspacoVetorial, PontuadorBM25, PontuadorCosseno, sparse
+
+#----------------------------------------------------------------------------------------#
+def test_bm25_calculado_a_mao(tmp_path):
+    # N = 3, comprimentos 3, 4 e 2 (médio 3); k1 = 1.2, b = 0.75
+    caminho = str(tmp_path / 'indice.bin')
+    escrever_indice({'d1.pdf': [['dor', 2], ['sono', 1]],
+                     'd2.pdf': [['dor', 1], ['febre', 3]],
+                     'd3.pdf': [['sono', 1], ['febre', 1]]}, caminho)
+    indice = IndiceInvertido(caminho)
+    modelo = ModeloEspacoVetorial(indice, pontuador=PontuadorBM25())
+
+    # dor e sono têm df = 2: idf = ln(1 + (3 - 2 + 0.5) / (2 + 0.5)) = ln(1.6)
+    # peso = idf * f * 2.2 / (f + 1.2 * (0.25 + 0.75 * comprimento / 3))
+    #   d1: dor f=2 -> 2 * 2.2 / (2 + 1.2) = 1.375; sono f=1 -> 2.2 / (1 + 1.2) = 1
+    #   d2: dor f=1 -> 2.2 / (1 + 1.5) = 0.88
+    #   d3: sono f=1 -> 2.2 / (1 + 0.9) = 22 / 19
+    idf = math.log(1.6)
+    resultado = modelo.buscar('dor sono')
+    assert [nome for nome, _ in resultado] == ['d1.pdf', 'd3.pdf', 'd2.pdf']
+    assert [escore for _, escore in resultado] == pytest.approx([idf * 2.375, idf * 22 / 19, idf * 0.88], rel=1e-12)
+
+    # Termo repetido na consulta pesa em dobro; febre: df = 2, d2 f=3 -> 3 * 2.2 / (3 + 1.5)
+    resultado = dict(modelo.buscar('febre febre'))
+    assert resultado['d2.pdf'] == pytest.approx(2 * idf * 6.6 / 4.5, rel=1e-12)
+    assert resultado['d3.pdf'] == pytest.approx(2 * idf * 22 / 19, rel=1e-12)
+
+    # k1 = 0 ignora a frequência; b = 0 ignora o comprimento
+    sem_saturacao = ModeloEspacoVetorial(indice, pontuador=PontuadorBM25(k1=0))
+    assert dict(sem_saturacao.buscar('dor')) == pytest.approx({'d1.pdf': idf, 'd2.pdf': idf}, rel=1e-12)
+    sem_comprimento = ModeloEspacoVetorial(indice, pontuador=PontuadorBM25(b=0))
+    assert dict(sem_comprimento.buscar('dor')) == pytest.approx(
+        {'d1.pdf': idf * 4.4 / 3.2, 'd2.pdf': idf * 2.2 / 2.2}, rel=1e-12)
+    indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+@pytest.fixture(params=['unico', 'segmentado'])
+def indice(request, tmp_path):
+    # Índice de um arquivo só e conjunto de segmentos com lápides (normas e limites
+    # superiores corrigidos na carga)
+    corpus = gerar_corpus_sintetico(600, tam_vocab=2000, termos_por_doc=40, semente=11)
+    if request.param == 'unico':
+        caminho = str(tmp_path / 'indice.bin')
+        escrever_indice(corpus, caminho)
+        indice = IndiceInvertido(caminho)
+    else:
+        conjunto = ConjuntoSegmentos(str(tmp_path / 'segmentos'))
+        nomes = list(corpus)
+        for inicio in range(0, len(nomes), 150):
+            conjunto.adicionar_lote({nome: corpus[nome] for nome in nomes[inicio:inicio + 150]})
+        conjunto.adicionar_lote({}, removidos=nomes[::7])
+        indice = IndiceSegmentado(conjunto.pasta)
+    yield indice
+    indice.fechar()
+
+#----------------------------------------------------------------------------------------#
+def mesmo_ranking(obtido, esperado):
+    assert [nome for nome, _ in obtido] == [nome for nome, _ in esperado]
+    assert [escore for _, escore in obtido] == pytest.approx([escore for _, escore in esperado], rel=1e-9)
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('pontuador', [PontuadorCosseno, PontuadorBM25])
+@pytest.mark.parametrize('limite', [1, 10])
+def test_maxscore_e_lote_iguais_a_busca_exaustiva(indice, pontuador, limite):
+    consultas = gerar_consultas(60, tam_vocab=2000, semente=13)
+    modelo = ModeloEspacoVetorial(indice, pontuador=pontuador())
+    exaustivos = [modelo.buscar(consulta, limite, 'exaustivo') for consulta in consultas]
+    assert any(exaustivos)
+    for consulta, esperado in zip(consultas, exaustivos):
+        mesmo_ranking(modelo.buscar(consulta, limite, 'maxscore'), esperado)
+    if sparse is None:
+        pytest.skip('buscar_lote sem NumPy/SciPy é o próprio buscar')
+    for obtido, esperado in zip(modelo.buscar_lote(consultas, limite), exaustivos):
+        mesmo_ranking(obtido, esperado)
@@ -0,0 +1,114 @@
+import random
+from array import array
+
+import pytest
+
+from Postings import MAX_ARRAY_BLOCO, ListaOrdenada, MapaDeBits, complemento, diferenca, intersecao, uniao
+
+TOTAL_DOCS = 3 * (1 << 16) + 100  # quatro blocos de 2^16, o último incompleto
+TODOS = frozenset(range(TOTAL_DOCS))
+
+#----------------------------------------------------------------------------------------#
+def docs_aleatorios(rng, quantidade: int, inicio: int = 0, fim: int = TOTAL_DOCS) -> set:
+    return set(rng.sample(range(inicio, fim), min(quantidade, fim - inicio)))
+
+#----------------------------------------------------------------------------------------#
+def como_array(docs: set) -> array:
+    return array('I', sorted(docs))
+
+#----------------------------------------------------------------------------------------#
+def pares_aleatorios(semente: int):
+    # Pares de conjuntos de tamanhos parecidos (merge linear) e muito diferentes (busca
+    # galopante), vazios e concentrados em torno da fronteira de bloco 2^16
+    rng = random.Random(semente)
+    for _ in range(30):
+        tamanhos = [rng.choice([0, 1, 10, 300, 3000]), rng.choice([0, 1, 10, 300, 3000, 30000])]
+        rng.shuffle(tamanhos)
+        if rng.random() < 0.3:
+            yield tuple(docs_aleatorios(rng, n, (1 << 16) - 500, (1 << 16) + 500) for n in tamanhos)
+        else:
+            yield tuple(docs_aleatorios(rng, n) for n in tamanhos)
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('semente', range(3))
+def test_operacoes_em_arrays_iguais_as_de_set(semente):
+    for a, b in pares_aleatorios(semente):
+        assert intersecao(como_array(a), como_array(b)) == como_array(a & b)
+        assert uniao(como_array(a), como_array(b)) == como_array(a | b)
+        assert diferenca(como_array(a), como_array(b)) == como_array(a - b)
+        assert complemento(como_array(a), TOTAL_DOCS) == como_array(TODOS - a)
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('semente', range(3))
+def test_lista_ordenada_igual_a_set(semente):
+    for a, b in pares_aleatorios(semente):
+        lista_a, lista_b = ListaOrdenada(como_array(a)), ListaOrdenada(como_array(b))
+        assert list(lista_a.e(lista_b)) == sorted(a & b)
+        assert list(lista_a.ou(lista_b)) == sorted(a | b)
+        assert list(lista_a.menos(lista_b)) == sorted(a - b)
+        assert list(lista_a.complemento(TOTAL_DOCS)) == sorted(TODOS - a)
+        assert len(lista_a) == len(a)
+        assert all(doc in lista_a for doc in list(a)[:50])
+        assert all(doc not in lista_a for doc in list(b - a)[:50])
+
+#----------------------------------------------------------------------------------------#
+def mapas_aleatorios(semente: int):
+    # Pares com blocos array('H') (até MAX_ARRAY_BLOCO DocIDs) e blocos bitmap, inclusive
+    # densos dos dois lados da fronteira 2^16
+    rng = random.Random(semente)
+    for _ in range(12):
+        pares = []
+        for _ in range(2):
+            tipo = rng.choice(['esparso', 'denso', 'fronteira_esparsa', 'fronteira_densa', 'vazio'])
+            if tipo == 'esparso':
+                pares.append(docs_aleatorios(rng, 2000))
+            elif tipo == 'denso':
+                pares.append(docs_aleatorios(rng, 25000))
+            elif tipo == 'fronteira_esparsa':
+                pares.append(docs_aleatorios(rng, 1500, (1 << 16) - 1000, (1 << 16) + 1000))
+            elif tipo == 'fronteira_densa':
+                pares.append(docs_aleatorios(rng, 12000, (1 << 16) - 7000, (1 << 16) + 7000))
+            else:
+                pares.append(set())
+        yield tuple(pares)
+
+#----------------------------------------------------------------------------------------#
+def conferir_blocos(mapa: MapaDeBits):
+    # Blocos não vazios, arrays ordenados até MAX_ARRAY_BLOCO e bitmaps acima disso
+    for bloco in mapa.blocos.values():
+        if isinstance(bloco, int):
+            assert bin(bloco).count('1') > MAX_ARRAY_BLOCO
+        else:
+            assert 0 < len(bloco) <= MAX_ARRAY_BLOCO and list(bloco) == sorted(set(bloco))
+
+#----------------------------------------------------------------------------------------#
+def test_mapas_aleatorios_tem_os_dois_tipos_de_bloco():
+    tipos = set()
+    for a, b in mapas_aleatorios(0):
+        for docs in (a, b):
+            tipos.update(type(bloco) for bloco in MapaDeBits.de_docs(sorted(docs)).blocos.values())
+    assert tipos == {int, array}
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('semente', range(3))
+def test_mapa_de_bits_igual_a_set(semente):
+    for a, b in mapas_aleatorios(semente):
+        mapa_a, mapa_b = MapaDeBits.de_docs(sorted(a)), MapaDeBits.de_docs(sorted(b))
+        assert list(mapa_a) == sorted(a) and len(mapa_a) == len(a)
+        assert all(doc in mapa_a for doc in list(a)[:200])
+        assert all(doc not in mapa_a for doc in list(b - a)[:200])
+        for resultado, esperado in [(mapa_a.e(mapa_b), a & b), (mapa_a.ou(mapa_b), a | b),
+                                    (mapa_a.menos(mapa_b), a - b), (mapa_a.complemento(TOTAL_DOCS), TODOS - a)]:
+            conferir_blocos(resultado)
+            assert list(resultado) == sorted(esperado)
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('semente', range(2))
+def test_mapa_de_bits_com_lista_ordenada(semente):
+    # Operações entre os dois backends, nas duas ordens
+    for a, b in mapas_aleatorios(semente):
+        mapa, lista = MapaDeBits.de_docs(sorted(a)), ListaOrdenada(como_array(b))
+        assert list(mapa.e(lista)) == list(lista.e(mapa)) == sorted(a & b)
+        assert list(mapa.ou(lista)) == list(lista.ou(mapa)) == sorted(a | b)
+        assert list(mapa.menos(lista)) == sorted(a - b)
+        assert list(lista.menos(mapa)) == sorted(b - a)
@@ -0,0 +1,116 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from IndiceSegmentado import ConjuntoSegmentos, pasta_segmentos
+from ServidorConsultas import ServidorConsultas
+
+#----------------------------------------------------------------------------------------#
+class ServidorEmSegundoPlano:
+    # ServidorConsultas.servir num laço de eventos em outra thread, na porta 0
+    def __init__(self, servidor: ServidorConsultas):
+        self.servidor = servidor
+        self.loop = asyncio.new_event_loop()
+        self.tarefa = None
+        self.thread = threading.Thread(target=self._rodar, daemon=True)
+        self.thread.start()
+        limite = time.monotonic() + 10
+        while servidor.endereco is None:
+            assert self.thread.is_alive() and time.monotonic() < limite, 'servidor não subiu'
+            time.sleep(0.01)
+
+    def _rodar(self):
+        self.tarefa = self.loop.create_task(self.servidor.servir('127.0.0.1', 0))
+        try:
+            self.loop.run_until_complete(self.tarefa)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    def parar(self):
+        self.loop.call_soon_threadsafe(self.tarefa.cancel)
+        self.thread.join(10)
+
+    def requisitar(self, metodo: str, alvo: str, corpo: bytes = None):
+        conexao = http.client.HTTPConnection(*self.servidor.endereco, timeout=10)
+        try:
+            conexao.request(metodo, alvo, body=corpo)
+            resposta = conexao.getresponse()
+            return resposta.status, json.loads(resposta.read())
+        finally:
+            conexao.close()
+
+#----------------------------------------------------------------------------------------#
+@pytest.fixture
+def servidor(tmp_path):
+    freq_json_path = str(tmp_path / 'frequencies_summary.json')  # só os segmentos existem
+    conjunto = ConjuntoSegmentos(pasta_segmentos(freq_json_path))
+    conjunto.adicionar_lote({'a.pdf': [['dor', 2], ['sono', 1]],
+                             'b.pdf': [['dor', 1], ['febre', 3]],
+                             'c.pdf': [['sono', 1], ['febre', 1]]})
+    em_segundo_plano = ServidorEmSegundoPlano(ServidorConsultas(freq_json_path, intervalo=0.05))
+    em_segundo_plano.conjunto = conjunto
+    yield em_segundo_plano
+    em_segundo_plano.parar()
+
+#----------------------------------------------------------------------------------------#
+def test_respostas(servidor):
+    status, estado = servidor.requisitar('GET', '/estado')
+    assert status == 200 and estado['geracao'] == 1 and estado['documentos'] == 3
+
+    status, resposta = servidor.requisitar('GET', '/busca/booleana?q=dor%20AND%20NOT%20febre')
+    assert status == 200 and resposta['documentos'] == ['a.pdf'] and resposta['total'] == 1
+    status, resposta = servidor.requisitar('GET', '/busca/vetorial?q=dor&limite=1')
+    assert status == 200 and [r['documento'] for r in resposta['resultados']] == ['a.pdf']
+    status, resposta = servidor.requisitar('POST', '/busca/vetorial', json.dumps({'q': 'febre', 'limite': 5}).encode())
+    assert status == 200 and {r['documento'] for r in resposta['resultados']} == {'b.pdf', 'c.pdf'}
+
+    for metodo, alvo, corpo in [('GET', '/busca/booleana', None),
+                                ('GET', '/busca/vetorial?q=dor&limite=dez', None),
+                                ('GET', '/busca/booleana?q=(dor', None),
+                                ('GET', '/busca/booleana?q=dor%20NEAR/0%20sono', None),
+                                ('POST', '/busca/booleana', b'{q: dor'),
+                                ('POST', '/busca/booleana', b'["dor"]')]:
+        status, resposta = servidor.requisitar(metodo, alvo, corpo)
+        assert status == 400 and resposta['erro'], (metodo, alvo)
+
+    status, resposta = servidor.requisitar('GET', '/nao/existe')
+    assert status == 404
+    for metodo, alvo in [('POST', '/estado'), ('GET', '/recarregar'), ('DELETE', '/busca/booleana')]:
+        status, resposta = servidor.requisitar(metodo, alvo)
+        assert status == 405, (metodo, alvo)
+
+#----------------------------------------------------------------------------------------#
+def test_lote_novo_troca_a_geracao_sem_falhas(servidor):
+    # Consultas contínuas enquanto um lote é gravado e o servidor troca de geração
+    respostas = []
+    parar = threading.Event()
+    def consultar():
+        while not parar.is_set():
+            respostas.append(servidor.requisitar('GET', '/busca/vetorial?q=dor%20sono'))
+    cliente = threading.Thread(target=consultar)
+    cliente.start()
+    try:
+        time.sleep(0.1)
+        servidor.conjunto.adicionar_lote({'d.pdf': [['dor', 1], ['gripe', 2]]}, removidos=['c.pdf'])
+        limite = time.monotonic() + 10
+        while servidor.requisitar('GET', '/estado')[1]['geracao'] != 2:
+            assert time.monotonic() < limite, 'geração nova não carregada'
+            time.sleep(0.02)
+        time.sleep(0.1)
+    finally:
+        parar.set()
+        cliente.join(10)
+
+    assert respostas and all(status == 200 for status, _ in respostas)
+    geracoes = [resposta['geracao'] for _, resposta in respostas]
+    assert geracoes == sorted(geracoes) and geracoes[0] == 1 and geracoes[-1] == 2
+    status, estado = servidor.requisitar('GET', '/estado')
+    assert estado['documentos'] == 3
+    status, resposta = servidor.requisitar('GET', '/busca/booleana?q=gripe%20OR%20sono')
+    assert resposta['documentos'] == ['a.pdf', 'd.pdf'] and resposta['geracao'] == 2
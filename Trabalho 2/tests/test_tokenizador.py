@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+from Normalizador import tokenizar, obter_analisador, ETAPAS_LEGADO, ETAPAS_PADRAO
+
+PASTA_RESUMOS = os.path.join(RAIZ, 'results', 'resumo')
+PASTA_NORMALIZADO = os.path.join(RAIZ, 'results', 'normalizado')
+RESUMOS = sorted(nome for nome in os.listdir(PASTA_RESUMOS) if nome.endswith('_resumo.txt'))
+
+#----------------------------------------------------------------------------------------#
+def ler_resumo(nome: str) -> str:
+    with open(os.path.join(PASTA_RESUMOS, nome), 'r', encoding='utf-8') as f:
+        return f.read()
+
+#----------------------------------------------------------------------------------------#
+def por_token(texto: str, analisador) -> list:
+    # Caminho de referência: analisador.termo (com limpar_token) token a token
+    texto = texto.replace('-\n', '').replace('\n', ' ')
+    return [t for t in (analisador.termo(tok) for tok in texto.split()) if t]
+
+#----------------------------------------------------------------------------------------#
+def test_ha_resumos():
+    assert RESUMOS
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('nome', RESUMOS)
+def test_igual_a_results_normalizado(nome):
+    # Os arquivos _termos.txt de results/normalizado foram gerados com o analisador antigo
+    analisador = obter_analisador(ETAPAS_LEGADO)
+    caminho_termos = os.path.join(PASTA_NORMALIZADO, nome[:-len('_resumo.txt')] + '_termos.txt')
+    with open(caminho_termos, 'rb') as f:
+        esperado = f.read()
+    assert ' '.join(tokenizar(ler_resumo(nome), analisador)).encode('utf-8') == esperado
+
+#----------------------------------------------------------------------------------------#
+@pytest.mark.parametrize('etapas', [ETAPAS_LEGADO, ETAPAS_PADRAO])
+@pytest.mark.parametrize('nome', RESUMOS)
+def test_igual_ao_caminho_por_token(nome, etapas):
+    analisador = obter_analisador(etapas)
+    texto = ler_resumo(nome)
+    assert list(tokenizar(texto, analisador)) == por_token(texto, analisador)
+
+#----------------------------------------------------------------------------------------#
+def test_termo_limpo_igual_a_termo_em_tokens_limpos():
+    analisador = obter_analisador(ETAPAS_PADRAO)
+    for token in ['qualidade', 'vidas', 'micro-ambiente', 'de', 'x', 'fibromialgias']:
+        assert analisador.termo_limpo(token) == analisador.termo(token)